@@ -0,0 +1,271 @@
+"""
+End-to-end latency benchmark for ``/chat/completions``.
+
+Serves the real Flask app through waitress (same settings as ``run_services``)
+with ``state.driver`` replaced by ``standin.FakeDeepSeekDriver``, then replays
+SillyTavern-shaped requests in every mode:
+
+    streaming / non-streaming  x  DOM scraping / network interception
+
+For each request it records time-to-first-token, inter-token gaps, total
+latency, the number of WebDriver commands issued and the process CPU time, and
+writes everything to a JSON report that ``compare`` can diff against a previous
+run.
+
+Usage:
+    python benchmarks/e2e_latency.py run [--requests N] [--messages N] [--server MODE] [--output FILE]
+    python benchmarks/e2e_latency.py compare BASELINE.json CANDIDATE.json
+"""
+
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from typing import Dict, List
+
+import _bootstrap
+from _bootstrap import RESULTS_DIR, summarize
+from standin import FakeDeepSeekDriver
+from workloads import make_chat_payload
+
+METRICS = ("ttft", "inter_token_gap", "total", "webdriver_commands", "cpu_time")
+SCENARIOS = (
+    ("dom-stream", False, True),
+    ("dom-nostream", False, False),
+    ("network-stream", True, True),
+    ("network-nostream", True, False),
+)
+
+
+class BenchServer:
+    """Runs ``api.app`` on an ephemeral loopback port in a background thread"""
+
+    def __init__(self, mode: str = "Threaded"):
+        from utils.server_pools import create_api_server
+        import api
+
+        self.api = api
+        self.server = create_api_server(api.app, "127.0.0.1", 0, mode=mode)
+        self.port = self.server.port
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.close()
+
+
+def _setup_state(driver: FakeDeepSeekDriver):
+    from core import get_state_manager
+    from config.config_manager import ConfigManager
+    from utils.storage_manager import StorageManager
+
+    state = get_state_manager()
+    config_manager = ConfigManager(StorageManager())
+    config_manager.set("security.api_auth_enabled", False)
+    config_manager.set("models.deepseek.clean_regeneration", False)
+    state.set_config_manager(config_manager)
+    state.driver = driver
+    return state, config_manager
+
+
+def _post_chat(port: int, payload: dict, driver: FakeDeepSeekDriver) -> dict:
+    """Send one request and time it from the client's point of view"""
+    body = json.dumps(payload).encode("utf-8")
+    commands_before = driver.command_count()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    conn.request("POST", "/chat/completions", body=body, headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+
+    token_times: List[float] = []
+    text_parts: List[str] = []
+    if payload.get("stream"):
+        while True:
+            line = resp.readline()
+            if not line:
+                break
+            line = line.strip()
+            if not line.startswith(b"data: "):
+                continue
+            try:
+                chunk = json.loads(line[6:])
+                content = chunk["choices"][0]["delta"].get("content", "")
+            except (ValueError, KeyError, IndexError):
+                continue
+            if content:
+                token_times.append(time.perf_counter())
+                text_parts.append(content)
+    else:
+        data = json.loads(resp.read() or b"{}")
+        token_times.append(time.perf_counter())
+        try:
+            text_parts.append(data["choices"][0]["message"]["content"])
+        except (KeyError, IndexError, TypeError):
+            pass
+    conn.close()
+
+    end = time.perf_counter()
+    gaps = [b - a for a, b in zip(token_times, token_times[1:])]
+    return {
+        "status": resp.status,
+        "ttft": (token_times[0] - start) if token_times else end - start,
+        "inter_token_gaps": gaps,
+        "total": end - start,
+        "chunks": len(token_times),
+        "characters": sum(len(p) for p in text_parts),
+        "webdriver_commands": driver.command_count() - commands_before,
+        "cpu_time": time.process_time() - cpu_before,
+    }
+
+
+def run_scenario(server: BenchServer, driver: FakeDeepSeekDriver, config_manager, network: bool,
+                 stream: bool, requests: int, messages: int) -> Dict:
+    config_manager.set("models.deepseek.intercept_network", network)
+    samples = []
+    for _ in range(requests):
+        samples.append(_post_chat(server.port, make_chat_payload(messages, stream=stream), driver))
+        # Let the stand-in settle (pending extension posts, new chat clicks)
+        time.sleep(0.05)
+
+    gaps = [g for s in samples for g in s["inter_token_gaps"]]
+    return {
+        "network": network,
+        "stream": stream,
+        "errors": sum(1 for s in samples if s["status"] != 200),
+        "ttft": summarize([s["ttft"] for s in samples]),
+        "inter_token_gap": summarize(gaps),
+        "total": summarize([s["total"] for s in samples]),
+        "webdriver_commands": summarize([s["webdriver_commands"] for s in samples]),
+        "cpu_time": summarize([s["cpu_time"] for s in samples]),
+        "chunks": summarize([s["chunks"] for s in samples]),
+        "samples": samples,
+    }
+
+
+def cmd_run(args) -> int:
+    selected = set(args.scenario or [name for name, _, _ in SCENARIOS])
+    sink = io.StringIO()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(sink)
+
+    with quiet:
+        server = BenchServer(args.server)
+        driver = FakeDeepSeekDriver(
+            server.base_url,
+            tokens=[f"token{i} " for i in range(args.tokens)],
+            first_token_delay=args.first_token_delay,
+            token_interval=args.token_interval,
+        )
+        state, config_manager = _setup_state(driver)
+        server.start()
+
+        results = {}
+        try:
+            for name, network, stream in SCENARIOS:
+                if name not in selected:
+                    continue
+                sys.__stdout__.write(f"running {name}...\n")
+                results[name] = run_scenario(server, driver, config_manager, network, stream,
+                                             args.requests, args.messages)
+        finally:
+            state.driver = None
+            server.stop()
+
+    report = {
+        "meta": {
+            "benchmark": "e2e_latency",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "messages": args.messages,
+            "tokens": args.tokens,
+            "first_token_delay": args.first_token_delay,
+            "token_interval": args.token_interval,
+            "server": args.server,
+        },
+        "scenarios": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"e2e-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print_report(report)
+    print(f"\nSaved report to {output}")
+    return 0
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'scenario':<18} {'ttft p50':>10} {'ttft p90':>10} {'gap p50':>10} {'gap p99':>10} "
+          f"{'total p50':>10} {'wd cmds':>8} {'cpu s':>8}")
+    for name, result in report["scenarios"].items():
+        print(f"{name:<18} {result['ttft']['p50']:>10.3f} {result['ttft']['p90']:>10.3f} "
+              f"{result['inter_token_gap']['p50']:>10.3f} {result['inter_token_gap']['p99']:>10.3f} "
+              f"{result['total']['p50']:>10.3f} {result['webdriver_commands']['mean']:>8.0f} "
+              f"{result['cpu_time']['mean']:>8.3f}")
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+
+    print(f"{'scenario':<18} {'metric':<20} {'baseline':>10} {'candidate':>10} {'change':>9}")
+    for name, base in baseline.get("scenarios", {}).items():
+        cand = candidate.get("scenarios", {}).get(name)
+        if not cand:
+            continue
+        for metric in METRICS:
+            for stat in ("p50", "p90") if metric != "webdriver_commands" else ("mean",):
+                old = base[metric][stat]
+                new = cand[metric][stat]
+                change = ((new - old) / old * 100.0) if old else 0.0
+                print(f"{name:<18} {metric + '.' + stat:<20} {old:>10.3f} {new:>10.3f} {change:>+8.1f}%")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="End-to-end /chat/completions latency benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the benchmark against the DeepSeek stand-in")
+    run.add_argument("--requests", type=int, default=5, help="Requests per scenario")
+    run.add_argument("--messages", type=int, default=40, help="History messages per request")
+    run.add_argument("--tokens", type=int, default=60, help="Tokens generated per response")
+    run.add_argument("--first-token-delay", type=float, default=0.3, help="Seconds before the first token")
+    run.add_argument("--token-interval", type=float, default=0.02, help="Seconds between tokens")
+    run.add_argument("--server", choices=["Threaded", "Asyncio"], default="Threaded",
+                     help="Client listener implementation (api.server_mode)")
+    run.add_argument("--scenario", action="append", choices=[name for name, _, _ in SCENARIOS],
+                     help="Only run the given scenario (repeatable)")
+    run.add_argument("--output", help="Where to write the JSON report")
+    run.add_argument("--verbose", action="store_true", help="Show application console output")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
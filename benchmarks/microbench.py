@@ -0,0 +1,274 @@
+"""
+Micro-benchmarks for the request hot path.
+
+Covers:
+    * ``MessagePipeline.process_request`` + ``format_for_api`` for every
+      ``MessageFormatter.PRESETS`` entry and the Custom templates
+    * ``ContentProcessor.process_html_to_markdown`` on the HTML in ``fixtures/``
+    * ``DeepSeekSettings.detect_from_messages``
+    * the network stream parsers in ``api`` (streaming and combined)
+
+Inputs are synthetic SillyTavern payloads (10 / 200 / 2,000 messages, a group
+chat, a huge lorebook and a ~4 MB lorebook). Each case reports ops/sec plus the tracemalloc peak
+and retained bytes for a single operation.
+
+Usage:
+    python benchmarks/microbench.py run [--filter TEXT] [--min-time S] [--output FILE]
+    python benchmarks/microbench.py compare BASELINE.json CANDIDATE.json [--threshold PCT]
+
+``compare`` exits with status 1 when any case got slower (or allocates more)
+than the threshold, so it can gate a release.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import _bootstrap
+from _bootstrap import FIXTURES_DIR, RESULTS_DIR
+from workloads import make_chat_payload, make_group_chat_payload, make_lorebook_payload, make_stream_items
+
+CUSTOM_USER_TEMPLATE = "### {name} ({role})\n{content}"
+CUSTOM_CHAR_TEMPLATE = "<{name}>\n{content}\n</{name}>"
+
+Case = Tuple[str, Callable[[], object]]
+
+
+def _workloads() -> Dict[str, dict]:
+    return {
+        "msgs10": make_chat_payload(10),
+        "msgs200": make_chat_payload(200),
+        "msgs2000": make_chat_payload(2000),
+        "group200": make_group_chat_payload(200),
+        "lorebook": make_lorebook_payload(),
+    }
+
+
+def _make_config_manager(preset: str):
+    from config.config_manager import ConfigManager
+    from utils.storage_manager import StorageManager
+
+    config_manager = ConfigManager(StorageManager())
+    config_manager.set("formatting.preset", preset)
+    if preset == "Custom":
+        config_manager.set_hidden_var("custom_user_template", CUSTOM_USER_TEMPLATE)
+        config_manager.set_hidden_var("custom_char_template", CUSTOM_CHAR_TEMPLATE)
+    return config_manager
+
+
+def pipeline_cases() -> List[Case]:
+    from pipeline.message_pipeline import MessagePipeline, get_message_pipeline
+    from processors.character_processor import MessageFormatter
+
+    cases: List[Case] = []
+    workloads = _workloads()
+    for preset in list(MessageFormatter.PRESETS) + ["Custom"]:
+        config_manager = _make_config_manager(preset)
+        for workload_name, payload in workloads.items():
+            def run(payload=payload, config_manager=config_manager):
+                # Mirrors bot_response: shared pipeline, process, format
+                pipeline = get_message_pipeline(config_manager)
+                request = pipeline.process_request(payload)
+                return pipeline.format_for_api(request)
+            cases.append((f"pipeline/{preset}/{workload_name}", run))
+
+    config_manager = _make_config_manager("Classic (Name)")
+    huge = make_lorebook_payload(entries=8000)  # ~4 MB prompt
+
+    def multi_mb():
+        pipeline = get_message_pipeline(config_manager)
+        return pipeline.format_for_api(pipeline.process_request(huge))
+    cases.append(("pipeline/Classic (Name)/lorebook-4mb", multi_mb))
+
+    history = make_chat_payload(1000)
+    turn = [0]
+
+    def incremental():
+        # Long chat where every call adds one new turn, like SillyTavern resending the history
+        turn[0] += 1
+        payload = dict(history, messages=history["messages"] + [{"role": "user", "content": f"New turn {turn[0]}"}])
+        pipeline = get_message_pipeline(config_manager)
+        return pipeline.format_for_api(pipeline.process_request(payload))
+    cases.append(("pipeline/incremental/msgs1000", incremental))
+
+    def build():
+        config = config_manager.get_all()
+        config["config_manager"] = config_manager
+        return MessagePipeline(config)
+    cases.append(("pipeline/build", build))
+    return cases
+
+
+def content_cases() -> List[Case]:
+    from processors.content_processor import ContentProcessor
+
+    processor = ContentProcessor()
+    cases: List[Case] = []
+    for filename in sorted(os.listdir(FIXTURES_DIR)):
+        if not filename.endswith(".html"):
+            continue
+        with open(os.path.join(FIXTURES_DIR, filename), encoding="utf-8") as f:
+            html = f.read()
+        cases.append((f"content/{filename[:-5]}", lambda html=html: processor.process_html_to_markdown(html)))
+    return cases
+
+
+def detect_cases() -> List[Case]:
+    from models.message_models import ChatRequest, DeepSeekSettings
+
+    cases: List[Case] = []
+    for name, payload in _workloads().items():
+        messages = ChatRequest.from_dict(payload).messages
+        cases.append((f"detect/{name}", lambda messages=messages: DeepSeekSettings.detect_from_messages(messages)))
+    return cases
+
+
+def stream_cases() -> List[Case]:
+    import api
+
+    items = make_stream_items()
+    buffer = [{"type": "data", "content": item, "timestamp": 0} for item in items]
+
+    def reset():
+        api.network_data["thinking_active"] = False
+        api.network_data["thinking_started"] = False
+        api.network_data["thinking_buffer"] = ""
+
+    def streaming():
+        reset()
+        chunks = []
+        for item in items:
+            chunks.extend(api.parse_network_stream_data_for_streaming(item, True))
+        return chunks
+
+    def combined():
+        reset()
+        return api.combine_network_stream_data(buffer, True)
+
+    return [("stream/parse-streaming", streaming), ("stream/combine", combined)]
+
+
+def collect_cases() -> List[Case]:
+    return pipeline_cases() + content_cases() + detect_cases() + stream_cases()
+
+
+def measure(fn: Callable[[], object], min_time: float) -> dict:
+    """Time ``fn`` for at least ``min_time`` seconds, then profile one call"""
+    fn()  # Warm up caches and lazy imports
+
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time or iterations < 3:
+        fn()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    fn()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "iterations": iterations,
+        "seconds": elapsed,
+        "ops_per_sec": iterations / elapsed if elapsed else 0.0,
+        "mean_ms": elapsed / iterations * 1000.0,
+        "peak_bytes": max(0, peak - before),
+        "retained_bytes": max(0, after - before),
+    }
+
+
+def cmd_run(args) -> int:
+    sink = io.StringIO()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(sink)
+
+    results = {}
+    with quiet:
+        cases = collect_cases()
+        for name, fn in cases:
+            if args.filter and not any(f in name for f in args.filter):
+                continue
+            results[name] = measure(fn, args.min_time)
+            sys.__stdout__.write(f"{name:<45} {results[name]['ops_per_sec']:>12.1f} ops/s "
+                                 f"{results[name]['peak_bytes'] / 1024:>10.1f} KiB peak\n")
+
+    report = {
+        "meta": {
+            "benchmark": "microbench",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "min_time": args.min_time,
+        },
+        "cases": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"micro-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved report to {output}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["cases"]
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)["cases"]
+
+    regressions = []
+    print(f"{'case':<45} {'ops/s old':>11} {'ops/s new':>11} {'speed':>8} {'peak old':>10} {'peak new':>10}")
+    for name, old in baseline.items():
+        new = candidate.get(name)
+        if not new:
+            continue
+        speed = (new["ops_per_sec"] / old["ops_per_sec"] - 1.0) * 100.0 if old["ops_per_sec"] else 0.0
+        memory = (new["peak_bytes"] / old["peak_bytes"] - 1.0) * 100.0 if old["peak_bytes"] else 0.0
+        flag = ""
+        if speed < -args.threshold or memory > args.threshold:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:<45} {old['ops_per_sec']:>11.1f} {new['ops_per_sec']:>11.1f} {speed:>+7.1f}% "
+              f"{old['peak_bytes'] / 1024:>9.1f}K {new['peak_bytes'] / 1024:>9.1f}K{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0f}%")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Request hot path micro-benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the micro-benchmarks")
+    run.add_argument("--filter", action="append", help="Only run cases whose name contains TEXT (repeatable)")
+    run.add_argument("--min-time", type=float, default=0.5, help="Minimum seconds to time each case")
+    run.add_argument("--output", help="Where to write the JSON report")
+    run.add_argument("--verbose", action="store_true", help="Show application console output")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+"""
+Local stand-in for DeepSeek used by the benchmarks.
+
+``FakeDeepSeekDriver`` answers the subset of the seleniumbase ``Driver`` API that
+``utils.deepseek_driver`` and ``utils.webdriver_utils`` actually use, and
+simulates a response being generated token by token. When network interception
+is switched on through ``enable_network_interception`` the embedded
+``FakeInterceptionExtension`` replays the same tokens to the ``/network/*``
+routes exactly like the Chrome extension does (DeepSeek SSE JSON payloads).
+
+Every driver and element call is counted so benchmarks can report how many
+WebDriver round-trips a request costs.
+"""
+
+import html
+import json
+import threading
+import time
+import urllib.request
+from collections import Counter
+from typing import List, Optional
+
+SEND_BUTTON_XPATH = "//div[@role='button' and contains(@class, '_7436101')]"
+CHAT_INPUT_CLASS = "_27c9245"
+BACKSPACE = "\ue003"  # selenium Keys.BACKSPACE
+
+
+class FakeNoSuchElement(Exception):
+    """Raised for selectors the stand-in does not model (the real driver raises too)"""
+    pass
+
+
+class _FakeElement:
+    """Base element that routes every call through the driver's command counter"""
+
+    def __init__(self, driver: "FakeDeepSeekDriver"):
+        self._driver = driver
+
+    def get_attribute(self, name: str):
+        self._driver._count("element.get_attribute")
+        return self._attribute(name)
+
+    def click(self) -> None:
+        self._driver._count("element.click")
+        self._on_click()
+
+    def find_element(self, by: str, value: str):
+        self._driver._count("element.find_element")
+        raise FakeNoSuchElement(value)
+
+    def find_elements(self, by: str, value: str):
+        self._driver._count("element.find_elements")
+        return []
+
+    def _attribute(self, name: str):
+        return None
+
+    def _on_click(self) -> None:
+        pass
+
+
+class _SendButton(_FakeElement):
+    def _attribute(self, name: str):
+        if name == "aria-disabled":
+            enabled = self._driver.generating or bool(self._driver.input_value)
+            return "false" if enabled else "true"
+        return None
+
+    def _on_click(self) -> None:
+        if self._driver.generating:
+            self._driver.stop_generation()
+        elif self._driver.input_value:
+            self._driver.start_generation(self._driver.input_value)
+
+
+class _ChatInput(_FakeElement):
+    def clear(self) -> None:
+        self._driver._count("element.clear")
+        self._driver.input_value = ""
+
+    def send_keys(self, keys: str) -> None:
+        self._driver._count("element.send_keys")
+        if keys == BACKSPACE:
+            self._driver.input_value = self._driver.input_value[:-1]
+        else:
+            self._driver.input_value += keys
+
+    def _attribute(self, name: str):
+        if name == "value":
+            return self._driver.input_value
+        return None
+
+
+class _MessageElement(_FakeElement):
+    def __init__(self, driver: "FakeDeepSeekDriver", index: int):
+        super().__init__(driver)
+        self._index = index
+
+    def _attribute(self, name: str):
+        if name == "innerHTML":
+            return self._driver.message_html(self._index)
+        return None
+
+
+class _NewChatButton(_FakeElement):
+    def _on_click(self) -> None:
+        self._driver.reset_chat()
+
+
+class _ToggleButton(_FakeElement):
+    def __init__(self, driver: "FakeDeepSeekDriver", name: str):
+        super().__init__(driver)
+        self.name = name
+        self.active = False
+
+    def _on_click(self) -> None:
+        self.active = not self.active
+
+
+class FakeInterceptionExtension:
+    """Posts DeepSeek-shaped stream data to the local API like the CDP extension"""
+
+    def __init__(self, api_base: str, item_delay: float = 0.0):
+        self.api_base = api_base.rstrip("/")
+        self.item_delay = item_delay
+        self.active = False
+        self.posts = 0
+
+    def _post(self, route: str, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        req = urllib.request.Request(
+            f"{self.api_base}/network/{route}",
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                resp.read()
+            self.posts += 1
+        except Exception:
+            pass  # The real extension silently drops failed posts too
+
+    def start(self) -> None:
+        self.active = True
+        threading.Thread(target=self._post, args=("ready", {"ready": True}), daemon=True).start()
+
+    def stop(self) -> None:
+        if self.active:
+            self.active = False
+            threading.Thread(target=self._post, args=("ready", {"ready": False}), daemon=True).start()
+
+    def begin(self, request_id: str) -> None:
+        now = time.time() * 1000
+        self._post("request", {"requestId": request_id, "url": "/api/v0/chat/completion", "method": "POST", "timestamp": now})
+        self._post("response-start", {"requestId": request_id, "timestamp": now})
+
+    def token(self, index: int, token: str) -> None:
+        if index == 0:
+            payload = {"p": "response/fragments", "o": "APPEND", "v": [{"type": "RESPONSE", "content": token}]}
+        else:
+            payload = {"v": token}
+        self._post("stream-data", {"data": json.dumps(payload), "timestamp": time.time() * 1000})
+        if self.item_delay:
+            time.sleep(self.item_delay)
+
+    def finish(self, request_id: str) -> None:
+        self._post("stream-event", {"event": "finish", "timestamp": time.time() * 1000})
+        self._post("response-end", {"requestId": request_id, "timestamp": time.time() * 1000})
+
+
+class FakeDeepSeekDriver:
+    """Minimal seleniumbase ``Driver`` replacement that generates canned responses"""
+
+    def __init__(
+        self,
+        api_base: str,
+        tokens: Optional[List[str]] = None,
+        first_token_delay: float = 0.3,
+        token_interval: float = 0.02,
+        extension_item_delay: float = 0.0,
+    ):
+        self.title = "DeepSeek - Into the Unknown"
+        self.url = "https://chat.deepseek.com/"
+        self.tokens = tokens or [f"word{i} " for i in range(60)]
+        self.first_token_delay = first_token_delay
+        self.token_interval = token_interval
+        self.extension = FakeInterceptionExtension(api_base, extension_item_delay)
+
+        self.input_value = ""
+        self.generating = False
+        self.last_prompt = ""
+        self._messages: List[str] = []
+        self._lock = threading.Lock()
+        self._commands = Counter()
+        self._generation = 0
+
+        self._send_button = _SendButton(self)
+        self._chat_input = _ChatInput(self)
+        self._new_chat_button = _NewChatButton(self)
+        self._toggles = {"deepthink": _ToggleButton(self, "deepthink"), "search": _ToggleButton(self, "search")}
+
+    # -- bookkeeping -------------------------------------------------------
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._commands[name] += 1
+
+    def command_count(self) -> int:
+        with self._lock:
+            return sum(self._commands.values())
+
+    def command_breakdown(self) -> dict:
+        with self._lock:
+            return dict(self._commands)
+
+    def message_html(self, index: int) -> str:
+        with self._lock:
+            return self._messages[index] if index < len(self._messages) else ""
+
+    # -- simulated page behaviour ------------------------------------------
+
+    def reset_chat(self) -> None:
+        with self._lock:
+            self._messages = []
+            self._generation += 1
+        self.generating = False
+
+    def start_generation(self, prompt: str) -> None:
+        self.last_prompt = prompt
+        self.input_value = ""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._messages.append("")
+            index = len(self._messages) - 1
+        self.generating = True
+        threading.Thread(target=self._generate, args=(generation, index), daemon=True).start()
+
+    def stop_generation(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.generating = False
+
+    def _generate(self, generation: int, index: int) -> None:
+        request_id = f"bench-{generation}"
+        intercepting = self.extension.active
+        if intercepting:
+            self.extension.begin(request_id)
+
+        time.sleep(self.first_token_delay)
+        text = ""
+        for i, token in enumerate(self.tokens):
+            with self._lock:
+                if generation != self._generation:
+                    return
+                text += token
+                self._messages[index] = f"<p>{html.escape(text)}</p>"
+            if intercepting:
+                self.extension.token(i, token)
+            time.sleep(self.token_interval)
+
+        if intercepting:
+            self.extension.finish(request_id)
+        with self._lock:
+            if generation == self._generation:
+                self.generating = False
+
+    # -- seleniumbase Driver surface ---------------------------------------
+
+    def get_current_url(self) -> str:
+        self._count("get_current_url")
+        return self.url
+
+    def _lookup(self, by: str, value: str):
+        if value == SEND_BUTTON_XPATH:
+            return self._send_button
+        if value == CHAT_INPUT_CLASS:
+            return self._chat_input
+        if "DeepThink" in value:
+            return self._toggles["deepthink"]
+        if "Search" in value and by == "xpath" and value.startswith("//button"):
+            return self._toggles["search"]
+        if "a084f19e" in value:
+            return self._new_chat_button
+        raise FakeNoSuchElement(value)
+
+    def find_element(self, by: str, value: str):
+        self._count("find_element")
+        return self._lookup(by, value)
+
+    def find_elements(self, by: str, value: str):
+        self._count("find_elements")
+        if "ds-markdown" in value:
+            with self._lock:
+                count = len(self._messages)
+            return [_MessageElement(self, i) for i in range(count)]
+        return []
+
+    def wait_for_element_present(self, selector: str, by: str = "css selector", timeout: float = 10):
+        self._count("wait_for_element_present")
+        return self._lookup(by, selector)
+
+    def execute_script(self, script: str, *args):
+        self._count("execute_script")
+        if "startNetworkInterception" in script:
+            self.extension.start()
+        elif "stopNetworkInterception" in script:
+            self.extension.stop()
+        elif "getComputedStyle" in script:
+            toggle = args[0] if args else None
+            active = isinstance(toggle, _ToggleButton) and toggle.active
+            return "rgb(40, 49, 66)" if active else "rgb(255, 255, 255)"
+        elif script.strip() == "arguments[0].click();" and args:
+            args[0]._on_click()
+        elif "arguments[0].value = arguments[1]" in script and len(args) >= 2:
+            self.input_value = args[1]
+        return None
+
+    def refresh(self) -> None:
+        self._count("refresh")
+        self.reset_chat()
+
+    def quit(self) -> None:
+        self._count("quit")
+        self.stop_generation()
@@ -0,0 +1,211 @@
+"""
+Startup benchmark: import time and memory of the entry points.
+
+Every sample runs in a fresh interpreter, so module caches don't carry over
+between runs (the OS file cache does, which is what a restarted server sees).
+
+Cases:
+    * ``headless`` - ``import headless`` (everything ``main.pyw serve`` loads)
+    * ``headless+config`` - the above plus loading the saved config
+    * ``api`` - ``import api`` alone
+    * ``gui`` - ``import gui`` (customtkinter and the config UI)
+
+Each case reports the import time, the whole process time (interpreter start
+included), RSS after the import, the number of modules loaded, which of the
+heavy optional modules got loaded, and the slowest imports from ``-X importtime``.
+
+Usage:
+    python benchmarks/startup.py run [--runs N] [--filter TEXT] [--output FILE]
+    python benchmarks/startup.py compare BASELINE.json CANDIDATE.json [--threshold PCT]
+
+``compare`` exits with status 1 when any case got slower or bigger than the
+threshold.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import _bootstrap
+from _bootstrap import RESULTS_DIR, SRC_DIR, summarize
+
+# Modules the headless server should only load on demand
+HEAVY_MODULES = ["seleniumbase", "selenium", "bs4", "cryptography", "requests", "customtkinter", "tkinter", "PIL"]
+
+CASES: List[Tuple[str, str]] = [
+    ("headless", "import headless"),
+    ("headless+config", "import headless\n"
+                        "from config.config_manager import ConfigManager\n"
+                        "from utils.storage_manager import StorageManager\n"
+                        "ConfigManager(StorageManager())"),
+    ("api", "import api"),
+    ("gui", "import gui"),
+]
+
+# StorageManager resolves paths from __main__.__file__, as if started through main.pyw
+CHILD_TEMPLATE = """
+import __main__, json, sys, time
+__main__.__file__ = {main_file!r}
+_start = time.perf_counter()
+{statement}
+_seconds = time.perf_counter() - _start
+_modules = len(sys.modules)
+import psutil
+print(json.dumps({{
+    "seconds": _seconds,
+    "rss_bytes": psutil.Process().memory_info().rss,
+    "modules": _modules,
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_child(statement: str, importtime: bool = False) -> Tuple[Optional[dict], str]:
+    """Run the statement in a fresh interpreter
+
+    Returns:
+        (measurement or None on failure, stderr)
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", CHILD_TEMPLATE.format(statement=statement, heavy=HEAVY_MODULES, main_file=os.path.join(SRC_DIR, "main.pyw"))]
+
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=SRC_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+
+    if result.returncode != 0:
+        return None, result.stderr
+    # The app may print while importing, the measurement is the last line
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    data["process_seconds"] = elapsed
+    return data, result.stderr
+
+
+def top_imports(importtime_output: str, limit: int = 15) -> List[dict]:
+    """Slowest top-level imports (cumulative) from ``-X importtime`` output"""
+    entries = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+            entries.append({"module": name, "self_ms": int(self_us) / 1000.0, "cumulative_ms": int(cumulative_us) / 1000.0})
+        except ValueError:
+            continue  # Header line
+
+    entries.sort(key=lambda entry: entry["cumulative_ms"], reverse=True)
+    return entries[:limit]
+
+
+def measure(statement: str, runs: int) -> dict:
+    samples = []
+    for _ in range(runs):
+        data, stderr = run_child(statement)
+        if data is None:
+            return {"error": stderr.strip().splitlines()[-1] if stderr.strip() else "failed"}
+        samples.append(data)
+
+    _, importtime_output = run_child(statement, importtime=True)
+    last = samples[-1]
+    return {
+        "runs": runs,
+        "import_seconds": summarize([sample["seconds"] for sample in samples]),
+        "process_seconds": summarize([sample["process_seconds"] for sample in samples]),
+        "rss_bytes": summarize([sample["rss_bytes"] for sample in samples])["p50"],
+        "modules": last["modules"],
+        "heavy_modules": last["heavy"],
+        "top_imports": top_imports(importtime_output),
+    }
+
+
+def cmd_run(args) -> int:
+    results: Dict[str, dict] = {}
+    for name, statement in CASES:
+        if args.filter and not any(f in name for f in args.filter):
+            continue
+        result = results[name] = measure(statement, args.runs)
+        if "error" in result:
+            print(f"{name:<18} failed: {result['error']}")
+            continue
+        print(f"{name:<18} import {result['import_seconds']['p50'] * 1000:>8.1f} ms  "
+              f"process {result['process_seconds']['p50'] * 1000:>8.1f} ms  "
+              f"rss {result['rss_bytes'] / 1024 / 1024:>7.1f} MiB  "
+              f"{result['modules']:>5} modules  heavy: {', '.join(result['heavy_modules']) or '-'}")
+
+    report = {
+        "meta": {
+            "benchmark": "startup",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+        },
+        "cases": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved report to {output}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["cases"]
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)["cases"]
+
+    regressions = []
+    print(f"{'case':<18} {'import old':>11} {'import new':>11} {'change':>8} {'rss old':>9} {'rss new':>9}")
+    for name, old in baseline.items():
+        new = candidate.get(name)
+        if not new or "error" in old or "error" in new:
+            continue
+        old_time, new_time = old["import_seconds"]["p50"], new["import_seconds"]["p50"]
+        speed = (new_time / old_time - 1.0) * 100.0 if old_time else 0.0
+        memory = (new["rss_bytes"] / old["rss_bytes"] - 1.0) * 100.0 if old["rss_bytes"] else 0.0
+        flag = ""
+        if speed > args.threshold or memory > args.threshold:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:<18} {old_time * 1000:>9.1f}ms {new_time * 1000:>9.1f}ms {speed:>+7.1f}% "
+              f"{old['rss_bytes'] / 1024 / 1024:>8.1f}M {new['rss_bytes'] / 1024 / 1024:>8.1f}M{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0f}%")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Entry point import time and memory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the startup benchmark")
+    run.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    run.add_argument("--filter", action="append", help="Only run cases whose name contains TEXT (repeatable)")
+    run.add_argument("--output", help="Where to write the JSON report")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=15.0, help="Allowed regression in percent")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
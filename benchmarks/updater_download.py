@@ -0,0 +1,551 @@
+"""
+Updater download benchmark: the updater's download engine against a local fake release.
+
+A local HTTP server plays GitHub: ``/releases/latest`` describes a release with one
+random package (and its SHA-256 digest), and the package itself is served with
+range / If-Range support, a per-connection bandwidth cap (the way a CDN limits a
+single stream) and optional dropped connections.
+
+Cases:
+    * ``single`` - one connection
+    * ``parallel`` - ``--segments`` ranged connections
+    * ``resume`` - the first attempt gets cut off with retries disabled, a second
+      run resumes it; reports how much was downloaded twice
+    * ``flaky`` - connections drop every few MB, the built-in retries resume them
+    * ``bad-digest`` - the release publishes the wrong digest, the package must be rejected
+    * ``update-full`` / ``update-delta`` - a whole update of an installation (many files, a few
+      of them changed) without and with the release's file manifest
+    * ``update-rollback`` - a rename fails halfway through installing, the old version must be intact
+    * ``update-interrupted`` - the updater "dies" halfway through installing, the next run must
+      restore the old files and finish the update
+
+Usage:
+    python benchmarks/updater_download.py run [--size-mib N] [--rate-mib N] [--segments N] [--files N] [--changed N]
+                                              [--filter TEXT] [--output FILE]
+    python benchmarks/updater_download.py compare BASELINE.json CANDIDATE.json [--threshold PCT]
+
+The same server can be used to try the real updater by hand:
+    python benchmarks/updater_download.py serve --port 8765 --install /tmp/irp-old
+    python intenserp_updater.py --release-url http://127.0.0.1:8765/releases/latest \\
+        --version-url http://127.0.0.1:8765/version.txt --au --exe-path /tmp/irp-old
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import _bootstrap
+from _bootstrap import REPO_ROOT, RESULTS_DIR
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import intenserp_updater as updater
+
+FAKE_VERSION = "9.9.9"
+BUNDLE_ROOT = "intenserp-next-test-amd64"
+
+
+class FakeRelease:
+    """What the fake GitHub serves, plus fault injection and counters"""
+
+    def __init__(self, payload: bytes, rate: int, asset_name: str, extra_assets: Optional[Dict[str, bytes]] = None):
+        self.asset_name = asset_name
+        self.payload = payload
+        self.extra_assets = extra_assets or {}  # Served next to the package, e.g. its manifest
+        self.sha256 = hashlib.sha256(self.payload).hexdigest()
+        self.etags = {
+            name: f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+            for name, data in [(asset_name, payload)] + list(self.extra_assets.items())
+        }
+        self.rate = rate  # Bytes per second per connection, 0 for unlimited
+        self.published_digest: Optional[str] = self.sha256
+        self.drop_after: Optional[int] = None  # Close each download connection after this many bytes
+        self.drops_left = 0
+        self.lock = threading.Lock()
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        with self.lock:
+            self.bytes_sent = 0
+            self.connections = 0
+
+    def release_json(self, base_url: str) -> dict:
+        asset = {
+            "name": self.asset_name,
+            "browser_download_url": f"{base_url}/download/{self.asset_name}",
+            "size": len(self.payload),
+            "content_type": "application/zip",
+            "created_at": "2026-01-01T00:00:00Z",
+            "download_count": 0,
+        }
+        if self.published_digest:
+            asset["digest"] = f"sha256:{self.published_digest}"
+        extras = [
+            {"name": name, "browser_download_url": f"{base_url}/download/{name}", "size": len(data),
+             "content_type": "application/json", "created_at": "2026-01-01T00:00:00Z", "download_count": 0}
+            for name, data in self.extra_assets.items()
+        ]
+        return {
+            "name": f"v{FAKE_VERSION}",
+            "tag_name": f"v{FAKE_VERSION}",
+            "published_at": "2026-01-01T00:00:00Z",
+            "body": "Fake release served by benchmarks/updater_download.py",
+            "assets": [asset] + extras,
+        }
+
+
+def make_handler(release: FakeRelease):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_bytes(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            base_url = f"http://{self.headers.get('Host')}"
+            if self.path == "/releases/latest":
+                self._send_bytes(200, json.dumps(release.release_json(base_url)).encode("utf-8"), "application/json")
+            elif self.path == "/version.txt":
+                self._send_bytes(200, FAKE_VERSION.encode("utf-8"), "text/plain")
+            elif self.path == f"/download/{release.asset_name}":
+                self._send_asset(release.asset_name, release.payload)
+            elif self.path.startswith("/download/") and self.path[len("/download/"):] in release.extra_assets:
+                name = self.path[len("/download/"):]
+                self._send_asset(name, release.extra_assets[name])
+            else:
+                self._send_bytes(404, b"Not found", "text/plain")
+
+        def _send_asset(self, name: str, payload: bytes):
+            start, end, status = 0, len(payload) - 1, 200
+            match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+            if_range = self.headers.get("If-Range")
+            if match and (not if_range or if_range == release.etags[name]):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), end) if match.group(2) else end
+                if start > end:
+                    self.send_response(416)
+                    self.send_header("Content-Range", f"bytes */{len(payload)}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                status = 206
+
+            self.send_response(status)
+            self.send_header("Content-Type", "application/zip")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", release.etags[name])
+            if status == 206:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+            self.end_headers()
+
+            with release.lock:
+                release.connections += 1
+                drop_after = None
+                if release.drop_after is not None and release.drops_left > 0 and end - start + 1 > release.drop_after:
+                    release.drops_left -= 1
+                    drop_after = release.drop_after
+
+            sent = 0
+            block = 64 * 1024
+            started = time.monotonic()
+            position = start
+            try:
+                while position <= end:
+                    if drop_after is not None and sent >= drop_after:
+                        self.close_connection = True
+                        return
+                    piece = payload[position:min(position + block, end + 1)]
+                    self.wfile.write(piece)
+                    position += len(piece)
+                    sent += len(piece)
+                    with release.lock:
+                        release.bytes_sent += len(piece)
+                    if release.rate:
+                        ahead = sent / release.rate - (time.monotonic() - started)
+                        if ahead > 0:
+                            time.sleep(ahead)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # Clients hanging up on purpose (probes, cancelled segments)
+
+
+def start_server(release: FakeRelease, port: int = 0) -> ThreadingHTTPServer:
+    server = QuietServer(("127.0.0.1", port), make_handler(release))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_case(name: str, release: FakeRelease, base_url: str, work_dir: Path, segments: int) -> dict:
+    size = len(release.payload)
+    release.reset_counters()
+    release.published_digest = "0" * 64 if name == "bad-digest" else release.sha256
+    release.drop_after = None
+    release.drops_left = 0
+
+    destination = work_dir / name / release.asset_name
+    shutil.rmtree(destination.parent, ignore_errors=True)
+    updater.RELEASES_URL = f"{base_url}/releases/latest"
+    updater.DOWNLOAD_SEGMENTS = 1 if name == "single" else segments
+    retries = updater.DOWNLOAD_RETRIES
+
+    release_data = updater.GitHubAPI.get_latest_release()
+    asset = release_data["assets"][0]
+    expected_sha256 = updater.GitHubAPI.get_asset_sha256(release_data, asset)
+
+    first_attempt_ok = None
+    started = time.perf_counter()
+    try:
+        if name == "resume":
+            # Cut every connection at 40% without retrying, then run again
+            release.drop_after = int(size * 0.4 / updater.DOWNLOAD_SEGMENTS)
+            release.drops_left = updater.DOWNLOAD_SEGMENTS
+            updater.DOWNLOAD_RETRIES = 0
+            first_attempt_ok = updater.GitHubAPI.download_file(asset["browser_download_url"], destination, None, expected_sha256)
+            updater.DOWNLOAD_RETRIES = retries
+        elif name == "flaky":
+            release.drop_after = max(1, size // 10)
+            release.drops_left = 6
+
+        ok = updater.GitHubAPI.download_file(asset["browser_download_url"], destination, None, expected_sha256)
+    finally:
+        updater.DOWNLOAD_RETRIES = retries
+    seconds = time.perf_counter() - started
+
+    return {
+        "segments": updater.DOWNLOAD_SEGMENTS,
+        "ok": ok,
+        "expected_ok": name != "bad-digest",
+        "first_attempt_ok": first_attempt_ok,
+        "intact": destination.exists() and updater.sha256_file(destination) == release.sha256,
+        "seconds": seconds,
+        "throughput_mib_s": size / seconds / (1024 * 1024) if ok and seconds else 0.0,
+        "bytes_sent": release.bytes_sent,
+        "overhead_bytes": release.bytes_sent - size,
+        "connections": release.connections,
+    }
+
+
+# ----------------------------------------------------------------------------
+# Whole updates
+# ----------------------------------------------------------------------------
+
+def make_versions(total_size: int, file_count: int, changed: int) -> Tuple[Dict[str, bytes], Dict[str, bytes]]:
+    """An installed version and the next one: ``changed`` files differ, one is added and one removed"""
+    rng = random.Random(1234)
+    weights = [rng.paretovariate(1.5) for _ in range(file_count)]
+    scale = total_size / sum(weights)
+
+    old_files = {updater.EXECUTABLE_NAME: os.urandom(int(weights[0] * scale) + 1), "version.txt": b"1.0.0"}
+    for i, weight in enumerate(weights[1:], 1):
+        old_files[f"_internal/lib/module_{i:04d}.pyd"] = os.urandom(int(weight * scale) + 1)
+
+    new_files = dict(old_files)
+    new_files["version.txt"] = FAKE_VERSION.encode("utf-8")
+    modules = sorted(name for name in old_files if name.startswith("_internal/"))
+    for name in rng.sample(modules[1:], min(changed, len(modules) - 1)):
+        new_files[name] = os.urandom(len(old_files[name]))
+    del new_files[modules[0]]
+    new_files["_internal/lib/added.pyd"] = os.urandom(4096)
+    return old_files, new_files
+
+
+def build_package(files: Dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for name, data in files.items():
+            info = zipfile.ZipInfo(f"{BUNDLE_ROOT}/{name}", date_time=(2026, 1, 1, 0, 0, 0))
+            info.external_attr = (0o755 if name == updater.EXECUTABLE_NAME else 0o644) << 16
+            archive.writestr(info, data)
+    return buffer.getvalue()
+
+
+def write_tree(root: Path, files: Dict[str, bytes]) -> None:
+    for name, data in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+
+def make_update_release(new_files: Dict[str, bytes], rate: int, manifest: bool) -> FakeRelease:
+    """The new version packaged like a real release, with the updater's own manifest builder"""
+    extra_assets = {}
+    if manifest:
+        with tempfile.TemporaryDirectory() as folder:
+            write_tree(Path(folder), new_files)
+            manifest_data = updater.build_manifest(Path(folder))
+        extra_assets[updater.ASSET_NAME + updater.MANIFEST_SUFFIX] = json.dumps(manifest_data).encode("utf-8")
+    return FakeRelease(build_package(new_files), rate, updater.ASSET_NAME, extra_assets)
+
+
+def tree_matches(install_dir: Path, files: Dict[str, bytes]) -> bool:
+    """The installation holds exactly ``files`` (save folder aside) and no update leftovers"""
+    installed = updater.scan_installation(install_dir, {updater.SAVE_DIR_NAME})
+    if set(installed) != set(files):
+        return False
+    return all(installed[name].read_bytes() == data for name, data in files.items())
+
+
+@contextlib.contextmanager
+def failing_rename(after: int):
+    """Make the ``after``-th move of a staged file into the installation fail"""
+    original = os.replace
+    moves = [0]
+
+    def replace(src, dst, *args, **kwargs):
+        if updater.UPDATE_WORK_DIR_NAME in Path(src).parts and "staging" in Path(src).parts:
+            moves[0] += 1
+            if moves[0] == after:
+                raise PermissionError(f"Simulated failure moving {Path(src).name}")
+        return original(src, dst, *args, **kwargs)
+
+    os.replace = replace
+    try:
+        yield
+    finally:
+        os.replace = original
+
+
+def run_update(install_dir: Path) -> None:
+    with updater.IntenseRPUpdater() as instance:
+        instance._perform_update_process(install_dir)
+
+
+def run_update_case(name: str, old_files: Dict[str, bytes], new_files: Dict[str, bytes], rate: int, work_dir: Path) -> dict:
+    release = make_update_release(new_files, rate, manifest=name != "update-full")
+    server = start_server(release)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    updater.RELEASES_URL = f"{base_url}/releases/latest"
+    updater.VERSION_URL = f"{base_url}/version.txt"
+    updater.DOWNLOAD_CACHE_DIR = work_dir / name / "cache"
+
+    install_dir = work_dir / name / "install"
+    shutil.rmtree(install_dir.parent, ignore_errors=True)
+    write_tree(install_dir, old_files)
+    save_data = os.urandom(1024)
+    write_tree(install_dir, {"save/config.enc": save_data})
+
+    expected = old_files if name == "update-rollback" else new_files
+    interrupted = None
+    output = io.StringIO()
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output):
+            if name == "update-rollback":
+                with failing_rename(after=3):
+                    run_update(install_dir)
+            elif name == "update-interrupted":
+                # The process "dies" before it can roll back, the journal stays behind
+                rollback = updater.UpdateTransaction.rollback
+                updater.UpdateTransaction.rollback = lambda self: None
+                try:
+                    with failing_rename(after=3):
+                        run_update(install_dir)
+                finally:
+                    updater.UpdateTransaction.rollback = rollback
+                interrupted = updater.UpdateTransaction(install_dir).is_interrupted()
+                run_update(install_dir)
+            else:
+                run_update(install_dir)
+    finally:
+        server.shutdown()
+    seconds = time.perf_counter() - started
+
+    ok = (
+        tree_matches(install_dir, expected)
+        and (install_dir / "save" / "config.enc").read_bytes() == save_data
+        and interrupted is not False
+    )
+    executable = install_dir / updater.EXECUTABLE_NAME
+    return {
+        "ok": ok,
+        "expected_ok": True,
+        "executable_mode": oct(executable.stat().st_mode & 0o777) if executable.exists() else None,
+        "interrupted_journal": interrupted,
+        "seconds": seconds,
+        "package_bytes": len(release.payload),
+        "changed_bytes": sum(len(data) for name, data in new_files.items() if old_files.get(name) != data),
+        "bytes_sent": release.bytes_sent,
+        "overhead_bytes": release.bytes_sent - len(release.payload),
+        "connections": release.connections,
+        "output_tail": output.getvalue().strip().splitlines()[-3:] if not ok else [],
+    }
+
+
+CASES = ["single", "parallel", "resume", "flaky", "bad-digest"]
+UPDATE_CASES = ["update-full", "update-delta", "update-rollback", "update-interrupted"]
+
+
+def cmd_run(args) -> int:
+    size = int(args.size_mib * 1024 * 1024)
+    rate = int(args.rate_mib * 1024 * 1024)
+    release = FakeRelease(os.urandom(size), rate, "intenserp-next-test-amd64.zip")
+    server = start_server(release)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    work_dir = Path(tempfile.mkdtemp(prefix="intenserp_updater_bench_"))
+
+    results: Dict[str, dict] = {}
+    failures = 0
+    try:
+        for name in CASES:
+            if args.filter and not any(f in name for f in args.filter):
+                continue
+            result = results[name] = run_case(name, release, base_url, work_dir, args.segments)
+            passed = result["ok"] == result["expected_ok"] and (result["intact"] or not result["expected_ok"])
+            failures += not passed
+            print(f"{name:<19} {'PASS' if passed else 'FAIL'}  {result['seconds']:>7.2f}s  "
+                  f"{result['throughput_mib_s']:>7.2f} MiB/s  sent {result['bytes_sent'] / 1024 / 1024:>7.2f} MiB  "
+                  f"overhead {result['overhead_bytes'] / 1024 / 1024:>6.2f} MiB  {result['connections']:>3} connections")
+        server.shutdown()
+
+        update_cases = [name for name in UPDATE_CASES if not args.filter or any(f in name for f in args.filter)]
+        if update_cases:
+            old_files, new_files = make_versions(size, args.files, args.changed)
+            for name in update_cases:
+                result = results[name] = run_update_case(name, old_files, new_files, rate, work_dir)
+                failures += not result["ok"]
+                print(f"{name:<19} {'PASS' if result['ok'] else 'FAIL'}  {result['seconds']:>7.2f}s  "
+                      f"sent {result['bytes_sent'] / 1024 / 1024:>7.2f} MiB (changes {result['changed_bytes'] / 1024 / 1024:.2f} MiB, "
+                      f"package {result['package_bytes'] / 1024 / 1024:.2f} MiB)  "
+                      f"{result['connections']:>3} connections")
+                for line in result["output_tail"]:
+                    print(f"    {line}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "benchmark": "updater_download",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size_mib": args.size_mib,
+            "rate_mib": args.rate_mib,
+            "segments": args.segments,
+            "files": args.files,
+            "changed": args.changed,
+        },
+        "cases": results,
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"updater-download-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved report to {output}")
+    return 1 if failures else 0
+
+
+def cmd_compare(args) -> int:
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["cases"]
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)["cases"]
+
+    regressions = []
+    print(f"{'case':<19} {'old':>9} {'new':>9} {'change':>8} {'overhead old':>13} {'overhead new':>13}")
+    for name, old in baseline.items():
+        new = candidate.get(name)
+        if not new:
+            continue
+        change = (new["seconds"] / old["seconds"] - 1.0) * 100.0 if old["seconds"] else 0.0
+        flag = ""
+        if change > args.threshold or (new["ok"] != new["expected_ok"]):
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:<19} {old['seconds']:>8.2f}s {new['seconds']:>8.2f}s {change:>+7.1f}% "
+              f"{old['overhead_bytes'] / 1024 / 1024:>11.2f}M {new['overhead_bytes'] / 1024 / 1024:>11.2f}M{flag}")
+
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed or failed")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+def cmd_serve(args) -> int:
+    old_files, new_files = make_versions(int(args.size_mib * 1024 * 1024), args.files, args.changed)
+    release = make_update_release(new_files, int(args.rate_mib * 1024 * 1024), manifest=True)
+    server = start_server(release, args.port)
+    print(f"Fake release on http://127.0.0.1:{server.server_address[1]}/releases/latest (Ctrl+C to stop)")
+    print(f"Package SHA-256: {release.sha256}")
+    if args.install:
+        write_tree(Path(args.install), old_files)
+        print(f"Previous version installed to {args.install}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Updater download engine against a local fake release")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the download cases")
+    run.add_argument("--size-mib", type=float, default=32, help="Package size")
+    run.add_argument("--rate-mib", type=float, default=8, help="Bandwidth per connection (0 = unlimited)")
+    run.add_argument("--segments", type=int, default=updater.DOWNLOAD_SEGMENTS, help="Connections for the parallel cases")
+    run.add_argument("--files", type=int, default=400, help="Files in the installation for the update cases")
+    run.add_argument("--changed", type=int, default=8, help="Files that change between the two versions")
+    run.add_argument("--filter", action="append", help="Only run cases whose name contains TEXT (repeatable)")
+    run.add_argument("--output", help="Where to write the JSON report")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two JSON reports")
+    compare.add_argument("baseline")
+    compare.add_argument("candidate")
+    compare.add_argument("--threshold", type=float, default=15.0, help="Allowed slowdown in percent")
+    compare.set_defaults(func=cmd_compare)
+
+    serve = sub.add_parser("serve", help="Only run the fake release server")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--size-mib", type=float, default=32, help="Package size")
+    serve.add_argument("--rate-mib", type=float, default=8, help="Bandwidth per connection (0 = unlimited)")
+    serve.add_argument("--files", type=int, default=400, help="Files in the package")
+    serve.add_argument("--changed", type=int, default=8, help="Files that differ from the previous version")
+    serve.add_argument("--install", metavar="DIR", help="Also write the previous version here, to update it by hand")
+    serve.set_defaults(func=cmd_serve)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+Synthetic SillyTavern-style request payloads shared by the benchmarks.
+"""
+
+import json
+from typing import Any, Dict, List
+
+CHARACTER_NAME = "Seraphina"
+USER_NAME = "Traveler"
+
+_SENTENCE = (
+    "The lantern light flickered across the old stone walls while the rain kept "
+    "drumming on the roof of the abandoned chapel. "
+)
+
+
+def _paragraph(index: int, sentences: int) -> str:
+    return f"[{index}] " + _SENTENCE * sentences
+
+
+def make_messages(count: int, sentences: int = 3, system_prompt: bool = True) -> List[Dict[str, Any]]:
+    """Build an alternating user/assistant history of ``count`` messages"""
+    messages: List[Dict[str, Any]] = []
+    if system_prompt:
+        messages.append({
+            "role": "system",
+            "content": (
+                f"You are {CHARACTER_NAME}. Stay in character.\n"
+                f"DATA1: \"{CHARACTER_NAME}\"\nDATA2: \"{USER_NAME}\""
+            ),
+        })
+    for i in range(count):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": _paragraph(i, sentences)})
+    if messages[-1]["role"] != "user":
+        messages.append({"role": "user", "content": _paragraph(count, sentences)})
+    return messages
+
+
+def make_chat_payload(count: int = 20, stream: bool = True, model: str = "intense-rp-next-1-chat") -> Dict[str, Any]:
+    """A ``/chat/completions`` body with ``count`` history messages"""
+    return {
+        "model": model,
+        "stream": stream,
+        "messages": make_messages(count),
+    }
+
+
+GROUP_MEMBERS = ("Seraphina", "Aldric", "Mirelle")
+
+
+def make_group_chat_payload(count: int = 200, stream: bool = True) -> Dict[str, Any]:
+    """A group chat: several named users/characters plus a custom Narrator role"""
+    messages: List[Dict[str, Any]] = [{
+        "role": "system",
+        "content": f"Group roleplay between {', '.join(GROUP_MEMBERS)} and the players.",
+    }]
+    players = ("Traveler", "Wren")
+    for i in range(count):
+        if i % 7 == 6:
+            messages.append({"role": "Narrator", "content": _paragraph(i, 2)})
+        elif i % 2 == 0:
+            messages.append({"role": "user", "name": players[(i // 2) % len(players)], "content": _paragraph(i, 3)})
+        else:
+            messages.append({"role": "assistant", "name": GROUP_MEMBERS[(i // 2) % len(GROUP_MEMBERS)],
+                             "content": _paragraph(i, 4)})
+    messages.append({"role": "user", "name": players[0], "content": "What do we do now? {{r1}}"})
+    return {"model": "intense-rp-next-1", "stream": stream, "messages": messages}
+
+
+def make_lorebook_payload(entries: int = 400, count: int = 40, stream: bool = True) -> Dict[str, Any]:
+    """Short history with a very large lorebook/world-info system block"""
+    lore = "\n".join(
+        f"[Entry {i}: Keyword{i}] " + _SENTENCE * 4
+        for i in range(entries)
+    )
+    payload = make_chat_payload(count, stream=stream)
+    payload["messages"].insert(1, {"role": "system", "content": "World Info:\n" + lore})
+    return payload
+
+
+def make_stream_items(think_tokens: int = 200, response_tokens: int = 400) -> List[str]:
+    """Raw ``/network/stream-data`` payloads shaped like a DeepSeek R1 response"""
+    items = [json.dumps({"p": "response/fragments", "o": "APPEND",
+                         "v": [{"type": "THINK", "content": "Let me think. "}]})]
+    items.extend(json.dumps({"v": f"thought{i} "}) for i in range(think_tokens))
+    items.append(json.dumps({"p": "response/fragments", "o": "APPEND",
+                             "v": [{"type": "RESPONSE", "content": "Seraphina "}]}))
+    items.extend(json.dumps({"v": f"word{i} "}) for i in range(response_tokens))
+    items.append(json.dumps({"p": "response/status", "o": "SET", "v": "FINISHED"}))
+    return items
@@ -11,25 +11,29 @@ libraries and frameworks, this file has only one external dependency and is insa
 lightweight thanks to that.
 """
 
+import io
 import os
 import sys
 import json
+import hashlib
 import shutil
 import zipfile
 import tempfile
 import platform
 import subprocess
 import requests
+import urllib3
 import argparse
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, Tuple, List
+import threading
 import time
 
 # ============================================================================
 # Constants and Configuration
 # ============================================================================
 
-VERSION = "v1.3"
+VERSION = "v1.4"
 REPO_OWNER = "LyubomirT"
 REPO_NAME = "intense-rp-next"
 GITHUB_API_BASE = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}"
@@ -38,6 +42,24 @@ VERSION_URL = f"{GITHUB_RAW_BASE}/version.txt"
 RELEASES_URL = f"{GITHUB_API_BASE}/releases/latest"
 SAVE_DIR_NAME = "save"
 
+# Download configuration
+# Kept outside the per-run temp directory so an interrupted download can be resumed by the next run
+DOWNLOAD_CACHE_DIR = Path(tempfile.gettempdir()) / "intenserp_updater_downloads"
+DOWNLOAD_SEGMENTS = 4                      # Parallel ranged requests for large files
+PARALLEL_MIN_SIZE = 8 * 1024 * 1024        # Smaller files use a single connection
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 4 * 1024 * 1024
+CHUNK_TARGET_SECONDS = 0.25                # Chunk size adapts so one read takes about this long
+DOWNLOAD_RETRIES = 5                       # Per segment, each retry resumes where it stopped
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+
+# Delta update configuration
+MANIFEST_SUFFIX = ".manifest.json"         # Release asset next to the package listing every file's hash
+UPDATE_WORK_DIR_NAME = ".intenserp-update" # Staging, backups and the journal, inside the installation
+DELTA_MAX_RATIO = 0.5                      # Download the full package when the changes are bigger than this share
+REMOTE_READ_AHEAD = 1024 * 1024            # Minimum range request when reading files out of the remote package
+
 # Platform-specific configuration
 CURRENT_PLATFORM = platform.system().lower()
 
@@ -375,6 +397,558 @@ class SystemUtils:
             size_bytes /= 1024.0
         return f"{size_bytes:.1f} TB"
 
+# ============================================================================
+# Download Engine
+# ============================================================================
+
+class DownloadError(Exception):
+    """A download failed (the partial file is kept for resuming when possible)"""
+
+
+class DownloadChangedError(DownloadError):
+    """The file on the server changed since the partial download started"""
+
+
+class SegmentedDownloader:
+    """Resumable downloader using HTTP range requests
+    
+    The file is written to ``<destination>.part``, with progress kept in ``<destination>.part.json``.
+    Large files are split into segments fetched in parallel. When the process is interrupted the next
+    run picks up every segment where it stopped, as long as the server still has the same file
+    (checked with ETag / If-Range). Servers without range support get a plain single download.
+    """
+    
+    def __init__(self, url: str, destination: Path, segments: Optional[int] = None):
+        self.url = url
+        self.destination = Path(destination)
+        self.part_path = self.destination.with_name(self.destination.name + ".part")
+        self.state_path = self.destination.with_name(self.destination.name + ".part.json")
+        self.segment_count = max(1, segments if segments is not None else DOWNLOAD_SEGMENTS)
+        
+        self.session = requests.Session()
+        self.size: Optional[int] = None
+        self.etag: Optional[str] = None
+        self.ranged = False
+        self.segments: List[Dict[str, int]] = []  # start, end (inclusive), done
+        self.resumed_bytes = 0
+        
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._errors: List[Exception] = []
+    
+    def download(self, progress_callback=None) -> None:
+        """Download to the destination, calls ``progress_callback(done, total)`` from this thread
+        
+        Raises:
+            DownloadError: The download failed, a later call resumes it if the server allows
+        """
+        try:
+            self._download(progress_callback)
+        except DownloadChangedError:
+            # Partial data belongs to an older file, start over once
+            self.discard()
+            self._download(progress_callback)
+    
+    def discard(self) -> None:
+        """Remove the partial file and its state"""
+        for path in (self.part_path, self.state_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+    
+    def _download(self, progress_callback) -> None:
+        self.destination.parent.mkdir(parents=True, exist_ok=True)
+        self._errors = []
+        self._stop.clear()
+        self._probe()
+        if not self._load_state():
+            self._plan()
+        
+        threads = [
+            threading.Thread(target=self._fetch_segment, args=(segment,), daemon=True)
+            for segment in self.segments if not self._segment_finished(segment)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        last_save = time.monotonic()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(0.1)
+                if progress_callback and self.size:
+                    progress_callback(self.downloaded(), self.size)
+                if self.ranged and time.monotonic() - last_save >= 1.0:
+                    self._save_state()
+                    last_save = time.monotonic()
+        except KeyboardInterrupt:
+            self._stop.set()
+            for thread in threads:
+                thread.join(READ_TIMEOUT)
+            self._save_state()
+            raise
+        
+        if self._errors:
+            self._save_state()
+            error = self._errors[0]
+            if isinstance(error, DownloadError):
+                raise error
+            raise DownloadError(str(error)) from error
+        
+        if self._stop.is_set() or not all(self._segment_finished(segment) for segment in self.segments if segment["end"] >= 0):
+            self._save_state()
+            raise DownloadError("Download stopped before it was complete")
+        
+        if progress_callback and self.size:
+            progress_callback(self.size, self.size)
+        
+        os.replace(self.part_path, self.destination)
+        try:
+            self.state_path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def downloaded(self) -> int:
+        with self._lock:
+            return sum(segment["done"] for segment in self.segments)
+    
+    def _probe(self) -> None:
+        """Ask for the first byte to learn the size and whether ranges work"""
+        headers = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
+        try:
+            with self.session.get(self.url, headers=headers, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+                response.raise_for_status()
+                etag = response.headers.get("ETag")
+                self.etag = etag if etag and not etag.startswith("W/") else None  # If-Range needs a strong ETag
+                content_range = response.headers.get("Content-Range", "")
+                if response.status_code == 206 and "/" in content_range and not content_range.endswith("/*"):
+                    self.ranged = True
+                    self.size = int(content_range.rsplit("/", 1)[1])
+                else:
+                    self.ranged = False
+                    length = response.headers.get("Content-Length")
+                    self.size = int(length) if length and length.isdigit() else None
+        except requests.RequestException as e:
+            raise DownloadError(f"Could not reach the download server: {e}") from e
+    
+    def _plan(self) -> None:
+        """Split the file into segments and create the partial file"""
+        self.resumed_bytes = 0
+        if self.ranged and self.size:
+            count = self.segment_count if self.size >= PARALLEL_MIN_SIZE else 1
+            step = -(-self.size // count)
+            self.segments = [
+                {"start": start, "end": min(start + step, self.size) - 1, "done": 0}
+                for start in range(0, self.size, step)
+            ]
+        else:
+            # No ranges, or an empty file
+            self.segments = [{"start": 0, "end": (self.size or 0) - 1 if self.size is not None else -1, "done": 0}]
+        
+        with open(self.part_path, "wb") as f:
+            if self.size:
+                f.truncate(self.size)
+        self._save_state()
+    
+    def _load_state(self) -> bool:
+        """Pick up a previous partial download of the same file"""
+        if not self.ranged or not self.state_path.exists() or not self.part_path.exists():
+            return False
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            same_file = (
+                state.get("url") == self.url
+                and state.get("size") == self.size
+                and (not self.etag or not state.get("etag") or state.get("etag") == self.etag)
+                and self.part_path.stat().st_size == self.size
+            )
+            if not same_file:
+                return False
+            self.segments = [
+                {"start": int(segment["start"]), "end": int(segment["end"]), "done": int(segment["done"])}
+                for segment in state["segments"]
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        
+        self.resumed_bytes = self.downloaded()
+        return True
+    
+    def _save_state(self) -> None:
+        if not self.ranged:
+            return
+        with self._lock:
+            state = {"url": self.url, "size": self.size, "etag": self.etag, "segments": [dict(s) for s in self.segments]}
+        temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        try:
+            temp_path.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(temp_path, self.state_path)
+        except OSError:
+            pass  # Only costs the ability to resume
+    
+    @staticmethod
+    def _segment_finished(segment: Dict[str, int]) -> bool:
+        return segment["end"] >= 0 and segment["done"] >= segment["end"] - segment["start"] + 1
+    
+    def _fetch_segment(self, segment: Dict[str, int]) -> None:
+        try:
+            self._fetch_segment_with_retries(segment)
+        except Exception as e:
+            self._fail(DownloadError(f"Unexpected download error: {e}"))
+    
+    def _fetch_segment_with_retries(self, segment: Dict[str, int]) -> None:
+        attempts = 0  # Failures in a row, one that still made progress starts the count over
+        while not self._stop.is_set() and not self._segment_finished(segment):
+            done_before = segment["done"]
+            try:
+                self._stream_segment(segment)
+                if segment["end"] < 0:
+                    return  # Unknown length, read until the server closed
+            except DownloadChangedError as e:
+                self._fail(e)
+                return
+            except (requests.RequestException, urllib3.exceptions.HTTPError, OSError, DownloadError) as e:
+                progressed = segment["done"] > done_before
+                attempts = 1 if progressed else attempts + 1
+                if attempts > DOWNLOAD_RETRIES:
+                    self._fail(DownloadError(f"Download failed after {DOWNLOAD_RETRIES} retries: {e}"))
+                    return
+                if not self.ranged:
+                    # Can't continue mid-file without ranges
+                    with self._lock:
+                        segment["done"] = 0
+                # A dropped connection gets retried right away, a server that keeps failing gets backed off
+                self._stop.wait(0.5 if progressed else min(2 ** attempts, 15))
+    
+    def _stream_segment(self, segment: Dict[str, int]) -> None:
+        offset = segment["start"] + segment["done"]
+        headers = {"Accept-Encoding": "identity"}
+        if self.ranged:
+            headers["Range"] = f"bytes={offset}-{segment['end']}"
+            if self.etag:
+                headers["If-Range"] = self.etag
+        
+        with self.session.get(self.url, headers=headers, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)) as response:
+            response.raise_for_status()
+            if self.ranged and response.status_code != 206:
+                raise DownloadChangedError("The file changed on the server")
+            
+            chunk_size = MIN_CHUNK_SIZE
+            with open(self.part_path, "r+b" if self.ranged else "wb") as f:
+                f.seek(offset if self.ranged else 0)
+                while not self._stop.is_set():
+                    remaining = segment["end"] - segment["start"] + 1 - segment["done"] if segment["end"] >= 0 else chunk_size
+                    if remaining <= 0:
+                        return
+                    
+                    started = time.monotonic()
+                    buffer = bytearray()
+                    try:
+                        self._fill(response, buffer, min(chunk_size, remaining))
+                    finally:
+                        # Whatever arrived before a dropped connection is kept
+                        if buffer:
+                            f.write(buffer)
+                            f.flush()  # Progress is only recorded for data the OS has
+                            with self._lock:
+                                segment["done"] += len(buffer)
+                    
+                    if len(buffer) < min(chunk_size, remaining):
+                        if segment["end"] < 0:
+                            return
+                        raise DownloadError("Connection closed before the segment was complete")
+                    chunk_size = self._next_chunk_size(chunk_size, len(buffer), time.monotonic() - started)
+    
+    @staticmethod
+    def _fill(response, buffer: bytearray, size: int) -> None:
+        """Read up to ``size`` bytes into ``buffer``, stopping early only at the end of the body"""
+        read = getattr(response.raw, "read1", None) or response.raw.read
+        while len(buffer) < size:
+            data = read(size - len(buffer), decode_content=True)
+            if not data:
+                return
+            buffer += data
+    
+    @staticmethod
+    def _next_chunk_size(chunk_size: int, received: int, seconds: float) -> int:
+        """Grow the chunk on fast links (fewer writes), shrink it on slow ones (responsive progress)"""
+        if received < chunk_size:
+            return chunk_size
+        if seconds < CHUNK_TARGET_SECONDS / 2:
+            return min(chunk_size * 2, MAX_CHUNK_SIZE)
+        if seconds > CHUNK_TARGET_SECONDS * 2:
+            return max(chunk_size // 2, MIN_CHUNK_SIZE)
+        return chunk_size
+    
+    def _fail(self, error: Exception) -> None:
+        with self._lock:
+            self._errors.append(error)
+        self._stop.set()
+
+
+def sha256_file(path: Path) -> str:
+    """Hex SHA-256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# ============================================================================
+# Delta Updates
+# ============================================================================
+
+class RollbackError(Exception):
+    """A failed update could not be undone, the backup is left in place for the next run"""
+
+
+class RemoteFile(io.RawIOBase):
+    """Read-only, seekable view of a file on a server, read with HTTP range requests
+    
+    Enough for ``zipfile`` to list a remote package and read single members out of it without
+    downloading the rest. Every request reads ahead, so neighbouring members share one request.
+    """
+    
+    def __init__(self, url: str, size: int, read_ahead: int = REMOTE_READ_AHEAD):
+        super().__init__()
+        self.origin_url = url
+        self.url = url
+        self.size = size
+        self.read_ahead = read_ahead
+        self.session = requests.Session()
+        self.bytes_fetched = 0
+        self.requests_made = 0
+        self._position = 0
+        self._buffer = b""
+        self._buffer_start = 0
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+    
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.size - self._position
+        size = min(size, self.size - self._position)
+        if size <= 0:
+            return b""
+        
+        end = self._position + size
+        if not (self._buffer_start <= self._position and end <= self._buffer_start + len(self._buffer)):
+            self._fetch(self._position, max(end, min(self._position + self.read_ahead, self.size)))
+        
+        offset = self._position - self._buffer_start
+        data = self._buffer[offset:offset + size]
+        self._position += len(data)
+        return data
+    
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def _fetch(self, start: int, end: int) -> None:
+        """Load bytes ``start`` up to ``end`` (exclusive) into the buffer"""
+        headers = {"Range": f"bytes={start}-{end - 1}", "Accept-Encoding": "identity"}
+        for attempt in range(DOWNLOAD_RETRIES + 1):
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                self.requests_made += 1
+                if response.status_code >= 400 and self.url != self.origin_url:
+                    # Signed CDN links expire, start again from the release link
+                    self.url = self.origin_url
+                    continue
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise DownloadError("The server doesn't support partial downloads")
+                if len(response.content) != end - start:
+                    raise requests.RequestException("Incomplete range response")
+                
+                self.url = response.url  # Skip the redirect next time
+                self.bytes_fetched += len(response.content)
+                self._buffer = response.content
+                self._buffer_start = start
+                return
+            except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
+                if attempt >= DOWNLOAD_RETRIES:
+                    raise DownloadError(f"Reading the remote package failed: {e}") from e
+                time.sleep(min(2 ** attempt, 15))
+        raise DownloadError("Reading the remote package failed")
+
+
+def safe_relative_path(name: str) -> Optional[str]:
+    """Normalize a package path to ``a/b/c`` form, None if it would escape the installation"""
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return "/".join(parts)
+
+
+def package_members(archive: zipfile.ZipFile) -> Dict[str, zipfile.ZipInfo]:
+    """Files in a release package by installation-relative path (without the top-level folder)"""
+    infos = [info for info in archive.infolist() if not info.is_dir() and not info.filename.endswith(("/", "\\"))]
+    names = [info.filename.replace("\\", "/") for info in infos]  # Windows PowerShell writes backslashes
+    
+    top_levels = {name.split("/", 1)[0] for name in names}
+    strip_top_level = len(top_levels) == 1 and all("/" in name for name in names)
+    
+    members = {}
+    for info, name in zip(infos, names):
+        relative = safe_relative_path(name.split("/", 1)[1] if strip_top_level else name)
+        if relative:
+            members[relative] = info
+    return members
+
+
+def extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path) -> None:
+    """Extract one member to ``target``, keeping its Unix permissions (the executable bit)"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with archive.open(info) as source, open(target, "wb") as f:
+        shutil.copyfileobj(source, f, 1024 * 1024)
+    
+    mode = (info.external_attr >> 16) & 0o777
+    if mode and os.name != "nt":
+        os.chmod(target, mode)
+
+
+def build_manifest(root: Path) -> Dict[str, Any]:
+    """Manifest of a release folder: size and SHA-256 of every file"""
+    root = Path(root)
+    files = {}
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            files[path.relative_to(root).as_posix()] = {"size": path.stat().st_size, "sha256": sha256_file(path)}
+    
+    version_file = root / "version.txt"
+    version = version_file.read_text(encoding="utf-8").strip() if version_file.is_file() else None
+    return {"format": 1, "version": version, "files": files}
+
+
+def scan_installation(install_dir: Path, skip_names: set) -> Dict[str, Path]:
+    """Files of an installation by relative path, leaving out the top-level names in ``skip_names``"""
+    files = {}
+    for item in install_dir.iterdir():
+        if item.name in skip_names:
+            continue
+        candidates = [item] if item.is_file() else (path for path in item.rglob("*") if path.is_file())
+        for path in candidates:
+            files[path.relative_to(install_dir).as_posix()] = path
+    return files
+
+
+class UpdateTransaction:
+    """Swaps a set of files into an installation so that it can be undone
+    
+    New files are staged in ``<install>/.intenserp-update/staging`` first. ``commit`` moves every
+    replaced or removed file into ``backup/`` and the staged ones into place, all renames within the
+    installation's drive. A journal is written before anything is touched: when a step fails the
+    installation is rolled back right away, and when the updater itself was killed the next run on this
+    installation rolls it back.
+    """
+    
+    def __init__(self, install_dir: Path):
+        self.install_dir = install_dir
+        self.work_dir = install_dir / UPDATE_WORK_DIR_NAME
+        self.staging_dir = self.work_dir / "staging"
+        self.backup_dir = self.work_dir / "backup"
+        self.journal_path = self.work_dir / "journal.json"
+    
+    def is_interrupted(self) -> bool:
+        return self.journal_path.exists()
+    
+    def begin(self) -> None:
+        self.discard()
+        self.staging_dir.mkdir(parents=True)
+    
+    def discard(self) -> None:
+        if self.work_dir.exists():
+            shutil.rmtree(self.work_dir)
+    
+    def stage_path(self, relative: str) -> Path:
+        return self.staging_dir / relative
+    
+    def commit(self, new_paths: List[str], removed_paths: List[str]) -> None:
+        """Put the staged ``new_paths`` in place and delete ``removed_paths``, or leave everything as it was
+        
+        Raises:
+            Exception: Whatever stopped the update, after the rollback
+        """
+        old_paths = [path for path in sorted(set(new_paths) | set(removed_paths)) if (self.install_dir / path).exists()]
+        journal = {"new": sorted(new_paths), "old": old_paths}
+        temp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        temp_path.write_text(json.dumps(journal), encoding="utf-8")
+        os.replace(temp_path, self.journal_path)
+        
+        try:
+            for path in old_paths:
+                backup = self.backup_dir / path
+                backup.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self.install_dir / path, backup)
+            
+            for path in journal["new"]:
+                target = self.install_dir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(self.stage_path(path), target)
+        except BaseException as e:
+            try:
+                self.rollback()
+            except Exception as rollback_error:
+                raise RollbackError(f"{e} (restoring the previous files failed too: {rollback_error})") from rollback_error
+            raise
+        
+        # Committed, from here on only cleanup. A locked leftover (antivirus, an open file on Windows)
+        # must not be reported as a failed install
+        try:
+            self.journal_path.unlink()
+            self.discard()
+            self._prune_empty_dirs(removed_paths)
+        except OSError as e:
+            UIWidgets.print_warning(f"The new version is installed, but cleaning up {self.work_dir} failed: {e}")
+            UIWidgets.print_info("It's removed by the next update, or you can delete it yourself")
+    
+    def rollback(self) -> None:
+        """Undo a started commit using the journal"""
+        journal = json.loads(self.journal_path.read_text(encoding="utf-8"))
+        
+        for path in journal["new"]:
+            # Placed already when it's no longer staged
+            target = self.install_dir / path
+            if not self.stage_path(path).exists() and target.exists():
+                target.unlink()
+        
+        for path in journal["old"]:
+            backup = self.backup_dir / path
+            if backup.exists():
+                target = self.install_dir / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(backup, target)
+        
+        self.journal_path.unlink()
+        self.discard()
+    
+    def _prune_empty_dirs(self, removed_paths: List[str]) -> None:
+        for path in removed_paths:
+            parent = (self.install_dir / path).parent
+            while parent != self.install_dir:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break  # Not empty (or already gone)
+                parent = parent.parent
+
 # ============================================================================
 # GitHub API Interface
 # ============================================================================
@@ -417,28 +991,102 @@ class GitHubAPI:
         return None
     
     @staticmethod
-    def download_file(url: str, destination: Path, progress_callback=None) -> bool:
-        """Download a file with progress tracking"""
-        try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded_size = 0
+    def get_asset_sha256(release_data: Dict[str, Any], asset: Dict[str, Any]) -> Optional[str]:
+        """Published SHA-256 of an asset
+        
+        Uses the digest GitHub reports for the asset, falling back to a ``<name>.sha256`` or
+        ``SHA256SUMS`` file attached to the release.
+        """
+        digest = asset.get('digest') or ""
+        if digest.lower().startswith("sha256:"):
+            return digest.split(":", 1)[1].strip().lower()
+        
+        checksum_assets = {item['name']: item['browser_download_url'] for item in release_data.get('assets', [])}
+        for checksum_name in (f"{asset['name']}.sha256", "SHA256SUMS"):
+            checksum_url = checksum_assets.get(checksum_name)
+            if not checksum_url:
+                continue
+            try:
+                response = requests.get(checksum_url, timeout=10)
+                response.raise_for_status()
+            except requests.RequestException as e:
+                UIWidgets.print_warning(f"Failed to fetch {checksum_name}: {e}")
+                continue
             
-            with open(destination, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        if progress_callback and total_size > 0:
-                            progress_callback(downloaded_size, total_size)
+            # "<hex>  <name>" lines (sha256sum format), a .sha256 file may hold just the hex
+            for line in response.text.splitlines():
+                parts = line.strip().split()
+                if not parts or len(parts[0]) != 64:
+                    continue
+                if len(parts) == 1 or parts[-1].lstrip("*") == asset['name']:
+                    return parts[0].lower()
+        return None
+    
+    @staticmethod
+    def get_asset_manifest(release_data: Dict[str, Any], asset: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """File manifest published next to a package (``<name>.manifest.json``), None if there is none"""
+        manifest_name = asset['name'] + MANIFEST_SUFFIX
+        for item in release_data.get('assets', []):
+            if item['name'] != manifest_name:
+                continue
+            try:
+                response = requests.get(item['browser_download_url'], timeout=30)
+                response.raise_for_status()
+                manifest = response.json()
+            except (requests.RequestException, ValueError) as e:
+                UIWidgets.print_warning(f"Failed to fetch the file manifest: {e}")
+                return None
             
-            return True
-        except requests.RequestException as e:
+            files = manifest.get('files') if isinstance(manifest, dict) else None
+            if not isinstance(files, dict) or any(safe_relative_path(path) != path for path in files):
+                UIWidgets.print_warning("Ignoring an invalid file manifest")
+                return None
+            return manifest
+        return None
+    
+    @staticmethod
+    def download_file(url: str, destination: Path, progress_callback=None, expected_sha256: Optional[str] = None) -> bool:
+        """Download a file with progress tracking, resuming an earlier partial download
+        
+        When ``expected_sha256`` is given the file is only kept if it matches, and an already
+        downloaded copy that matches is reused without downloading again.
+        """
+        if expected_sha256 and destination.exists():
+            if sha256_file(destination) == expected_sha256:
+                UIWidgets.print_info("Using the previously downloaded package")
+                return True
+            destination.unlink()
+        
+        downloader = SegmentedDownloader(url, destination)
+        try:
+            downloader.download(progress_callback)
+        except DownloadError as e:
+            print()
             UIWidgets.print_error(f"Download failed: {e}")
+            if downloader.part_path.exists() and downloader.ranged:
+                UIWidgets.print_info("Run the updater again to resume the download")
             return False
+        
+        if downloader.resumed_bytes:
+            UIWidgets.print_info(f"Resumed after {SystemUtils.format_size(downloader.resumed_bytes)}")
+        
+        if not expected_sha256:
+            UIWidgets.print_warning("No published SHA-256 for this package, skipping verification")
+            return True
+        
+        actual_sha256 = sha256_file(destination)
+        if actual_sha256 != expected_sha256:
+            UIWidgets.print_error("Downloaded package doesn't match its published SHA-256, it was deleted")
+            UIWidgets.print_info(f"Expected {expected_sha256}")
+            UIWidgets.print_info(f"Got      {actual_sha256}")
+            try:
+                destination.unlink()
+            except OSError:
+                pass
+            return False
+        
+        UIWidgets.print_success("SHA-256 verified")
+        return True
 
 # ============================================================================
 # Core Updater Logic
@@ -626,14 +1274,15 @@ class IntenseRPUpdater:
         
         # Download
         download_url = platform_asset['browser_download_url']
-        zip_path = Path(self.temp_dir) / ASSET_NAME
+        zip_path = DOWNLOAD_CACHE_DIR / ASSET_NAME
+        expected_sha256 = GitHubAPI.get_asset_sha256(release_data, platform_asset)
         
         UIWidgets.print_step(1, "Downloading package...")
         
         def download_progress(current, total):
             UIWidgets.print_progress_bar(current, total, prefix="  Download: ")
         
-        if not GitHubAPI.download_file(download_url, zip_path, download_progress):
+        if not GitHubAPI.download_file(download_url, zip_path, download_progress, expected_sha256):
             return
         
         UIWidgets.print_success("Download completed")
@@ -897,6 +1546,18 @@ class IntenseRPUpdater:
     
     def _perform_update_process(self, install_dir: Path, skip_updater_root: Optional[str] = None, manual_mode: bool = False) -> None:
         """Perform the actual update process (shared between manual and auto modes)"""
+        # An update that was cut off is rolled back before anything else
+        transaction = UpdateTransaction(install_dir)
+        if transaction.is_interrupted():
+            UIWidgets.print_warning("The last update of this installation was interrupted, restoring the previous version...")
+            try:
+                transaction.rollback()
+                UIWidgets.print_success("Previous version restored")
+            except Exception as e:
+                UIWidgets.print_error(f"Failed to restore the previous version: {e}")
+                UIWidgets.print_info(f"The replaced files are in: {transaction.backup_dir}")
+                return
+        
         # Backup save directory
         save_dir = install_dir / SAVE_DIR_NAME
         backup_save_dir = None
@@ -930,84 +1591,53 @@ class IntenseRPUpdater:
             return
         
         latest_version = GitHubAPI.get_latest_version() or "unknown"
-        download_url = platform_asset['browser_download_url']
-        zip_path = Path(self.temp_dir) / ASSET_NAME
-        
-        def download_progress(current, total):
-            UIWidgets.print_progress_bar(current, total, prefix="  Download: ")
-        
-        if not GitHubAPI.download_file(download_url, zip_path, download_progress):
-            return
-        
-        UIWidgets.print_success("Download completed")
+        zip_path = DOWNLOAD_CACHE_DIR / ASSET_NAME
         
-        # Remove old installation (except save directory)
-        UIWidgets.print_step(4, "Removing old installation...")
+        skip_names = {SAVE_DIR_NAME, UPDATE_WORK_DIR_NAME}
+        if skip_updater_root:
+            skip_names.add(skip_updater_root)
+        installed_files = scan_installation(install_dir, skip_names)
         
+        # Only the changed files when the release has a manifest, the full package otherwise
         try:
-            for item in install_dir.iterdir():
-                if item.name == SAVE_DIR_NAME:
-                    continue  # Skip save directory
-                    
-                # Skip updater root if detected
-                if skip_updater_root and item.name == skip_updater_root:
-                    UIWidgets.print_info(f"Preserving updater path: {item.name}")
-                    continue
-                
-                if item.is_dir():
-                    shutil.rmtree(item)
-                else:
-                    item.unlink()
-            
-            UIWidgets.print_success("Old installation removed")
-        except Exception as e:
-            UIWidgets.print_error(f"Failed to remove old installation: {e}")
-            return
-        
-        # Extract new version
-        UIWidgets.print_step(5, "Installing new version...")
-        
-        try:
-            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                total_files = len(zip_ref.namelist())
-                
-                for i, file in enumerate(zip_ref.namelist()):
-                    zip_ref.extract(file, self.temp_dir)
-                    UIWidgets.print_progress_bar(i + 1, total_files, prefix="  Extract: ")
-            
-            UIWidgets.print_success("Extraction completed")
-        except Exception as e:
-            UIWidgets.print_error(f"Extraction failed: {e}")
+            transaction.begin()
+            staged = self._stage_delta_update(transaction, release_data, platform_asset, installed_files, skip_names)
+            if staged is None:
+                transaction.begin()  # Drop whatever a failed delta left behind
+                staged = self._stage_full_update(transaction, release_data, platform_asset, zip_path, skip_names)
+        except OSError as e:
+            UIWidgets.print_error(f"Failed to prepare the update: {e}")
+            staged = None
+        
+        if staged is None:
+            transaction.discard()
             return
+        package_paths, new_paths = staged
         
-        # Find extracted folder and move contents
-        extracted_folder = None
-        for item in Path(self.temp_dir).iterdir():
-            if item.is_dir() and item.name.startswith("intenserp-next"):
-                extracted_folder = item
-                break
+        # Swap the files in, the old version comes back if anything fails
+        UIWidgets.print_step(4, "Installing new version...")
         
-        if not extracted_folder:
-            UIWidgets.print_error("Could not find extracted IntenseRP folder")
-            return
+        removed_paths = sorted(path for path in installed_files if path not in package_paths)
+        if skip_updater_root:
+            UIWidgets.print_info(f"Preserving updater path: {skip_updater_root}")
         
-        # Copy new files to installation directory
         try:
-            for item in extracted_folder.iterdir():
-                dest = install_dir / item.name
-                if item.is_dir():
-                    shutil.copytree(item, dest, dirs_exist_ok=True)
-                else:
-                    shutil.copy2(item, dest)
-            
-            UIWidgets.print_success("New version installed")
+            transaction.commit(new_paths, removed_paths)
+        except RollbackError as e:
+            UIWidgets.print_error(f"Installation failed: {e}")
+            UIWidgets.print_info(f"The replaced files are in: {transaction.backup_dir}")
+            UIWidgets.print_info("Run the update again to retry restoring them")
+            return
         except Exception as e:
             UIWidgets.print_error(f"Installation failed: {e}")
+            UIWidgets.print_success("All changes were rolled back, the previous version is untouched")
             return
         
-        # Restore save directory
-        if backup_save_dir and backup_save_dir.exists():
-            UIWidgets.print_step(6, "Restoring save directory...")
+        UIWidgets.print_success(f"New version installed ({len(new_paths)} files updated, {len(removed_paths)} removed)")
+        
+        # Restore save directory (the update leaves it alone, this only covers it going missing)
+        if backup_save_dir and backup_save_dir.exists() and not (install_dir / SAVE_DIR_NAME).exists():
+            UIWidgets.print_step(5, "Restoring save directory...")
             
             try:
                 final_save_dir = install_dir / SAVE_DIR_NAME
@@ -1021,10 +1651,11 @@ class IntenseRPUpdater:
                 UIWidgets.print_warning("Your save data backup is located at: " + str(backup_save_dir))
         
         # Cleanup
-        UIWidgets.print_step(7, "Cleaning up...")
+        UIWidgets.print_step(6, "Cleaning up...")
         
         try:
-            zip_path.unlink()
+            if zip_path.exists():
+                zip_path.unlink()
             UIWidgets.print_success("Cleanup completed")
         except:
             pass
@@ -1034,6 +1665,101 @@ class IntenseRPUpdater:
         UIWidgets.print_success(f"IntenseRP Next updated to v{latest_version}!")
         UIWidgets.print_info(f"Installation location: {install_dir}")
         UIWidgets.print_info("You can now run the updated application")
+    
+    def _stage_delta_update(self, transaction: UpdateTransaction, release_data: Dict[str, Any], asset: Dict[str, Any],
+                            installed_files: Dict[str, Path], skip_names: set) -> Optional[Tuple[set, List[str]]]:
+        """Stage only the files that differ from the installation, reading them out of the remote package
+        
+        Returns:
+            (every path in the new version, paths to replace), or None to use the full package
+        """
+        manifest = GitHubAPI.get_asset_manifest(release_data, asset)
+        if not manifest:
+            UIWidgets.print_info("No file manifest for this release, downloading the full package")
+            return None
+        
+        UIWidgets.print_info("Comparing installed files with the new version...")
+        files = {path: entry for path, entry in manifest['files'].items() if path.split("/", 1)[0] not in skip_names}
+        changed = [
+            path for path, entry in files.items()
+            if path not in installed_files
+            or installed_files[path].stat().st_size != entry.get('size')
+            or sha256_file(installed_files[path]) != entry.get('sha256')
+        ]
+        if not changed:
+            UIWidgets.print_success("All files are already up to date")
+            return set(files), []
+        
+        try:
+            remote = RemoteFile(asset['browser_download_url'], asset['size'])
+            with zipfile.ZipFile(remote) as archive:
+                members = package_members(archive)
+                missing = [path for path in changed if path not in members]
+                if missing:
+                    raise DownloadError(f"{missing[0]} is in the manifest but not in the package")
+                
+                delta_size = sum(members[path].compress_size for path in changed)
+                if delta_size > asset['size'] * DELTA_MAX_RATIO:
+                    UIWidgets.print_info(f"{len(changed)} files changed ({SystemUtils.format_size(delta_size)}), downloading the full package")
+                    return None
+                UIWidgets.print_info(
+                    f"{len(changed)} of {len(files)} files changed, downloading "
+                    f"{SystemUtils.format_size(delta_size)} instead of {SystemUtils.format_size(asset['size'])}"
+                )
+                
+                done = 0
+                for path in sorted(changed, key=lambda path: members[path].header_offset):
+                    info = members[path]
+                    # One request per file: local header, name, extra field (may be longer than the central one) and data
+                    remote.read_ahead = 30 + len(info.orig_filename.encode("utf-8")) + len(info.extra) + info.compress_size + 1024
+                    target = transaction.stage_path(path)
+                    extract_member(archive, info, target)
+                    if sha256_file(target) != files[path]['sha256']:
+                        raise DownloadError(f"{path} doesn't match its hash in the manifest")
+                    done += members[path].compress_size
+                    UIWidgets.print_progress_bar(done, delta_size, prefix="  Download: ")
+        except (DownloadError, zipfile.BadZipFile, OSError) as e:
+            print()
+            UIWidgets.print_warning(f"Delta update failed ({e}), downloading the full package instead")
+            return None
+        
+        UIWidgets.print_success(f"Downloaded {len(changed)} changed files ({SystemUtils.format_size(remote.bytes_fetched)})")
+        return set(files), changed
+    
+    def _stage_full_update(self, transaction: UpdateTransaction, release_data: Dict[str, Any], asset: Dict[str, Any],
+                           zip_path: Path, skip_names: set) -> Optional[Tuple[set, List[str]]]:
+        """Download the whole package and stage all of its files
+        
+        Returns:
+            (every path in the new version, paths to replace), or None if it failed
+        """
+        expected_sha256 = GitHubAPI.get_asset_sha256(release_data, asset)
+        
+        def download_progress(current, total):
+            UIWidgets.print_progress_bar(current, total, prefix="  Download: ")
+        
+        if not GitHubAPI.download_file(asset['browser_download_url'], zip_path, download_progress, expected_sha256):
+            return None
+        
+        UIWidgets.print_success("Download completed")
+        
+        try:
+            with zipfile.ZipFile(zip_path, 'r') as archive:
+                members = package_members(archive)
+                paths = [path for path in members if path.split("/", 1)[0] not in skip_names]
+                for i, path in enumerate(paths):
+                    extract_member(archive, members[path], transaction.stage_path(path))
+                    UIWidgets.print_progress_bar(i + 1, len(paths), prefix="  Extract: ")
+        except (zipfile.BadZipFile, OSError) as e:
+            UIWidgets.print_error(f"Extraction failed: {e}")
+            return None
+        
+        if not paths:
+            UIWidgets.print_error("The downloaded package is empty")
+            return None
+        
+        UIWidgets.print_success("Extraction completed")
+        return set(paths), paths
 
 # ============================================================================
 # Command-Line Argument Parsing
@@ -1063,6 +1789,32 @@ Examples:
         help="Enable automatic update mode (requires --exe-path)"
     )
     
+    parser.add_argument(
+        "--segments",
+        type=int,
+        metavar="N",
+        help=f"Parallel connections for large downloads (default {DOWNLOAD_SEGMENTS}, 1 disables)"
+    )
+    
+    parser.add_argument(
+        "--release-url",
+        metavar="URL",
+        help="Read release information from this URL instead of GitHub (mirrors, testing)"
+    )
+    
+    parser.add_argument(
+        "--version-url",
+        metavar="URL",
+        help="Read the latest version number from this URL instead of GitHub"
+    )
+    
+    parser.add_argument(
+        "--make-manifest",
+        nargs=2,
+        metavar=("DIR", "OUTPUT"),
+        help="Write the file manifest of a release folder (used when publishing releases)"
+    )
+    
     parser.add_argument(
         "--version", 
         action="version", 
@@ -1081,6 +1833,21 @@ def main():
         # Parse command-line arguments
         args = parse_arguments()
         
+        global DOWNLOAD_SEGMENTS, RELEASES_URL, VERSION_URL
+        if args.segments:
+            DOWNLOAD_SEGMENTS = max(1, args.segments)
+        if args.release_url:
+            RELEASES_URL = args.release_url
+        if args.version_url:
+            VERSION_URL = args.version_url
+        
+        if args.make_manifest:
+            folder, output = args.make_manifest
+            manifest = build_manifest(Path(folder))
+            Path(output).write_text(json.dumps(manifest, indent=1), encoding="utf-8")
+            print(f"Wrote manifest of {len(manifest['files'])} files to {output}")
+            return
+        
         # Enable terminal color support (cross-platform)
         if platform.system() == "Windows":
             # Enable Windows terminal color support
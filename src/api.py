@@ -1,14 +1,23 @@
-from flask import Flask, jsonify, request, Response
+from flask import Flask, jsonify, request, Response, g
 from flask_cors import CORS
 import utils.webdriver_utils as selenium
 import utils.deepseek_driver as deepseek
 import socket, time, threading, json
 from typing import Generator
-from waitress import serve
 from core import get_state_manager, StateEvent
-from pipeline.message_pipeline import MessagePipeline, ProcessingError
+from pipeline.message_pipeline import MessagePipeline, ProcessingError, get_message_pipeline
 from utils.message_dump_manager import get_dump_manager
+from utils.conversation_tracker import get_conversation_tracker, ConversationFingerprint
+from utils.api_key_index import get_api_key_index
+from utils.rate_limiter import get_rate_limiter
+from utils.server_pools import start_ingest_server, create_api_server, get_pool_stats, DEFAULT_API_THREADS, DEFAULT_INGEST_THREADS, SERVER_MODE_THREADED, INGEST_PREFIX
+from utils.stream_body import StreamBody, StreamNotifier, IDLE, ASYNC_IDLE_KEY
+from processors.context_processor import count_tokens
+from utils.metrics import get_metrics, metric_lines, instrument_webdriver
+from utils.tracing import get_tracer, span, clear_current_trace, format_timeline
+from utils.profiler import get_profiler, ProfilerBusyError, DEFAULT_INTERVAL
 from functools import wraps
+from collections.abc import Mapping
 import time
 
 app = Flask(__name__)
@@ -31,6 +40,9 @@ network_data = {
     'censorship_detected': False  # Track if censorship was detected in stream
 }
 
+# Wakes up responses waiting on network_data whenever the extension posts something
+network_notifier = StreamNotifier()
+
 # Note for self: STOP CONFUSING THE NETWORK PARAMETER NAMES
 
 def detect_censorship(json_data: dict) -> bool:
@@ -73,16 +85,28 @@ def detect_censorship(json_data: dict) -> bool:
         print(f"Error in censorship detection: {e}")
         return False
 
+# =============================================================================================================================
+# Request Configuration
+# =============================================================================================================================
+
+def get_request_config():
+    """Config snapshot for the current request, taken once so every lookup sees the same version"""
+    snapshot = getattr(g, 'config_snapshot', None)
+    if snapshot is None:
+        snapshot = get_state_manager().config_snapshot()
+        g.config_snapshot = snapshot
+    return snapshot
+
 # =============================================================================================================================
 # Authentication Functions
 # =============================================================================================================================
 
-def get_valid_api_keys():
+def get_valid_api_keys(config=None):
     """Get list of valid API keys from configuration"""
-    state = get_state_manager()
-    api_keys_config = state.get_config_value("security.api_keys", {})
+    config = config or get_state_manager().config_snapshot()
+    api_keys_config = config.get("security.api_keys", {})
 
-    if not api_keys_config or not isinstance(api_keys_config, dict):
+    if not api_keys_config or not isinstance(api_keys_config, Mapping):
         return []
 
     # Extract API key values from the name:key dictionary
@@ -93,48 +117,37 @@ def get_valid_api_keys():
 
     return valid_keys
 
-def get_api_key_name(provided_key):
+def get_api_key_name(provided_key, config=None):
     """Get the name associated with an API key for logging purposes"""
-    if not provided_key:
-        return "unknown"
-
-    state = get_state_manager()
-    api_keys_config = state.get_config_value("security.api_keys", {})
-
-    if not api_keys_config or not isinstance(api_keys_config, dict):
-        return "unknown"
-
-    # Find the name for the provided key
-    for name, key in api_keys_config.items():
-        if key and isinstance(key, str) and key.strip() == provided_key.strip():
-            return name
+    config = config or get_state_manager().config_snapshot()
+    return get_api_key_index().lookup(provided_key, config) or "unknown"
 
-    return "unknown"
-
-def is_api_auth_enabled():
+def is_api_auth_enabled(config=None):
     """Check if API authentication is enabled"""
-    state = get_state_manager()
-    return state.get_config_value("security.api_auth_enabled", False)
+    config = config or get_state_manager().config_snapshot()
+    return config.get("security.api_auth_enabled", False)
 
-def validate_api_key(provided_key):
+def validate_api_key(provided_key, config=None):
     """Validate provided API key against configured keys"""
-    if not provided_key:
-        return False
-    
-    valid_keys = get_valid_api_keys()
-    return provided_key in valid_keys
+    config = config or get_state_manager().config_snapshot()
+    return get_api_key_index().lookup(provided_key, config) is not None
 
 def require_auth(f):
     """Decorator to require API key authentication"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        config = get_request_config()
+        
         # Skip authentication if not enabled
-        if not is_api_auth_enabled():
+        if not is_api_auth_enabled(config):
             return f(*args, **kwargs)
         
+        key_index = get_api_key_index()
+
         # Check for Authorization header
         auth_header = request.headers.get('Authorization')
         if not auth_header:
+            key_index.record_auth_failure()
             return jsonify({
                 "error": {
                     "message": "Missing Authorization header. Please provide Bearer token.",
@@ -145,6 +158,7 @@ def require_auth(f):
         
         # Extract Bearer token
         if not auth_header.startswith('Bearer '):
+            key_index.record_auth_failure()
             return jsonify({
                 "error": {
                     "message": "Invalid Authorization header format. Use: Authorization: Bearer <your-api-key>",
@@ -155,8 +169,10 @@ def require_auth(f):
         
         api_key = auth_header[7:]  # Remove "Bearer " prefix
         
-        # Validate API key
-        if not validate_api_key(api_key):
+        # Validate API key (single digest lookup, also gives the key name)
+        key_name = key_index.lookup(api_key, config)
+        if key_name is None:
+            key_index.record_auth_failure()
             print(f"[color:yellow]Authentication failed: Invalid API key provided")
             return jsonify({
                 "error": {
@@ -167,14 +183,196 @@ def require_auth(f):
             }), 401
 
         # Authentication successful - log with key name for security
-        key_name = get_api_key_name(api_key)
         print(f"[color:green]API request authenticated successfully using key: '{key_name}'")
+        key_index.record_request(key_name)
+        g.api_key_name = key_name
 
         # Proceed with original function
         return f(*args, **kwargs)
     
     return decorated_function
 
+LOOPBACK_ADDRESSES = ("127.0.0.1", "::1", "::ffff:127.0.0.1")
+# Headers set by cloudflared and reverse proxies, whose requests reach us from localhost
+PROXY_HEADERS = ("CF-Connecting-IP", "X-Forwarded-For")
+
+def is_local_request() -> bool:
+    """True for requests made on this machine, not relayed through the tunnel or a proxy"""
+    if request.remote_addr not in LOOPBACK_ADDRESSES:
+        return False
+    return not any(header in request.headers for header in PROXY_HEADERS)
+
+def require_admin(f):
+    """Decorator for admin and debug routes: an API key when authentication is enabled, localhost only otherwise"""
+    @wraps(f)
+    @require_auth
+    def decorated_function(*args, **kwargs):
+        if not is_api_auth_enabled(get_request_config()) and not is_local_request():
+            print(f"[color:yellow]Rejected {request.path} from {request.remote_addr}: admin routes are local only without API keys")
+            return jsonify({
+                "error": {
+                    "message": "This endpoint is only available from localhost unless API authentication is enabled.",
+                    "type": "permission_error",
+                    "code": "local_only"
+                }
+            }), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+def _config_int(config, key: str, default: int) -> int:
+    """Integer setting (text fields may store numbers as strings)"""
+    try:
+        return int(str(config.get(key, default)).strip())
+    except (TypeError, ValueError):
+        return default
+
+def get_client_id() -> str:
+    """Identity used for rate limiting: the API key name, or the remote IP when auth is off"""
+    key_name = g.get('api_key_name')
+    if key_name:
+        return f"key:{key_name}"
+
+    address = request.remote_addr or "unknown"
+    # TryCloudflare requests arrive from cloudflared on localhost, the real client is in the header
+    if address in LOOPBACK_ADDRESSES:
+        address = request.headers.get("CF-Connecting-IP", address)
+    return f"ip:{address}"
+
+def rate_limit(f):
+    """Decorator to apply the per-client rate limit and concurrency cap (use after require_auth)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        config = get_request_config()
+
+        # Skip limiting if not enabled
+        if not config.get("security.rate_limit_enabled", False):
+            return f(*args, **kwargs)
+
+        limiter = get_rate_limiter()
+        client = get_client_id()
+        rejection = limiter.acquire(
+            client,
+            _config_int(config, "security.rate_limit_per_minute", 20),
+            _config_int(config, "security.rate_limit_burst", 5),
+            _config_int(config, "security.max_concurrent_requests", 1)
+        )
+
+        if rejection:
+            get_metrics().rate_limited.inc(rejection.code)
+            print(f"[color:yellow]Rate limit: rejected request from {client} ({rejection.code})")
+            response = jsonify({
+                "error": {
+                    "message": rejection.message,
+                    "type": "rate_limit_error",
+                    "code": rejection.code
+                }
+            })
+            response.status_code = 429
+            response.headers["Retry-After"] = str(rejection.retry_after)
+            return response
+
+        try:
+            response = app.make_response(f(*args, **kwargs))
+        except Exception:
+            limiter.release(client)
+            raise
+
+        # Streaming responses hold their slot until the stream is closed
+        response.call_on_close(lambda: limiter.release(client))
+        return response
+
+    return decorated_function
+
+class SSEChunk(str):
+    """Serialized SSE chunk that carries the estimated tokens of its content, so usage is counted without parsing it back"""
+    tokens = 0
+
+def _chunk_tokens(chunk) -> int:
+    """Estimated tokens of the content in one SSE chunk (0 for IDLE waits and anything not from create_response_streaming)"""
+    return getattr(chunk, "tokens", 0)
+
+def _response_tokens(response: Response) -> int:
+    """Estimated content tokens of a complete (not streamed) response, as counted by create_response_*"""
+    return getattr(response, "content_tokens", 0)
+
+def _observe_stream(chunks, finished):
+    """Pass the stream through, then report (tokens, time of the first token) to ``finished``"""
+    tokens = 0
+    first_token = None
+    try:
+        for chunk in chunks:
+            count = _chunk_tokens(chunk)
+            if count:
+                tokens += count
+                if first_token is None:
+                    first_token = time.perf_counter()
+            yield chunk
+    finally:
+        try:
+            if hasattr(chunks, "close"):
+                chunks.close()
+        finally:
+            finished(tokens, first_token)
+
+def _record_usage(key_name, labels, trace, started: float, status: int, tokens: int, first_token) -> None:
+    """Update the API key counters, request metrics and trace once a response is complete"""
+    finished = time.perf_counter()
+
+    if trace is not None:
+        if first_token is not None:
+            trace.set(first_token_ms=round((first_token - started) * 1000, 1), tokens=tokens)
+        get_tracer().finish_trace(trace, status)
+
+    if key_name:
+        key_index = get_api_key_index()
+        if status >= 400:
+            key_index.record_error(key_name)
+        else:
+            key_index.record_tokens(key_name, tokens)
+
+    if labels:
+        model, mode, stream = labels
+        metrics = get_metrics()
+        metrics.requests.inc(model, mode, stream, str(status))
+        metrics.request_duration.observe(finished - started, mode, stream)
+        if first_token is not None:
+            metrics.time_to_first_token.observe(first_token - started, mode, stream)
+            metrics.response_tokens.inc(mode, amount=tokens)
+            # Rate only means something when the tokens arrived over time
+            if stream == "true" and finished - first_token > 0.05:
+                metrics.tokens_per_second.observe(tokens / (finished - first_token), mode)
+
+@app.after_request
+def record_usage(response: Response) -> Response:
+    """Update the API key counters, request metrics and trace (streams are counted when they finish)"""
+    key_name = g.get('api_key_name')
+    labels = g.get('metrics_labels')
+    trace = g.get('trace')
+    if not key_name and not labels and trace is None:
+        return response
+
+    started = g.get('request_started') or time.perf_counter()
+    status = response.status_code
+    try:
+        if response.is_streamed and status < 400:
+            response.response = _observe_stream(
+                response.response,
+                lambda tokens, first_token: _record_usage(key_name, labels, trace, started, status, tokens, first_token)
+            )
+        else:
+            tokens = _response_tokens(response) if status < 400 else 0
+            _record_usage(key_name, labels, trace, started, status, tokens, time.perf_counter() if tokens else None)
+    except Exception as e:
+        print(f"Error recording usage: {e}")
+
+    return response
+
+@app.teardown_request
+def detach_trace(exc) -> None:
+    """The worker moves on to other requests, streams keep their trace through the generator"""
+    clear_current_trace()
+
 # =============================================================================================================================
 # API Endpoints
 # =============================================================================================================================
@@ -214,8 +412,112 @@ def model() -> Response:
         print(f"Error connecting to API: {e}")
         return jsonify({}), 500
 
+@app.route("/admin/keys", methods=["GET"])
+@require_admin
+def api_key_usage() -> Response:
+    """Per-key usage counters (key names only, never the keys)"""
+    usage = get_api_key_index().get_usage()
+    usage["auth_enabled"] = bool(is_api_auth_enabled(get_request_config()))
+    return jsonify(usage)
+
+@app.route("/metrics", methods=["GET"])
+@require_admin
+def metrics() -> Response:
+    """Prometheus metrics (text exposition format)"""
+    return Response(get_metrics().render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+def _collect_runtime_metrics() -> list:
+    """Values read at scrape time: tunnel, listener pools, API key usage and the log writer"""
+    state = get_state_manager()
+    lines = metric_lines("intenserp_tunnel_active", "1 while the TryCloudflare tunnel is running", [({}, 1 if state.is_tunnel_active() else 0)])
+    lines += metric_lines("intenserp_browser_active", "1 while a browser session is open", [({}, 1 if state.driver else 0)])
+
+    pools = get_pool_stats()
+    for field, help_text in (("threads", "Worker threads"), ("active", "Busy worker threads"), ("queued", "Tasks waiting for a worker"), ("peak_queued", "Deepest task queue seen")):
+        lines += metric_lines(f"intenserp_pool_{field}", f"{help_text} per listener", [({"pool": name}, stats[field]) for name, stats in pools.items()])
+
+    usage = get_api_key_index().get_usage()
+    for field, help_text in (("requests", "Authenticated requests"), ("tokens_streamed", "Estimated tokens delivered"), ("errors", "Failed requests")):
+        lines += metric_lines(f"intenserp_api_key_{field}_total", f"{help_text} per API key", [({"key": key}, counters[field]) for key, counters in usage["keys"].items()], "counter")
+    lines += metric_lines("intenserp_auth_failures_total", "Requests rejected for a missing or invalid API key", [({}, usage["auth_failures"])], "counter")
+
+    if state.logging_manager:
+        log_stats = state.logging_manager.get_stats()
+        lines += metric_lines("intenserp_log_queue_length", "Messages waiting for the log writer", [({}, log_stats["queued"])])
+        lines += metric_lines("intenserp_log_dropped_total", "Log messages dropped because the writer fell behind", [({}, log_stats["dropped"])], "counter")
+    return lines
+
+get_metrics().add_collector(_collect_runtime_metrics)
+
+@app.route("/admin/pools", methods=["GET"])
+@require_admin
+def server_pool_stats() -> Response:
+    """Thread pool and queue state of the API and extension listeners"""
+    return jsonify(get_pool_stats())
+
+@app.route("/debug/traces", methods=["GET"])
+@require_admin
+def debug_traces() -> Response:
+    """Most recent request traces, as JSON or a plain text timeline (?format=text)"""
+    traces = get_tracer().get_traces(request.args.get("limit", 20, type=int))
+    if request.args.get("format") == "text":
+        return Response("\n\n".join(format_timeline(trace) for trace in traces) + "\n", content_type="text/plain; charset=utf-8")
+    return jsonify({"traces": traces})
+
+PROFILE_MAX_SECONDS = 30  # A profile keeps one API worker busy for its whole length
+
+@app.route("/admin/profile", methods=["POST"])
+@require_admin
+def profile_server() -> Response:
+    """Sample the stacks of every thread for a while (?seconds=10&interval_ms=10&format=json|collapsed&save=1)"""
+    seconds = request.args.get("seconds", 10.0, type=float)
+    interval = request.args.get("interval_ms", DEFAULT_INTERVAL * 1000, type=float) / 1000
+    save = request.args.get("save", "").lower() in ("1", "true", "yes")
+
+    if seconds > PROFILE_MAX_SECONDS:
+        return jsonify({"error": {"message": f"seconds must be at most {PROFILE_MAX_SECONDS}", "type": "invalid_request_error"}}), 400
+
+    try:
+        result = get_profiler().profile(seconds, interval)
+    except ValueError as e:
+        return jsonify({"error": {"message": str(e), "type": "invalid_request_error"}}), 400
+    except ProfilerBusyError as e:
+        return jsonify({"error": {"message": str(e), "type": "conflict_error"}}), 409
+
+    saved_to = None
+    if save:
+        try:
+            saved_to = result.save(_logs_path())
+        except Exception as e:
+            print(f"Error saving profile: {e}")
+
+    if request.args.get("format") == "collapsed":
+        response = Response(result.collapsed(), content_type="text/plain; charset=utf-8")
+        if saved_to:
+            response.headers["X-Profile-File"] = saved_to
+        return response
+
+    data = result.to_dict()
+    data["file"] = saved_to
+    return jsonify(data)
+
+def _logs_path(relative_path: str = "") -> str:
+    """Path inside the logs directory next to the executable"""
+    storage_manager = get_state_manager()._config_manager.storage_manager
+    return storage_manager.get_path("executable", f"logs/{relative_path}" if relative_path else "logs")
+
+def _trace_export_path(config):
+    """JSONL file for request traces, None unless exporting is enabled"""
+    if not config.get("logging.export_traces", False):
+        return None
+    try:
+        return _logs_path("traces.jsonl")
+    except Exception:
+        return None
+
 @app.route("/chat/completions", methods=["POST"])
 @require_auth
+@rate_limit
 def bot_response() -> Response:
     # Record API activity for refresh timer
     try:
@@ -225,6 +527,13 @@ def bot_response() -> Response:
         pass  # Don't let activity tracking failures break the API
     
     state = get_state_manager()
+    config = get_request_config()
+    
+    # Labels for the request metrics, refined once the request is processed
+    g.request_started = time.perf_counter()
+    mode = "network" if config.get("models.deepseek.intercept_network", False) else "dom"
+    g.metrics_labels = ("unknown", mode, "false")
+    g.trace = get_tracer().start_trace("chat.completions", _trace_export_path(config), mode=mode)
     
     try:
         data = request.get_json()
@@ -232,20 +541,24 @@ def bot_response() -> Response:
             print("Error: Empty data was received.")
             return jsonify({}), 503
 
-        # Initialize message pipeline with current config and config manager
-        config_with_manager = state.config or {}
-        config_with_manager['config_manager'] = state._config_manager
-        pipeline = MessagePipeline(config_with_manager)
+        # Shared pipeline for the current config version (rebuilt on config changes)
+        pipeline = get_message_pipeline(state._config_manager)
         
         # Process the request
         try:
-            processed_request = pipeline.process_request(data)
-            formatted_message = pipeline.format_for_api(processed_request)
+            with span("pipeline.process_request", messages=len(data.get("messages") or ())):
+                processed_request = pipeline.process_request(data)
+            with span("pipeline.format_for_api") as format_span:
+                formatted_message = pipeline.format_for_api(processed_request)
+                format_span.set(characters=len(formatted_message or ""))
         except ProcessingError as e:
             print(f"Error processing request: {e}")
             return jsonify({}), 503
 
         streaming = processed_request.stream
+        model_label = processed_request.model if processed_request.get_base_model_name() == "intense-rp-next-1" else "other"
+        g.metrics_labels = (model_label, mode, "true" if streaming else "false")
+        g.trace.set(model=processed_request.model, stream=streaming)
 
         if not formatted_message:
             print("Error: Data could not be processed.")
@@ -263,12 +576,30 @@ def bot_response() -> Response:
         if processed_request.has_prefix():
             state.show_message(f"[color:white]- [color:cyan]Prefix detected: {len(processed_request.prefix_content)} characters")
         
+        # Log context budget trimming
+        context_trim = getattr(processed_request, '_context_trim', None)
+        if context_trim:
+            # Nothing may be droppable (only system messages and the last one left) while still over budget
+            if context_trim.dropped_messages:
+                get_metrics().context_trims.inc(amount=context_trim.dropped_messages)
+                state.show_message(f"[color:white]- [color:yellow]Context budget: dropped {context_trim.dropped_messages} oldest message(s), ~{context_trim.tokens_before} -> ~{context_trim.tokens_after} tokens.")
+            if context_trim.over_budget:
+                state.show_message(f"[color:white]- [color:orange]Prompt is still over the {context_trim.budget} token budget.")
+        
+        # Check if the history only grew since the last response (Continue Conversation)
+        conversation = None
+        continuation_message = None
+        if config.get("models.deepseek.continue_conversation", False):
+            with span("prepare_continuation") as continuation_span:
+                conversation, continuation_message = prepare_continuation(processed_request, pipeline)
+                continuation_span.set(continuing=continuation_message is not None)
+        
         # Check if network interception is enabled
-        intercept_network = state.get_config_value("models.deepseek.intercept_network", False)
+        intercept_network = config.get("models.deepseek.intercept_network", False)
         
         if intercept_network:
             # Get send_thoughts setting - only applies when deepthink is enabled
-            send_thoughts = state.get_config_value("models.deepseek.send_thoughts", True) if processed_request.use_deepthink else False
+            send_thoughts = config.get("models.deepseek.send_thoughts", True) if processed_request.use_deepthink else False
             return deepseek_network_response(
                 current_message, 
                 formatted_message, 
@@ -279,7 +610,9 @@ def bot_response() -> Response:
                 pipeline,
                 processed_request.prefix_content,
                 send_thoughts,
-                processed_request.model
+                processed_request.model,
+                conversation,
+                continuation_message
             )
         else:
             return deepseek_response(
@@ -291,12 +624,76 @@ def bot_response() -> Response:
                 processed_request.use_text_file,
                 pipeline,
                 processed_request.prefix_content,
-                processed_request.model
+                processed_request.model,
+                conversation,
+                continuation_message
             )
     except Exception as e:
         print(f"Error receiving JSON from Sillytavern: {e}")
         return jsonify({}), 500
 
+def prepare_continuation(processed_request, pipeline: MessagePipeline) -> tuple:
+    """
+    Fingerprint the request and check if it continues the open DeepSeek chat.
+    
+    Returns:
+        (fingerprint, continuation_message) - the fingerprint is None when the request
+        can't be tracked, the message is None when the full prompt must be sent
+    """
+    state = get_state_manager()
+    tracker = get_conversation_tracker()
+    
+    try:
+        # Prefills are pasted as a fake assistant turn, so the chat can't be continued after them
+        if processed_request.has_prefix():
+            tracker.reset()
+            return None, None
+        
+        character_info = getattr(processed_request, '_character_info', None)
+        context = (
+            get_request_config().version,
+            processed_request.use_deepthink,
+            processed_request.use_search,
+            character_info.character_name if character_info else None,
+            character_info.user_name if character_info else None,
+        )
+        fingerprint = tracker.fingerprint(processed_request, context)
+        was_tracking = tracker.is_tracking()
+        start = tracker.match(processed_request, fingerprint, state.driver)
+        
+        # The open chat is only valid until this request either completes or fails
+        tracker.reset()
+        
+        if start is None:
+            if was_tracking:
+                state.show_message("[color:white]- [color:cyan]Conversation changed, sending full prompt.")
+            return fingerprint, None
+        
+        continuation_message = pipeline.format_continuation(processed_request, start)
+        if not continuation_message:
+            return fingerprint, None
+        
+        state.show_message(f"[color:white]- [color:cyan]Conversation continues, sending {fingerprint.message_count - start} new message(s).")
+        return fingerprint, continuation_message
+    except Exception as e:
+        tracker.reset()
+        state.show_message(f"[color:white]- [color:yellow]Continue Conversation error: {e}, sending full prompt.")
+        return None, None
+
+def remember_conversation(current_id: int, conversation: ConversationFingerprint, response_text: str) -> None:
+    """Track the conversation after a successful response so the next request can continue it"""
+    if conversation is None:
+        return
+    
+    state = get_state_manager()
+    if current_id != state.last_response:
+        return
+    
+    try:
+        get_conversation_tracker().record(conversation, response_text, state.driver)
+    except Exception as e:
+        print(f"Warning: Could not track conversation: {e}")
+
 def deepseek_response(
     current_id: int, 
     formatted_message: str, 
@@ -306,9 +703,12 @@ def deepseek_response(
     text_file: bool,
     pipeline: MessagePipeline,
     prefix_content: str = None,
-    model: str = "intense-rp-next-1"
+    model: str = "intense-rp-next-1",
+    conversation: ConversationFingerprint = None,
+    continuation_message: str = None
 ) -> Response:
     state = get_state_manager()
+    trace = g.get('trace')
 
     def client_disconnected() -> bool:
         if not streaming:
@@ -336,7 +736,7 @@ def deepseek_response(
             return safe_interrupt_response()
 
         # Check for Clean Regeneration feature
-        clean_regeneration_enabled = state.get_config_value("models.deepseek.clean_regeneration", False)
+        clean_regeneration_enabled = get_request_config().get("models.deepseek.clean_regeneration", False)
         used_regeneration = False
         
         if clean_regeneration_enabled:
@@ -350,7 +750,9 @@ def deepseek_response(
                     # Check if regenerate button is available and not censored
                     if deepseek.can_use_regenerate_button(state.driver):
                         # Use regeneration instead of new chat (DOM scraping doesn't need early CDP)
-                        if deepseek.click_regenerate_button(state.driver):
+                        with span("click_regenerate_button"):
+                            clicked = deepseek.click_regenerate_button(state.driver)
+                        if clicked:
                             used_regeneration = True
                             state.show_message("[color:white]- [color:green]Using regeneration instead of new chat.")
                         else:
@@ -362,17 +764,31 @@ def deepseek_response(
             except Exception as e:
                 state.show_message(f"[color:white]- [color:yellow]Clean Regeneration error: {e}, using new chat.")
         
-        # Only configure new chat if we didn't use regeneration
-        if not used_regeneration:
-            deepseek.configure_chat(state.driver, deepthink, search)
+        # Keep the open chat when only new turns were added (Continue Conversation)
+        continuing = continuation_message is not None and not used_regeneration
+        
+        # Only configure new chat if we didn't use regeneration or continue the chat
+        if not used_regeneration and not continuing:
+            with span("configure_chat", deepthink=deepthink, search=search):
+                deepseek.configure_chat(state.driver, deepthink, search)
             state.show_message("[color:white]- [color:cyan]Chat reset and configured.")
 
         if interrupted():
             return safe_interrupt_response()
 
         # Only send new message if we didn't use regeneration
-        if not used_regeneration:
-            if not deepseek.send_chat_message(state.driver, formatted_message, text_file, prefix_content):
+        if continuing:
+            with span("send_chat_message", characters=len(continuation_message), continuation=True):
+                sent = deepseek.send_chat_message(state.driver, continuation_message, False)
+            if not sent:
+                state.show_message("[color:white]- [color:red]Could not paste new messages.")
+                return create_response("Could not paste prompt.", streaming, pipeline, model)
+
+            state.show_message("[color:white]- [color:green]New messages pasted and sent.")
+        elif not used_regeneration:
+            with span("send_chat_message", characters=len(formatted_message), text_file=text_file):
+                sent = deepseek.send_chat_message(state.driver, formatted_message, text_file, prefix_content)
+            if not sent:
                 state.show_message("[color:white]- [color:red]Could not paste prompt.")
                 return create_response("Could not paste prompt.", streaming, pipeline, model)
 
@@ -383,7 +799,9 @@ def deepseek_response(
         if interrupted():
             return safe_interrupt_response()
 
-        if not deepseek.active_generate_response(state.driver):
+        with span("active_generate_response"):
+            generating = deepseek.active_generate_response(state.driver)
+        if not generating:
             state.show_message("[color:white]- [color:red]No response generated.")
             return create_response("No response generated.", streaming, pipeline, model)
 
@@ -393,7 +811,9 @@ def deepseek_response(
         state.show_message("[color:white]- [color:cyan]Awaiting response.")
         
         # Wait for generation to actually start (stop button appears) after loading phase
-        if not deepseek.wait_for_generation_to_start(state.driver):
+        with span("wait_for_generation_to_start"):
+            started = deepseek.wait_for_generation_to_start(state.driver)
+        if not started:
             state.show_message("[color:white]- [color:red]Response generation did not start.")
             return create_response("Response generation timeout.", streaming, pipeline, model)
         
@@ -407,13 +827,14 @@ def deepseek_response(
                 hybrid_mode = False  # Flag to track when we switch to hybrid mode
                 
                 try:
+                    stream_started = time.perf_counter()
                     while deepseek.is_response_generating(state.driver):
                         if interrupted():
                             break
 
                         current_text = deepseek.get_last_message(state.driver, pipeline)
                         if not current_text:
-                            time.sleep(0.2)
+                            yield IDLE
                             continue
                         
                         # Check for code blocks in raw HTML to determine if we should switch to hybrid mode
@@ -437,13 +858,17 @@ def deepseek_response(
                                 last_sent_position = len(current_text)
                                 yield create_response_streaming(new_content, pipeline, model)
                         
-                        time.sleep(0.2)
+                        yield IDLE
+
+                    if trace:
+                        trace.record("stream_dom", stream_started, hybrid=hybrid_mode, sent=last_sent_position)
 
                     if interrupted():
                         return safe_interrupt_response()
 
                     # Final processing - get the complete response
-                    final_text = deepseek.wait_for_response_completion(state.driver, pipeline)
+                    with span("wait_for_response_completion", trace):
+                        final_text = deepseek.wait_for_response_completion(state.driver, pipeline)
                     
                     if final_text:
                         # Send any remaining content based on position
@@ -457,6 +882,9 @@ def deepseek_response(
                     if closing:
                         yield create_response_streaming(closing, pipeline, model)
                     
+                    if final_text:
+                        remember_conversation(current_id, conversation, final_text + closing)
+                    
                     # Update dumps after successful generation (only if Clean Regeneration is enabled)
                     if clean_regeneration_enabled:
                         try:
@@ -474,9 +902,10 @@ def deepseek_response(
                     print(f"Streaming error: {e}")
                     state.show_message("[color:white]- [color:red]Unknown error occurred.")
                     yield create_response_streaming("Error receiving response.", pipeline, model)
-            return Response(streaming_response(), content_type="text/event-stream")
+            return Response(StreamBody(streaming_response(), 0.2, async_idle=request.environ.get(ASYNC_IDLE_KEY, False)), content_type="text/event-stream")
         else:
-            final_text = deepseek.wait_for_response_completion(state.driver, pipeline)
+            with span("wait_for_response_completion"):
+                final_text = deepseek.wait_for_response_completion(state.driver, pipeline)
             
             if interrupted():
                 return safe_interrupt_response()
@@ -485,6 +914,9 @@ def deepseek_response(
             closing = pipeline.get_closing_symbol(final_text) if final_text else ""
             response = response_text + closing
             
+            if final_text:
+                remember_conversation(current_id, conversation, response)
+            
             # Update dumps after successful generation (only if Clean Regeneration is enabled)
             if clean_regeneration_enabled:
                 try:
@@ -511,10 +943,13 @@ def deepseek_network_response(
     pipeline: MessagePipeline,
     prefix_content: str = None,
     send_thoughts: bool = True,
-    model: str = "intense-rp-next-1"
+    model: str = "intense-rp-next-1",
+    conversation: ConversationFingerprint = None,
+    continuation_message: str = None
 ) -> Response:
     """Handle DeepSeek response using network interception instead of DOM scraping"""
     state = get_state_manager()
+    trace = g.get('trace')
 
     def client_disconnected() -> bool:
         if not streaming:
@@ -543,7 +978,7 @@ def deepseek_network_response(
             return safe_interrupt_response()
 
         # Check for Clean Regeneration feature and start CDP early if needed
-        clean_regeneration_enabled = state.get_config_value("models.deepseek.clean_regeneration", False)
+        clean_regeneration_enabled = get_request_config().get("models.deepseek.clean_regeneration", False)
         used_regeneration = False
         regeneration_possible = False
         
@@ -582,7 +1017,8 @@ def deepseek_network_response(
         # ^^ CDP READINESS FLAG ^^
         
         # Enable network interception (early if regeneration is possible)
-        deepseek.enable_network_interception(state.driver)
+        with span("enable_network_interception"):
+            deepseek.enable_network_interception(state.driver)
         if regeneration_possible:
             state.show_message("[color:white]- [color:cyan]CDP network interception starting (early for regeneration)...")
         else:
@@ -593,8 +1029,12 @@ def deepseek_network_response(
         start_time = time.time()
         
         state.show_message("[color:yellow]Waiting for CDP to become ready...")
-        while not network_data['ready'] and (time.time() - start_time) < readiness_timeout:
-            time.sleep(0.1)  # Check every 100ms
+        with span("wait_for_cdp_ready") as ready_span:
+            since = network_notifier.generation
+            while not network_data['ready'] and (time.time() - start_time) < readiness_timeout:
+                network_notifier.wait(since, 0.1)  # Woken up by the extension, checks every 100ms at most
+                since = network_notifier.generation
+            ready_span.set(ready=network_data['ready'])
             
         if network_data['ready']:
             if regeneration_possible:
@@ -609,7 +1049,9 @@ def deepseek_network_response(
         # Now that CDP is ready, click regenerate button if possible
         if regeneration_possible:
             try:
-                if deepseek.click_regenerate_button(state.driver):
+                with span("click_regenerate_button"):
+                    clicked = deepseek.click_regenerate_button(state.driver)
+                if clicked:
                     used_regeneration = True
                     state.show_message("[color:white]- [color:green]Regenerate button clicked - CDP should catch the request.")
                 else:
@@ -619,17 +1061,32 @@ def deepseek_network_response(
                 state.show_message(f"[color:white]- [color:yellow]Error clicking regenerate: {e}, falling back to new chat.")
                 regeneration_possible = False
 
-        # Configure chat and send message (only if not using regeneration)
-        if not used_regeneration:
-            deepseek.configure_chat(state.driver, deepthink, search)
+        # Keep the open chat when only new turns were added (Continue Conversation)
+        continuing = continuation_message is not None and not used_regeneration
+        
+        # Configure chat and send message (only if not using regeneration or continuing the chat)
+        if not used_regeneration and not continuing:
+            with span("configure_chat", deepthink=deepthink, search=search):
+                deepseek.configure_chat(state.driver, deepthink, search)
             state.show_message("[color:white]- [color:cyan]Chat reset and configured.")
         
         if interrupted():
             return safe_interrupt_response()
 
         # Only send new message if we didn't use regeneration
-        if not used_regeneration:
-            if not deepseek.send_chat_message(state.driver, formatted_message, text_file, prefix_content):
+        if continuing:
+            with span("send_chat_message", characters=len(continuation_message), continuation=True):
+                sent = deepseek.send_chat_message(state.driver, continuation_message, False)
+            if not sent:
+                state.show_message("[color:white]- [color:red]Could not paste new messages.")
+                deepseek.disable_network_interception(state.driver)
+                return create_response("Could not paste prompt.", streaming, pipeline, model)
+
+            state.show_message("[color:white]- [color:green]New messages pasted and sent.")
+        elif not used_regeneration:
+            with span("send_chat_message", characters=len(formatted_message), text_file=text_file):
+                sent = deepseek.send_chat_message(state.driver, formatted_message, text_file, prefix_content)
+            if not sent:
                 state.show_message("[color:white]- [color:red]Could not paste prompt.")
                 deepseek.disable_network_interception(state.driver)
                 return create_response("Could not paste prompt.", streaming, pipeline, model)
@@ -646,15 +1103,20 @@ def deepseek_network_response(
         
         if streaming:
             def network_streaming_response() -> Generator[str, None, None]:
+                delivered = []  # Everything sent to the client, for Continue Conversation
                 try:
                     # Wait for response to start
                     timeout = 30  # 30 second timeout
                     start_time = time.time()
+                    wait_started = time.perf_counter()
                     
                     while not network_data['response_started']:
                         if interrupted() or time.time() - start_time > timeout:
                             break
-                        time.sleep(0.1)
+                        yield IDLE
+                    
+                    if trace:
+                        trace.record("wait_for_response_start", wait_started, started=network_data['response_started'])
                     
                     if not network_data['response_started']:
                         yield create_response_streaming("Error: Network response did not start", pipeline, model)
@@ -664,6 +1126,7 @@ def deepseek_network_response(
                     last_processed_index = 0
                     finish_event_received = False
                     timeout_start = time.time()
+                    stream_started = time.perf_counter()
                     max_total_time = 300  # 5 minutes absolute timeout
                     
                     while not finish_event_received:
@@ -688,6 +1151,7 @@ def deepseek_network_response(
                                     chunks = parse_network_stream_data_for_streaming(content, send_thoughts)
                                     for chunk in chunks:
                                         if chunk:
+                                            delivered.append(chunk)
                                             yield create_response_streaming(chunk, pipeline, model)
                         
                         last_processed_index = current_buffer_length
@@ -699,7 +1163,12 @@ def deepseek_network_response(
                                 finish_event_received = True
                                 break
                             
-                        time.sleep(0.1)
+                        # Resumed as soon as the extension posts more data
+                        yield IDLE
+                    
+                    if trace:
+                        trace.record("stream_network", stream_started, chunks=len(delivered), finished=finish_event_received,
+                                     censored=network_data['censorship_detected'])
                     
                     # If thinking mode is still active at stream end, close it (only if send_thoughts is enabled)
                     if network_data['thinking_active'] and send_thoughts:
@@ -712,6 +1181,8 @@ def deepseek_network_response(
                     # Check for errors
                     if network_data['error']:
                         yield create_response_streaming(f"Error: {network_data['error']}", pipeline, model)
+                    elif finish_event_received and not network_data['censorship_detected'] and not interrupted():
+                        remember_conversation(current_id, conversation, "".join(delivered))
                     
                     # Update dumps after successful generation (only if Clean Regeneration is enabled)
                     if clean_regeneration_enabled:
@@ -737,32 +1208,39 @@ def deepseek_network_response(
                 finally:
                     deepseek.disable_network_interception(state.driver)
                     
-            return Response(network_streaming_response(), content_type="text/event-stream")
+            return Response(StreamBody(network_streaming_response(), 0.1, network_notifier, request.environ.get(ASYNC_IDLE_KEY, False)), content_type="text/event-stream")
         else:
             # Non-streaming mode
             timeout = 300  # 5 minutes timeout to match streaming mode
             start_time = time.time()
             
-            while not network_data['completed']:
-                if interrupted() or time.time() - start_time > timeout:
-                    break
-                # Check for censorship - complete early if detected
-                if network_data['censorship_detected']:
-                    break
-                time.sleep(0.1)
+            with span("wait_for_network_completion") as completion_span:
+                since = network_notifier.generation
+                while not network_data['completed']:
+                    if interrupted() or time.time() - start_time > timeout:
+                        break
+                    # Check for censorship - complete early if detected
+                    if network_data['censorship_detected']:
+                        break
+                    network_notifier.wait(since, 0.1)
+                    since = network_notifier.generation
+                completion_span.set(completed=network_data['completed'], chunks=len(network_data['stream_buffer']))
             
             if network_data['error']:
                 response_text = f"Error: {network_data['error']}"
             else:
                 # Combine all stream data
                 state.show_message(f"[color:cyan]Combining {len(network_data['stream_buffer'])} stream items...")
-                response_text = combine_network_stream_data(network_data['stream_buffer'], send_thoughts)
+                with span("combine_network_stream_data"):
+                    response_text = combine_network_stream_data(network_data['stream_buffer'], send_thoughts)
                 
                 # Log censorship detection
                 if network_data['censorship_detected']:
                     state.show_message(f"[color:yellow]Censorship detected - response truncated at {len(response_text)} characters")
                 else:
                     state.show_message(f"[color:cyan]Final combined response length: {len(response_text)}")
+                    if network_data['completed'] and not interrupted():
+                        remember_conversation(current_id, conversation, response_text)
             
             # Update dumps after successful generation (only if Clean Regeneration is enabled)
             if clean_regeneration_enabled:
@@ -947,6 +1425,7 @@ def parse_network_stream_data_for_streaming(data: str, send_thoughts: bool = Tru
         
         return chunks
     except Exception as e:
+        get_metrics().interception_parse_errors.inc()
         print(f"Error parsing network stream data for streaming: {e}")
         return []
 
@@ -1155,6 +1634,7 @@ def parse_network_stream_data(data: str, send_thoughts: bool = True) -> str:
             # Plain text data
             return data
     except Exception as e:
+        get_metrics().interception_parse_errors.inc()
         print(f"Error parsing network stream data: {e}")
         return ""
 
@@ -1187,6 +1667,13 @@ def combine_network_stream_data(stream_buffer: list, send_thoughts: bool = True)
 # Network Interception Routes
 # =============================================================================================================================
 
+@app.after_request
+def wake_network_streams(response: Response) -> Response:
+    """Resume responses waiting for extension data once a /network/* post was handled"""
+    if request.path.startswith(INGEST_PREFIX):
+        network_notifier.notify()
+    return response
+
 @app.route("/network/request", methods=["POST"])
 def network_request():
     """Handle network request data from extension"""
@@ -1276,6 +1763,7 @@ def network_stream_data():
                     
                     # Check if this data contains censorship indicators
                     if detect_censorship(json_data):
+                        get_metrics().censorship_truncations.inc()
                         network_data['censorship_detected'] = True
                         network_data['completed'] = True  # Mark as completed to end stream
                         state = get_state_manager()
@@ -1294,6 +1782,7 @@ def network_stream_data():
                     print(f"Error checking censorship in stream data: {e}")
             
             # Normal processing - append to buffer if not censored
+            get_metrics().interception_chunks.inc()
             network_data['stream_buffer'].append({
                 'type': 'data',
                 'content': data['data'],
@@ -1382,7 +1871,7 @@ def get_model_response() -> Response:
 
 def create_response_jsonify(text: str, pipeline: MessagePipeline, model: str = "intense-rp-next-1") -> Response:
     """Create JSON response"""
-    return jsonify({
+    response = jsonify({
         "id": "chatcmpl-intenserp",
         "object": "chat.completion",
         "created": int(time.time() * 1000),
@@ -1393,21 +1882,29 @@ def create_response_jsonify(text: str, pipeline: MessagePipeline, model: str = "
             "finish_reason": "stop"
         }]
     })
+    response.content_tokens = count_tokens(text)
+    return response
 
 def create_response_streaming(text: str, pipeline: MessagePipeline, model: str = "intense-rp-next-1") -> str:
     """Create streaming response chunk"""
-    return "data: " + json.dumps({
+    chunk = SSEChunk("data: " + json.dumps({
         "id": "chatcmpl-intenserp",
         "object": "chat.completion.chunk",
         "created": int(time.time() * 1000),
         "model": model,
         "choices": [{"index": 0, "delta": {"content": text}}]
-    }) + "\n\n"
+    }) + "\n\n")
+    # Deltas are short and nearly all unique, the cached estimate_tokens is kept for whole messages
+    chunk.tokens = count_tokens(text)
+    return chunk
 
 def create_response(text: str, streaming: bool, pipeline: MessagePipeline, model: str = "intense-rp-next-1") -> Response:
     """Create appropriate response based on streaming setting"""
     if streaming:
-        return Response(create_response_streaming(text, pipeline, model), content_type="text/event-stream")
+        chunk = create_response_streaming(text, pipeline, model)
+        response = Response(chunk, content_type="text/event-stream")
+        response.content_tokens = chunk.tokens
+        return response
     return create_response_jsonify(text, pipeline, model)
 
 # =============================================================================================================================
@@ -1433,10 +1930,15 @@ def run_services() -> None:
         config = state.config
         browser = state.get_config_value("browser", "Chrome")
         
+        # Extension traffic gets its own loopback listener and thread pool
+        ingest_server = start_ingest_server(app, _config_int(state.config_snapshot(), "api.ingest_threads", DEFAULT_INGEST_THREADS))
+        ingest_port = ingest_server.port if ingest_server else None
+        
         # Initialize webdriver with config for persistent cookies support
-        state.driver = selenium.initialize_webdriver(browser, "https://chat.deepseek.com/sign_in", config)
+        state.driver = selenium.initialize_webdriver(browser, "https://chat.deepseek.com/sign_in", config, ingest_port)
         
         if state.driver:
+            instrument_webdriver(state.driver)
             threading.Thread(target=monitor_driver, args=(current_driver_id,), daemon=True).start()
 
             # Check if we're already logged in (persistent cookies might have us logged in)
@@ -1503,7 +2005,10 @@ def run_services() -> None:
             
             # Bind to network interface only if show_ip is enabled, otherwise localhost only
             host = "0.0.0.0" if state.get_config_value("show_ip", False) else "127.0.0.1"
-            serve(app, host=host, port=api_port, channel_request_lookahead=1)
+            server_mode = state.get_config_value("api.server_mode", SERVER_MODE_THREADED)
+            api_server = create_api_server(app, host, api_port, _config_int(state.config_snapshot(), "api.threads", DEFAULT_API_THREADS), server_mode)
+            print(f"Serving on http://{api_server.host}:{api_server.port} ({server_mode.lower()} mode)")
+            api_server.run()
         else:
             state.show_message("[color:red]Selenium failed to start.")
     except Exception as e:
@@ -4,13 +4,23 @@ Provides modular, schema-driven configuration system
 """
 
 from .config_manager import ConfigManager, ConfigValidationError
+from .config_snapshot import ConfigSnapshot
 from .config_schema import get_config_schema, get_default_config, ConfigField, ConfigSection, ConfigFieldType, ValidationError
-from .config_ui_generator import ConfigUIGenerator
 from .config_validators import ConfigValidator, ConditionalValidator
 
+
+def __getattr__(name):
+    # The UI generator loads customtkinter, only import it when the GUI asks for it
+    if name == "ConfigUIGenerator":
+        from .config_ui_generator import ConfigUIGenerator
+        return ConfigUIGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     'ConfigManager',
     'ConfigValidationError',
+    'ConfigSnapshot',
     'ConfigUIGenerator',
     'ConfigValidator',
     'ConditionalValidator',
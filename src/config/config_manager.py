@@ -3,8 +3,10 @@ Configuration manager for IntenseRP API
 Handles loading, saving, validation, and access to configuration
 """
 
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from .config_schema import get_config_schema, get_default_config, find_field_by_key, ValidationError
+from .config_snapshot import ConfigSnapshot
 from .config_validators import ConfigValidator
 
 
@@ -25,6 +27,10 @@ class ConfigManager:
         self._config = {}
         self._original_config = get_default_config()
         self._hidden_vars = {}  # Hidden variables stored in separate files
+        self._version = 0  # Bumped on every change so consumers can cache derived state
+        self._version_lock = threading.Lock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._snapshot_lock = threading.Lock()
         self._load_config()
         self._load_hidden_vars()
     
@@ -153,6 +159,36 @@ class ConfigManager:
         
         # Set the final value
         config_ref[keys[-1]] = value
+        self._bump_version()
+    
+    @property
+    def version(self) -> int:
+        """Configuration version, incremented whenever a value changes"""
+        return self._version
+    
+    def _bump_version(self) -> None:
+        """Mark the configuration as changed"""
+        with self._version_lock:
+            self._version += 1
+    
+    def snapshot(self) -> ConfigSnapshot:
+        """Read-only flattened snapshot of the current configuration
+        
+        Rebuilt lazily once per version (after a set, update or reset) and then
+        shared by every caller until the next change.
+        """
+        snapshot = self._snapshot
+        version = self._version
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            version = self._version
+            if snapshot is None or snapshot.version != version:
+                snapshot = ConfigSnapshot(self._config, version)
+                self._snapshot = snapshot
+            return snapshot
     
     def get_section(self, section_key: str) -> Dict[str, Any]:
         """Get an entire configuration section"""
@@ -305,10 +341,12 @@ class ConfigManager:
     def set_hidden_var(self, key: str, value: str) -> None:
         """Set a hidden variable value"""
         self._hidden_vars[key] = value
+        self._bump_version()
     
     def reset_to_defaults(self) -> None:
         """Reset configuration to defaults"""
         self._config = self._original_config.copy()
+        self._bump_version()
     
     def export_config(self) -> Dict[str, Any]:
         """Export configuration for backup/sharing"""
@@ -331,6 +369,8 @@ class ConfigManager:
                 raise
         else:
             self._config = config_data.copy()
+        
+        self._bump_version()
     
     def get_config_summary(self) -> Dict[str, Any]:
         """Get a summary of current configuration for debugging"""
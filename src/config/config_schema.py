@@ -6,7 +6,7 @@ Declarative approach to defining all configuration options
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Callable
 from enum import Enum
-import utils.console_manager as console_manager
+import utils.console_settings as console_settings
 
 
 class ConfigFieldType(Enum):
@@ -143,6 +143,13 @@ def get_config_schema() -> List[ConfigSection]:
                     default=False,
                     help_text="Compare message contents and use regenerate button instead of new chat when identical"
                 ),
+                ConfigField(
+                    key="models.deepseek.continue_conversation",
+                    label="Continue Conversation:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Keep the current chat and send only new messages when the history was not edited"
+                ),
             ]
         ),
         
@@ -155,7 +162,7 @@ def get_config_schema() -> List[ConfigSection]:
                     label="Font Family:",
                     field_type=ConfigFieldType.DROPDOWN,
                     default="Consolas",
-                    options=console_manager.ConsoleSettings.FONT_FAMILIES,
+                    options=console_settings.ConsoleSettings.FONT_FAMILIES,
                     help_text="Font family for console text"
                 ),
                 ConfigField(
@@ -163,7 +170,7 @@ def get_config_schema() -> List[ConfigSection]:
                     label="Font Size:",
                     field_type=ConfigFieldType.DROPDOWN,
                     default="12",
-                    options=[str(size) for size in console_manager.ConsoleSettings.FONT_SIZES],
+                    options=[str(size) for size in console_settings.ConsoleSettings.FONT_SIZES],
                     help_text="Font size for console text"
                 ),
                 ConfigField(
@@ -171,7 +178,7 @@ def get_config_schema() -> List[ConfigSection]:
                     label="Color Palette:",
                     field_type=ConfigFieldType.DROPDOWN,
                     default="Modern",
-                    options=console_manager.ConsoleColorPalettes.get_palette_names(),
+                    options=console_settings.ConsoleColorPalettes.get_palette_names(),
                     help_text="Color scheme for console output"
                 ),
                 ConfigField(
@@ -181,6 +188,14 @@ def get_config_schema() -> List[ConfigSection]:
                     default=True,
                     help_text="Wrap long lines in console"
                 ),
+                ConfigField(
+                    key="console.history_lines",
+                    label="History Lines:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=50000,
+                    validation="console_history",
+                    help_text="Lines kept in memory for scrolling, search and dumps (1000-1000000). Only the lines in view are drawn."
+                ),
                 ConfigField(
                     key="console.preview",
                     label="Preview Changes",
@@ -212,6 +227,27 @@ def get_config_schema() -> List[ConfigSection]:
                     help_text="Directory to save console dumps (leave empty to use 'condumps/' in project root)",
                     highlight_errors=False  # Optional field - don't highlight errors as aggressively
                 ),
+                ConfigField(
+                    key="console.profile_enabled",
+                    label="Enable Profiler Button:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Add a 'Profile' button to the console that samples all threads for 30 seconds and saves the stacks to logs/"
+                ),
+                ConfigField(
+                    key="dumps.regeneration_files",
+                    label="Regeneration Dump Files:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Debug: write Clean Regeneration prompts to msgdump/ instead of comparing digests in memory"
+                ),
+                ConfigField(
+                    key="dumps.persist_digest",
+                    label="Persist Regeneration Digest:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Save the last prompt digest in the background so Clean Regeneration survives a restart"
+                ),
             ]
         ),
         
@@ -232,6 +268,7 @@ def get_config_schema() -> List[ConfigSection]:
                     label="User Message Format:",
                     field_type=ConfigFieldType.TEXTAREA,
                     default="{role}: {content}",
+                    validation="format_template",
                     help_text="Template for user messages. Use {role} for 'user', {name} for character name, {content} for message content."
                 ),
                 ConfigField(
@@ -239,6 +276,7 @@ def get_config_schema() -> List[ConfigSection]:
                     label="Character Message Format:",
                     field_type=ConfigFieldType.TEXTAREA,
                     default="{role}: {content}",
+                    validation="format_template",
                     help_text="Template for character messages. Use {role} for 'assistant', {name} for character name, {content} for message content."
                 ),
             ]
@@ -273,6 +311,29 @@ def get_config_schema() -> List[ConfigSection]:
             ]
         ),
         
+        ConfigSection(
+            id="context_settings",
+            title="Context Budget",
+            fields=[
+                ConfigField(
+                    key="context.budget_enabled",
+                    label="Limit Context Size:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Drop the oldest chat messages when the prompt is estimated to exceed the token budget"
+                ),
+                ConfigField(
+                    key="context.max_tokens",
+                    label="Max Tokens:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=100000,
+                    validation="context_max_tokens",
+                    depends_on="context.budget_enabled",
+                    help_text="Approximate token budget for the whole prompt (1000-1000000). System messages and the latest message are always kept."
+                ),
+            ]
+        ),
+        
         ConfigSection(
             id="logging_settings", 
             title="Logging Settings",
@@ -300,6 +361,13 @@ def get_config_schema() -> List[ConfigSection]:
                     validation="max_files",
                     help_text="Maximum number of log files to keep (1-100)"
                 ),
+                ConfigField(
+                    key="logging.export_traces",
+                    label="Export request traces:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Append the timing trace of every request to logs/traces.jsonl"
+                ),
             ]
         ),
         
@@ -333,6 +401,46 @@ def get_config_schema() -> List[ConfigSection]:
                     depends_on="security.api_auth_enabled",
                     help_text="Generate a new secure API key and add it to the list above"
                 ),
+                ConfigField(
+                    key=None,
+                    label="Rate Limiting",
+                    field_type=ConfigFieldType.DIVIDER,
+                    default=None
+                ),
+                ConfigField(
+                    key="security.rate_limit_enabled",
+                    label="Enable Rate Limiting:",
+                    field_type=ConfigFieldType.SWITCH,
+                    default=False,
+                    help_text="Limit how often each API key (or each IP address when authentication is off) can request completions"
+                ),
+                ConfigField(
+                    key="security.rate_limit_per_minute",
+                    label="Requests per Minute:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=20,
+                    validation="rate_limit",
+                    depends_on="security.rate_limit_enabled",
+                    help_text="Sustained completion requests allowed per client each minute (1-1000)"
+                ),
+                ConfigField(
+                    key="security.rate_limit_burst",
+                    label="Burst Size:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=5,
+                    validation="rate_limit",
+                    depends_on="security.rate_limit_enabled",
+                    help_text="Requests a client can make back to back before the per-minute rate applies (1-1000)"
+                ),
+                ConfigField(
+                    key="security.max_concurrent_requests",
+                    label="Max Concurrent Requests:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=1,
+                    validation="max_concurrent",
+                    depends_on="security.rate_limit_enabled",
+                    help_text="Requests a single client can have running at the same time (1-100)"
+                ),
             ]
         ),
         
@@ -354,6 +462,30 @@ def get_config_schema() -> List[ConfigSection]:
                     validation="port",
                     help_text="Port number for the API server (1024-65535)"
                 ),
+                ConfigField(
+                    key="api.server_mode",
+                    label="Server Mode:",
+                    field_type=ConfigFieldType.DROPDOWN,
+                    default="Threaded",
+                    options=["Threaded", "Asyncio"],
+                    help_text="Threaded keeps one worker thread per open request. Asyncio serves connections from an event loop and only uses a thread while work is being done, for many concurrent streaming clients. Applies after restart."
+                ),
+                ConfigField(
+                    key="api.threads",
+                    label="API Threads:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=8,
+                    validation="thread_count",
+                    help_text="Worker threads for client requests (1-64). Each streaming response keeps one busy until it finishes. Applies after restart."
+                ),
+                ConfigField(
+                    key="api.ingest_threads",
+                    label="Extension Threads:",
+                    field_type=ConfigFieldType.TEXT,
+                    default=2,
+                    validation="thread_count",
+                    help_text="Worker threads for the network interception extension's own local listener (1-64). Applies after restart."
+                ),
                 ConfigField(
                     key="show_ip",
                     label="Show IP:",
@@ -0,0 +1,60 @@
+"""
+Immutable configuration snapshots for the request path
+Every dotted key is pre-flattened so lookups are a single dict access
+"""
+
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, Dict
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only deep copy (dicts become mapping proxies, lists become tuples)"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _flatten(tree: Mapping, prefix: str, out: Dict[str, Any]) -> None:
+    """Index every section and value of the tree by its dotted key"""
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        out[path] = value
+        if isinstance(value, Mapping):
+            _flatten(value, f"{path}.", out)
+
+
+class ConfigSnapshot:
+    """Flattened, read-only view of the configuration at one version
+
+    Take one per request (``state.config_snapshot()``) so every lookup in that
+    request sees the same configuration, without locks or dotted-key walks.
+    """
+
+    __slots__ = ('version', 'tree', '_values')
+
+    def __init__(self, config: Mapping, version: int = 0):
+        self.version = version
+        self.tree = _freeze(config)
+        values: Dict[str, Any] = {}
+        _flatten(self.tree, "", values)
+        self._values = values
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a value using dot notation (e.g., 'models.deepseek.email')"""
+        return self._values.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def __repr__(self) -> str:
+        return f"ConfigSnapshot(version={self.version}, keys={len(self._values)})"
+
+
+# Snapshot used when no configuration manager is available
+EMPTY_SNAPSHOT = ConfigSnapshot({})
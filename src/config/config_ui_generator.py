@@ -617,6 +617,9 @@ class ConfigUIGenerator:
                 # Apply console settings immediately after saving
                 self._apply_console_settings_after_save()
                 
+                # Let config-derived caches (message pipeline etc.) rebuild
+                self._notify_config_saved()
+                
                 # Clear reference to this UI generator
                 self._clear_ui_generator_reference()
                 
@@ -642,6 +645,15 @@ class ConfigUIGenerator:
         except Exception as e:
             print(f"Error applying console settings after save: {e}")
     
+    def _notify_config_saved(self) -> None:
+        """Publish CONFIG_UPDATED so observers pick up the saved configuration"""
+        try:
+            from core import get_state_manager
+            
+            get_state_manager().notify_config_saved()
+        except Exception as e:
+            print(f"Error publishing configuration update: {e}")
+    
     def _clear_ui_generator_reference(self) -> None:
         """Clear reference to this UI generator from state manager"""
         try:
@@ -713,6 +725,16 @@ class ConfigUIGenerator:
             browser = ui_config.get("browser", "Chrome")
             return browser == "Custom Chromium"
         
+        # Formatting templates should only be validated with the Custom preset
+        if field.key in ["formatting.user_template", "formatting.char_template"]:
+            preset = ui_config.get("formatting", {}).get("preset", "Classic (Name)")
+            return preset == "Custom"
+        
+        # Rate limit fields should only be validated if rate limiting is enabled
+        if field.key in ["security.rate_limit_per_minute", "security.rate_limit_burst", "security.max_concurrent_requests"]:
+            rate_limit_enabled = ui_config.get("security", {}).get("rate_limit_enabled", False)
+            return rate_limit_enabled
+        
         # By default, validate the field
         return True
     
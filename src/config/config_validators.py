@@ -24,6 +24,12 @@ class ConfigValidator:
             'browser_path': self._validate_browser_path,
             'refresh_idle_timeout': self._validate_refresh_idle_timeout,
             'refresh_grace_period': self._validate_refresh_grace_period,
+            'context_max_tokens': self._validate_context_max_tokens,
+            'rate_limit': self._validate_rate_limit,
+            'max_concurrent': self._validate_max_concurrent,
+            'thread_count': self._validate_thread_count,
+            'console_history': self._validate_console_history,
+            'format_template': self._validate_format_template,
             'dict': self._validate_dict,
             'dict_api_keys': self._validate_dict_api_keys,
         }
@@ -88,6 +94,20 @@ class ConfigValidator:
             
             return True
         
+        # Formatting templates are only editable (and used) with the Custom preset
+        if field.key in ["formatting.user_template", "formatting.char_template"]:
+            return config_data.get("formatting", {}).get("preset") == "Custom"
+        
+        # Context budget should only be validated if the budget is enabled
+        if field.key == "context.max_tokens":
+            budget_enabled = config_data.get("context", {}).get("budget_enabled", False)
+            return budget_enabled
+        
+        # Rate limit fields should only be validated if rate limiting is enabled
+        if field.key in ["security.rate_limit_per_minute", "security.rate_limit_burst", "security.max_concurrent_requests"]:
+            rate_limit_enabled = config_data.get("security", {}).get("rate_limit_enabled", False)
+            return rate_limit_enabled
+        
         # Tunnel fields should only be validated if tunnel is enabled
         if field.key and field.key.startswith("tunnel.") and field.key != "tunnel.enabled":
             tunnel_enabled = config_data.get("tunnel", {}).get("enabled", False)
@@ -344,6 +364,48 @@ class ConfigValidator:
         except ValueError:
             return [f"{field.label} Grace period must be a valid number"]
 
+    def _validate_context_max_tokens(self, field: ConfigField, value) -> List[str]:
+        """Validate context token budget"""
+        return self._validate_int_range(field, value, 1000, 1000000)
+
+    def _validate_rate_limit(self, field: ConfigField, value) -> List[str]:
+        """Validate a rate limit value (requests per minute or burst size)"""
+        return self._validate_int_range(field, value, 1, 1000)
+
+    def _validate_max_concurrent(self, field: ConfigField, value) -> List[str]:
+        """Validate the concurrent request cap"""
+        return self._validate_int_range(field, value, 1, 100)
+
+    def _validate_thread_count(self, field: ConfigField, value) -> List[str]:
+        """Validate a server thread count"""
+        return self._validate_int_range(field, value, 1, 64)
+
+    def _validate_console_history(self, field: ConfigField, value) -> List[str]:
+        """Validate the console history size"""
+        from utils.console_buffer import MIN_MAX_LINES, MAX_MAX_LINES
+        return self._validate_int_range(field, value, MIN_MAX_LINES, MAX_MAX_LINES)
+
+    def _validate_int_range(self, field: ConfigField, value, minimum: int, maximum: int) -> List[str]:
+        """Validate an integer setting stored as int or typed as text"""
+        if value is None or not str(value).strip():
+            return [f"{field.label} Value is required"]
+        
+        try:
+            number = int(str(value).strip())
+        except ValueError:
+            return [f"{field.label} Must be a valid number"]
+        
+        if number < minimum or number > maximum:
+            return [f"{field.label} Must be between {minimum} and {maximum}"]
+        return []
+
+    def _validate_format_template(self, field: ConfigField, value) -> List[str]:
+        """Validate a message formatting template ({role}, {name} and {content} placeholders)"""
+        from processors.template_engine import validate_template
+        
+        template = str(value).rstrip('\n') if value is not None else ""
+        return [f"{field.label} {error}" for error in validate_template(template)]
+
     def _validate_dict(self, field: ConfigField, value) -> List[str]:
         """Validate dictionary field"""
         # Handle both dict values (from DictWidget.get()) and DictWidget instances (for validation during editing)
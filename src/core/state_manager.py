@@ -188,6 +188,18 @@ class StateManager:
                 self._config_manager.set(key, value)
             self._notify_observers(StateEvent.CONFIG_UPDATED, self._config_manager.get_all())
     
+    def notify_config_saved(self) -> None:
+        """Notify observers that the configuration was changed and saved elsewhere (e.g. settings window)"""
+        if self._config_manager:
+            self._notify_observers(StateEvent.CONFIG_UPDATED, self._config_manager.get_all())
+    
+    def config_snapshot(self):
+        """Read-only flattened config snapshot; take one per request for consistent, lock-free lookups"""
+        if self._config_manager:
+            return self._config_manager.snapshot()
+        from config.config_snapshot import EMPTY_SNAPSHOT
+        return EMPTY_SNAPSHOT
+    
     def get_config_value(self, key: str, default: Any = None) -> Any:
         """Get a specific config value with dotted notation (e.g., 'models.deepseek.email')"""
         if self._config_manager:
@@ -336,7 +348,10 @@ class StateManager:
     
     # Utility methods
     def show_message(self, text: str) -> None:
-        """Show message in textbox and console if available"""
+        """Show message in textbox and console if available
+
+        Safe to call from any thread, the textboxes queue the text for the Tk thread.
+        """
         textbox = self.textbox
         logging_manager = self.logging_manager
         console_manager = self.console_manager
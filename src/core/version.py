@@ -0,0 +1,5 @@
+"""
+Application version, shared by the GUI, headless mode and the update check
+"""
+
+__version__ = "1.5.3"
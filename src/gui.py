@@ -8,14 +8,13 @@ from utils.welcome_utils import WelcomeManager
 import utils.console_manager as console_manager
 import utils.webdriver_utils as selenium
 import utils.api_key_generator as api_key_gen
-from packaging import version
+import utils.update_checker as update_checker
 from core import get_state_manager, StateEvent
 
 # New modular config system imports
 from config.config_manager import ConfigManager
 from config.config_ui_generator import ConfigUIGenerator
-
-__version__ = "1.5.3" 
+from core.version import __version__
 
 # Local GUI state (not shared across modules)
 root = None
@@ -184,6 +183,7 @@ def preview_console_changes() -> None:
                     font_size = console_frame.get_widget_value('console.font_size')
                     color_palette = console_frame.get_widget_value('console.color_palette')
                     word_wrap = console_frame.get_widget_value('console.word_wrap')
+                    history_lines = console_frame.get_widget_value('console.history_lines')
                     
                     # Create settings structure expected by ConsoleSettings constructor
                     console_config = {}
@@ -191,6 +191,8 @@ def preview_console_changes() -> None:
                     console_config['font_size'] = int(font_size) if font_size is not None else 12
                     console_config['color_palette'] = color_palette if color_palette is not None else 'Modern'
                     console_config['word_wrap'] = bool(word_wrap) if word_wrap is not None else True
+                    if history_lines is not None:
+                        console_config['history_lines'] = history_lines
                     
                     console_settings = {'console': console_config}
                 else:
@@ -458,6 +460,9 @@ def on_close_root() -> None:
         api.close_selenium()
         process.kill_driver_processes()
 
+        if state.logging_manager:
+            state.logging_manager.close()
+
         temp_files = storage_manager.get_temp_files()
         if temp_files:
             for file in temp_files:
@@ -563,12 +568,19 @@ def create_gui() -> None:
         logging_manager_instance.initialize(config_manager.get_all())
         
         if config_manager.get("check_version", True):
-            current_version = version.parse(__version__)
-            last_version = storage_manager.get_latest_version()
-            if last_version and version.parse(last_version) > current_version:
-            # Just for debugging, I occasionally switch between these
-            # if last_version == "1.4.1":
-                root.after(200, lambda: create_update_window(last_version))
+            # Runs in the background, the window is up before GitHub answers. Tk may only be used from
+            # this thread, so the checking thread just leaves the result here for poll_update_check
+            new_versions = []
+            update_thread = update_checker.check_for_update(__version__, new_versions.append)
+            
+            def poll_update_check():
+                running = update_thread.is_alive()  # Read first, a version appended before it ended is seen below
+                if new_versions:
+                    create_update_window(new_versions[0])
+                elif running:
+                    root.after(250, poll_update_check)
+            
+            root.after(200, poll_update_check)
         
         # Show console if configured to do so
         if config_manager.get("show_console", False) and hasattr(state, 'console_manager') and state.console_manager:
@@ -0,0 +1,162 @@
+"""
+Headless server mode for IntenseRP Next
+Starts the browser and the API without any window, for servers and terminals:
+
+    python src/main.pyw serve [--port PORT] [--quiet]
+
+Only what the API needs gets imported. customtkinter, the fonts and the config UI are never loaded,
+and seleniumbase is only imported once the browser starts.
+"""
+
+import argparse
+import re
+import signal
+import sys
+from typing import List, Optional
+
+import api
+import utils.deepseek_driver as deepseek
+import utils.logging_manager as logging_manager
+import utils.process_manager as process
+import utils.response_utils as response_utils
+import utils.storage_manager as storage
+import utils.update_checker as update_checker
+from config.config_manager import ConfigManager
+from core import get_state_manager, StateEvent
+from core.version import __version__
+
+_COLOR_PATTERN = re.compile(r'\[color:(\w+)\]')
+
+_ANSI_COLORS = {
+    "red": "\033[91m",
+    "green": "\033[92m",
+    "yellow": "\033[93m",
+    "blue": "\033[94m",
+    "cyan": "\033[96m",
+    "white": "\033[97m",
+    "purple": "\033[95m",
+    "orange": "\033[33m",
+    "pink": "\033[35m",
+    "gray": "\033[90m"
+}
+_ANSI_RESET = "\033[0m"
+
+
+class TerminalStream:
+    """Wraps stdout/stderr, turning [color:x] markers into ANSI colors on a terminal and dropping them otherwise"""
+
+    def __init__(self, stream, colors: bool):
+        self.stream = stream
+        self.colors = colors
+
+    def write(self, text: str) -> int:
+        if "[color:" in text:
+            if self.colors:
+                text = _COLOR_PATTERN.sub(lambda match: _ANSI_COLORS.get(match.group(1).lower(), ""), text) + _ANSI_RESET
+            else:
+                text = _COLOR_PATTERN.sub("", text)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class TerminalMessages:
+    """Takes the place of the main window's textbox, messages shown by the app are printed"""
+
+    def colored_add(self, text: str) -> None:
+        print(text.rstrip("\n"))
+
+    def clear(self) -> None:
+        pass
+
+
+def _stop_on_sigterm(signum, frame) -> None:
+    # Unwind like Ctrl+C so the browser and driver processes get closed
+    raise KeyboardInterrupt
+
+
+def serve(port: Optional[int] = None, quiet: bool = False) -> int:
+    """Load the config and run the services until interrupted
+
+    Args:
+        port: Overrides the configured API port (not saved)
+        quiet: Send app messages only to the log files instead of stdout
+
+    Returns:
+        Process exit code
+    """
+    state = get_state_manager()
+    storage_manager = storage.StorageManager()
+    config_manager = ConfigManager(storage_manager)
+    if port is not None:
+        config_manager.set("api.port", port)
+
+    logging_manager_instance = logging_manager.LoggingManager(storage_manager)
+    state.set_config_manager(config_manager)
+    state.logging_manager = logging_manager_instance
+    if not quiet:
+        state.textbox = TerminalMessages()
+
+    deepseek.manager = storage_manager
+    response_utils.__version__ = __version__
+
+    config = config_manager.get_all()
+    if quiet:
+        # Messages have nowhere else to go
+        config = {**config, "logging": {**config.get("logging", {}), "enabled": True}}
+    logging_manager_instance.initialize(config)
+
+    print(f"[color:cyan]IntenseRP Next v{__version__} (headless)")
+    print(f"Base path: {storage_manager.get_base_path()}")
+
+    if config_manager.get("check_version", True):
+        update_checker.check_for_update(
+            __version__,
+            lambda last_version: print(f"[color:yellow]IntenseRP Next v{last_version} is available: {update_checker.RELEASES_PAGE_URL}")
+        )
+
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, _stop_on_sigterm)
+
+    browser_started = []
+
+    def on_state_change(change) -> None:
+        if change.event_type == StateEvent.BROWSER_STARTED:
+            browser_started.append(True)
+
+    state.subscribe(on_state_change)
+
+    try:
+        api.run_services()  # Returns once the server stops
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("[color:yellow]Stopping services...")
+        try:
+            api.close_selenium()
+            process.kill_driver_processes()
+            for file in storage_manager.get_temp_files():
+                storage_manager.delete_file("temp", file)
+        except Exception as e:
+            print(f"Error stopping services: {e}")
+        logging_manager_instance.close()
+
+    return 0 if browser_started else 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="main.pyw serve", description="Run IntenseRP Next without the GUI")
+    parser.add_argument("--port", type=int, help="API port (overrides the configured one for this run)")
+    parser.add_argument("--quiet", action="store_true", help="Write app messages to the log files only")
+    parser.add_argument("--no-color", action="store_true", help="Don't color terminal output")
+    args = parser.parse_args(argv)
+
+    colors = not args.no_color and sys.stdout.isatty()
+    sys.stdout = TerminalStream(sys.stdout, colors)
+    sys.stderr = TerminalStream(sys.stderr, colors and sys.stderr.isatty())
+
+    return serve(args.port, args.quiet)
@@ -1,4 +1,10 @@
-import gui
+import sys
 
 if __name__ == "__main__":
-    gui.create_gui()
\ No newline at end of file
+    if sys.argv[1:2] == ["serve"]:
+        # Headless server, never loads Tk
+        import headless
+        sys.exit(headless.main(sys.argv[2:]))
+    else:
+        import gui
+        gui.create_gui()
\ No newline at end of file
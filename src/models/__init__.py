@@ -9,7 +9,9 @@ from .message_models import (
     CharacterInfo,
     ProcessedMessage,
     ChatResponse,
-    DeepSeekSettings
+    DeepSeekSettings,
+    DirectiveScan,
+    scan_directives
 )
 
 __all__ = [
@@ -19,5 +21,7 @@ __all__ = [
     'CharacterInfo',
     'ProcessedMessage',
     'ChatResponse',
-    'DeepSeekSettings'
+    'DeepSeekSettings',
+    'DirectiveScan',
+    'scan_directives'
 ]
\ No newline at end of file
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from enum import Enum
 import re
@@ -10,7 +11,11 @@ class MessageRole(Enum):
     ASSISTANT = "assistant"
 
 
-@dataclass
+# Role lookup for Message.from_dict (unknown roles are treated as user messages)
+_ROLES_BY_VALUE = {role.value: role for role in MessageRole}
+
+
+@dataclass(slots=True)
 class Message:
     role: MessageRole
     content: str
@@ -21,7 +26,7 @@ class Message:
     def from_dict(cls, data: Dict[str, Any]) -> 'Message':
         role_str = data.get('role', 'user').lower()
         original_role = data.get('role', 'user')  # Store original case-preserved role
-        role = MessageRole(role_str) if role_str in [r.value for r in MessageRole] else MessageRole.USER
+        role = _ROLES_BY_VALUE.get(role_str, MessageRole.USER)
         name = data.get('name') or data.get('irp-next')  # Extract optional name field (supports both 'name' and 'irp-next')
         
         # Handle both string and multimodal content formats
@@ -70,7 +75,7 @@ class Message:
         return self.role == MessageRole.ASSISTANT and self.name is not None and self.name.strip() != ""
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatRequest:
     messages: List[Message]
     temperature: float = 1.0
@@ -92,6 +97,13 @@ class ChatRequest:
     # Prefix support for assistant prefill
     prefix_content: Optional[str] = None  # Assistant message content to prefill
     
+    # Filled in by the processing pipeline
+    _character_info: Optional['CharacterInfo'] = field(default=None, init=False, repr=False, compare=False)
+    _prompt_segments: Optional[List[str]] = field(default=None, init=False, repr=False, compare=False)  # Formatted messages
+    _prompt_separator: str = field(default="\n\n", init=False, repr=False, compare=False)
+    _processed_content: Optional[str] = field(default=None, init=False, repr=False, compare=False)  # Legacy combined content
+    _context_trim: Any = field(default=None, init=False, repr=False, compare=False)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ChatRequest':
         messages = [Message.from_dict(msg) for msg in data.get('messages', [])]
@@ -254,6 +266,40 @@ class ChatResponse:
             }
 
 
+# Single pattern for every directive plus the blank-line cleanup, so a message is scanned once.
+# Each directive also eats the whitespace after it, exactly like the old per-directive re.sub passes.
+_DIRECTIVE_PATTERN = re.compile(
+    r'(?P<r1>{{r1}}|\[r1\]|\(r1\))\s*'
+    r'|(?P<search>{{search}}|\[search\])\s*'
+    r'|(?P<blank>\n\s*\n)',
+    re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class DirectiveScan:
+    """Result of scanning one message for DeepSeek directives"""
+    deepthink: bool
+    search: bool
+    content: str  # Content with directives removed and blank lines collapsed
+
+
+@lru_cache(maxsize=4096)
+def scan_directives(content: str) -> DirectiveScan:
+    """Detect and strip {{r1}}/[r1]/(r1) and {{search}}/[search] in one pass (cached per content)"""
+    found = {'r1': False, 'search': False}
+    
+    def replace(match: re.Match) -> str:
+        group = match.lastgroup
+        if group == 'blank':
+            return '\n\n'
+        found[group] = True
+        return ''
+    
+    cleaned = _DIRECTIVE_PATTERN.sub(replace, content).strip()
+    return DirectiveScan(deepthink=found['r1'], search=found['search'], content=cleaned)
+
+
 @dataclass
 class DeepSeekSettings:
     """DeepSeek-specific processing settings"""
@@ -266,35 +312,16 @@ class DeepSeekSettings:
         """Auto-detect settings from message content"""
         settings = cls()
         
-        # Check all user messages for directives
+        # Check all user messages for directives (scans are cached, so cleaning reuses them)
         for message in messages:
             if message.role == MessageRole.USER:
-                content = message.content
-                
-                # Check for deepthink markers
-                if re.search(r'({{r1}}|\[r1\]|\(r1\))', content, re.IGNORECASE):
-                    settings.deepthink = True
-                
-                # Check for search markers
-                if re.search(r'({{search}}|\[search\])', content, re.IGNORECASE):
-                    settings.search = True
+                scan = scan_directives(message.content)
+                settings.deepthink = settings.deepthink or scan.deepthink
+                settings.search = settings.search or scan.search
         
         return settings
     
     @staticmethod
     def clean_directives_from_content(content: str) -> str:
         """Remove DeepSeek directives from message content"""
-        # Remove deepthink markers
-        content = re.sub(r'{{r1}}\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\[r1\]\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\(r1\)\s*', '', content, flags=re.IGNORECASE)
-        
-        # Remove search markers
-        content = re.sub(r'{{search}}\s*', '', content, flags=re.IGNORECASE)
-        content = re.sub(r'\[search\]\s*', '', content, flags=re.IGNORECASE)
-        
-        # Clean up extra whitespace
-        content = re.sub(r'\n\s*\n', '\n\n', content)  # Remove empty lines with only whitespace
-        content = content.strip()
-        
-        return content
\ No newline at end of file
+        return scan_directives(content).content
\ No newline at end of file
@@ -5,6 +5,8 @@ Message processing pipeline for the IntenseRP API.
 from .message_pipeline import (
     MessagePipeline,
     PipelineFactory,
+    get_message_pipeline,
+    invalidate_message_pipeline,
     process_character_data,
     get_streaming_setting,
     get_deepseek_settings
@@ -13,6 +15,8 @@ from .message_pipeline import (
 __all__ = [
     'MessagePipeline',
     'PipelineFactory',
+    'get_message_pipeline',
+    'invalidate_message_pipeline',
     'process_character_data',
     'get_streaming_setting', 
     'get_deepseek_settings'
@@ -1,9 +1,11 @@
+import threading
 from typing import Dict, Any, Optional
 from processors.base_processor import ProcessorPipeline, ProcessingError
-from processors.character_processor import CharacterProcessor, MessageFormatter
+from processors.character_processor import CharacterProcessor, MessageFormatter, assemble_prompt
 from processors.deepseek_processor import DeepSeekProcessor
+from processors.context_processor import ContextBudgetProcessor
 from processors.content_processor import ContentProcessor
-from models.message_models import ChatRequest, ChatResponse, DeepSeekSettings
+from models.message_models import ChatRequest, ChatResponse, DeepSeekSettings, CharacterInfo
 
 
 class MessagePipeline:
@@ -13,13 +15,18 @@ class MessagePipeline:
         self.config = config or {}
         self.pipeline = ProcessorPipeline()
         self.content_processor = ContentProcessor()
+        self.formatter = MessageFormatter(self.config.get('config_manager'))
         self._setup_pipeline()
     
     def _setup_pipeline(self):
         """Setup the processing pipeline with default processors"""
+        # One formatter (and one segment cache) for the processors and format_continuation
+        processor_config = {**self.config, 'formatter': self.formatter}
+
         # Add processors in order
-        self.pipeline.add_processor(DeepSeekProcessor(self.config))
-        self.pipeline.add_processor(CharacterProcessor(self.config))
+        self.pipeline.add_processor(DeepSeekProcessor(processor_config))
+        self.pipeline.add_processor(CharacterProcessor(processor_config))
+        self.pipeline.add_processor(ContextBudgetProcessor(processor_config))
     
     def process_request(self, request_data: Dict[str, Any]) -> ChatRequest:
         """Process incoming request data into a ChatRequest"""
@@ -37,13 +44,17 @@ class MessagePipeline:
     
     def format_for_api(self, request: ChatRequest) -> str:
         """Format processed request for API consumption"""
-        # Create formatter with config
-        formatter = MessageFormatter(self.config.get('config_manager') if self.config else None)
-        
         # Extract character info from request if available
         character_info = getattr(request, '_character_info', None)
         
-        return formatter.format_for_api(request, character_info)
+        return self.formatter.format_for_api(request, character_info)
+    
+    def format_continuation(self, request: ChatRequest, start: int) -> str:
+        """Format only the messages from index ``start`` onwards, to continue an existing chat"""
+        character_info = getattr(request, '_character_info', None) or CharacterInfo()
+        
+        segments, separator = self.formatter.format_segments(request, character_info, start)
+        return assemble_prompt(segments, separator, request)
     
     def process_response_content(self, html_content: str) -> str:
         """Process HTML response content to clean markdown"""
@@ -63,6 +74,7 @@ class MessagePipeline:
         
         # Recreate pipeline with new config
         self.pipeline = ProcessorPipeline()
+        self.formatter = MessageFormatter(self.config.get('config_manager'))
         self._setup_pipeline()
     
     def get_pipeline_info(self) -> Dict[str, Any]:
@@ -103,6 +115,60 @@ class PipelineFactory:
         return pipeline
 
 
+# Shared pipeline, rebuilt only when the configuration changes
+_shared_pipeline: Optional[MessagePipeline] = None
+_shared_pipeline_key = None
+_shared_pipeline_lock = threading.Lock()
+_subscribed_to_config = False
+
+
+def _on_state_change(change) -> None:
+    """Drop the shared pipeline when the configuration is updated"""
+    from core import StateEvent
+    
+    if change.event_type == StateEvent.CONFIG_UPDATED:
+        invalidate_message_pipeline()
+
+
+def get_message_pipeline(config_manager=None) -> MessagePipeline:
+    """
+    Get the shared pipeline for the current configuration version.
+    
+    The pipeline is built once per config version and reused by every request
+    thread; processors keep no per-request state, so sharing is safe. It is
+    rebuilt when the config manager's version changes or CONFIG_UPDATED fires.
+    """
+    global _shared_pipeline, _shared_pipeline_key, _subscribed_to_config
+    
+    key = (id(config_manager), getattr(config_manager, 'version', 0))
+    pipeline = _shared_pipeline
+    if pipeline is not None and _shared_pipeline_key == key:
+        return pipeline
+    
+    with _shared_pipeline_lock:
+        if _shared_pipeline is not None and _shared_pipeline_key == key:
+            return _shared_pipeline
+        
+        if not _subscribed_to_config:
+            from core import get_state_manager
+            get_state_manager().subscribe(_on_state_change)
+            _subscribed_to_config = True
+        
+        config = config_manager.get_all() if config_manager else {}
+        config['config_manager'] = config_manager
+        _shared_pipeline = MessagePipeline(config)
+        _shared_pipeline_key = key
+        return _shared_pipeline
+
+
+def invalidate_message_pipeline() -> None:
+    """Force the shared pipeline to be rebuilt on next use"""
+    global _shared_pipeline, _shared_pipeline_key
+    with _shared_pipeline_lock:
+        _shared_pipeline = None
+        _shared_pipeline_key = None
+
+
 # Utility functions for backward compatibility
 def process_character_data(data: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Optional[str]:
     """Legacy function for processing character data - maintains backward compatibility"""
@@ -6,6 +6,8 @@ from .base_processor import BaseProcessor, ProcessorPipeline, ProcessingError
 from .character_processor import CharacterProcessor, MessageFormatter
 from .content_processor import ContentProcessor
 from .deepseek_processor import DeepSeekProcessor, DeepSeekConfigValidator
+from .context_processor import ContextBudgetProcessor, ContextTrim, count_tokens, estimate_tokens
+from .template_engine import CompiledTemplate, TemplateError, compile_template, validate_template
 
 __all__ = [
     'BaseProcessor',
@@ -15,5 +17,13 @@ __all__ = [
     'MessageFormatter',
     'ContentProcessor',
     'DeepSeekProcessor',
-    'DeepSeekConfigValidator'
+    'DeepSeekConfigValidator',
+    'ContextBudgetProcessor',
+    'ContextTrim',
+    'count_tokens',
+    'estimate_tokens',
+    'CompiledTemplate',
+    'TemplateError',
+    'compile_template',
+    'validate_template'
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional
 from models.message_models import ChatRequest, ProcessedMessage
+from utils.tracing import span
 
 
 class ProcessingError(Exception):
@@ -59,7 +60,8 @@ class ProcessorPipeline:
         for processor in self.processors:
             try:
                 if processor.can_process(current_request):
-                    current_request = processor.process(current_request)
+                    with span(processor.__class__.__name__):
+                        current_request = processor.process(current_request)
             except Exception as e:
                 raise ProcessingError(f"Error in {processor.__class__.__name__}: {e}") from e
         
@@ -1,8 +1,32 @@
 import re
-from typing import Dict, Any
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 from processors.base_processor import BaseProcessor
+from processors.template_engine import compile_template, render_injection
 from models.message_models import ChatRequest, CharacterInfo, MessageRole, Message
 
+# Precompiled patterns for the combined-content pass
+_DATA1_PATTERN = re.compile(r'DATA1:\s*"([^"]*)"')
+_DATA2_PATTERN = re.compile(r'DATA2:\s*"([^"]*)"')
+_MARKER_PATTERN = re.compile(r'DATA[12]:\s*"[^"]*"|(?i:{{r1}}|\[r1\]|\(r1\)|{{search}}|\[search\])')
+_SYSTEM_PREFIX_PATTERN = re.compile(r'(^|\n\n)system:\s*')
+_ASSISTANT_PREFIX_PATTERN = re.compile(r'(^|\n\n)assistant:\s*')
+_USER_PREFIX_PATTERN = re.compile(r'(^|\n\n)user:\s*')
+_EXTRA_NEWLINES_PATTERN = re.compile(r"\n{3,}")
+
+
+@lru_cache(maxsize=4096)
+def _find_data_names(content: str) -> Tuple[Optional[str], Optional[str]]:
+    """DATA1/DATA2 values in a single message (cached per content)"""
+    character_match = _DATA1_PATTERN.search(content)
+    user_match = _DATA2_PATTERN.search(content)
+    return (
+        character_match.group(1) if character_match else None,
+        user_match.group(1) if user_match else None
+    )
+
 
 class CharacterProcessor(BaseProcessor):
     """Processes character-specific data and formatting"""
@@ -10,6 +34,7 @@ class CharacterProcessor(BaseProcessor):
     def __init__(self, config=None):
         super().__init__(config)
         self.config_manager = config.get('config_manager') if config else None
+        self.formatter = (self.config.get('formatter') or MessageFormatter(self.config_manager)) if self.config_manager else None
     
     def can_process(self, request: ChatRequest) -> bool:
         """Always can process character data"""
@@ -21,11 +46,8 @@ class CharacterProcessor(BaseProcessor):
         # Clean up duplicate system messages first
         self._cleanup_duplicate_system_messages(request)
         
-        # Use the original approach: combine all messages, then process the combined string
-        combined_content = self._combine_messages(request)
-        
         # Extract character info - prioritize API parameters over message content
-        character_info = self._extract_character_info_from_combined(combined_content)
+        character_info = self._extract_character_info(request)
         
         # Extract user names from individual messages (STMP-style)
         self._extract_user_names_from_messages(request, character_info)
@@ -37,22 +59,17 @@ class CharacterProcessor(BaseProcessor):
             character_info.user_name = request.api_user_name
             character_info.add_user_name(request.api_user_name)
         
-        # Process the combined content (like original logic)
-        processed_content = self._process_combined_content(combined_content, character_info, request)
-        
         # Store character info on request for later use
         request._character_info = character_info
         
         # Apply new formatting system if configured
-        if self.config_manager:
-            formatter = MessageFormatter(self.config_manager)
-            formatted_content = formatter.format_messages(request, character_info)
-            # Apply template replacements from original logic
-            formatted_content = self._apply_template_replacements(formatted_content, request)
-            request._processed_content = formatted_content
+        if self.formatter:
+            # Keep the formatted segments; they're joined once, together with the injection, in format_for_api
+            request._prompt_segments, request._prompt_separator = self.formatter.format_segments(request, character_info)
         else:
-            # Fallback to original logic
-            request._processed_content = processed_content
+            # Fallback to original logic: combine all messages, then process the combined string
+            combined_content = self._combine_messages(request)
+            request._processed_content = self._process_combined_content(combined_content, character_info, request)
         
         return request
     
@@ -77,12 +94,35 @@ class CharacterProcessor(BaseProcessor):
             formatted_messages.append(f"{role_display}: {msg.content}")
         return "\n\n".join(formatted_messages)
     
+    def _extract_character_info(self, request: ChatRequest) -> CharacterInfo:
+        """Extract character info from the first DATA1/DATA2 found in the messages, in order"""
+        character_info = CharacterInfo()
+        character_name = None
+        user_name = None
+        
+        for msg in request.messages:
+            found_character, found_user = _find_data_names(msg.content)
+            if character_name is None:
+                character_name = found_character
+            if user_name is None:
+                user_name = found_user
+            if character_name is not None and user_name is not None:
+                break
+        
+        if character_name is not None:
+            character_info.character_name = character_name
+        if user_name is not None:
+            character_info.user_name = user_name
+            character_info.add_user_name(user_name)
+        
+        return character_info
+    
     def _extract_character_info_from_combined(self, content: str) -> CharacterInfo:
         """Extract character info from combined content (original approach)"""
         character_info = CharacterInfo()
         
-        character_match = re.search(r'DATA1:\s*"([^"]*)"', content)
-        user_match = re.search(r'DATA2:\s*"([^"]*)"', content)
+        character_match = _DATA1_PATTERN.search(content)
+        user_match = _DATA2_PATTERN.search(content)
         
         if character_match:
             character_info.character_name = character_match.group(1)
@@ -101,13 +141,8 @@ class CharacterProcessor(BaseProcessor):
     def _process_combined_content(self, content: str, character_info: CharacterInfo, request: ChatRequest) -> str:
         """Process combined content using original logic"""
         
-        # Remove DATA1 and DATA2 lines
-        content = re.sub(r'DATA1:\s*"[^"]*"', "", content)
-        content = re.sub(r'DATA2:\s*"[^"]*"', "", content)
-        
-        # Remove other markers
-        content = re.sub(r"({{r1}}|\[r1\]|\(r1\))", "", content, flags=re.IGNORECASE)
-        content = re.sub(r"({{search}}|\[search\])", "", content, flags=re.IGNORECASE)
+        # Remove DATA1/DATA2 lines and {{r1}}/[search] style markers in one pass
+        content = _MARKER_PATTERN.sub("", content)
         
         # Replace role names only if we have explicit character info from DATA1/DATA2
         # This prevents corrupting existing character names in user content
@@ -119,13 +154,13 @@ class CharacterProcessor(BaseProcessor):
         if has_explicit_char_info:
             # Only replace role prefixes at the start of lines or after double newlines
             # to avoid corrupting existing character names in content
-            content = re.sub(r'(^|\n\n)system:\s*', r'\1', content)
-            content = re.sub(r'(^|\n\n)assistant:\s*', fr'\1{character_info.character_name}: ', content)
-            content = re.sub(r'(^|\n\n)user:\s*', fr'\1{character_info.user_name}: ', content)
+            content = _SYSTEM_PREFIX_PATTERN.sub(r'\1', content)
+            content = _ASSISTANT_PREFIX_PATTERN.sub(fr'\1{character_info.character_name}: ', content)
+            content = _USER_PREFIX_PATTERN.sub(fr'\1{character_info.user_name}: ', content)
         else:
             # If no explicit character info, preserve custom roles and just remove system role prefix
             # but preserve user/assistant content as-is to avoid corrupting character names
-            content = re.sub(r'(^|\n\n)system:\s*', r'\1', content)
+            content = _SYSTEM_PREFIX_PATTERN.sub(r'\1', content)
             
             # For custom roles, preserve the role name as-is when no explicit character info
             # This allows custom roles like "Narrator:" to remain unchanged
@@ -137,13 +172,51 @@ class CharacterProcessor(BaseProcessor):
     
     def _apply_template_replacements(self, content: str, request: ChatRequest) -> str:
         """Apply template variable replacements"""
-        content = content.replace("{{temperature}}", str(request.temperature))
-        content = content.replace("{{max_tokens}}", str(request.max_tokens))
-        
-        # Clean up extra newlines
-        content = re.sub(r"\n{3,}", "\n\n", content)
-        
-        return content.strip()
+        return apply_template_replacements(content, request)
+
+
+def apply_template_replacements(content: str, request: ChatRequest) -> str:
+    """Apply template variable replacements and clean up extra newlines"""
+    content = content.replace("{{temperature}}", str(request.temperature))
+    content = content.replace("{{max_tokens}}", str(request.max_tokens))
+    
+    # Clean up extra newlines
+    content = _EXTRA_NEWLINES_PATTERN.sub("\n\n", content)
+    
+    return content.strip()
+
+
+def assemble_prompt(segments: List[str], separator: str, request: ChatRequest, header: Optional[str] = None) -> str:
+    """
+    Join formatted segments (and an optional injection header) with a single join.
+    
+    Same result as ``header + "\n" + apply_template_replacements(separator.join(segments))``.
+    MessageFormatter collapses newline runs inside each segment when it formats it, so the
+    whole prompt only needs another pass when a run could form across a segment boundary.
+    """
+    if not segments or '\n\n\n' in separator or any(s[:1] == '\n' or s[-1:] == '\n' for s in segments):
+        content = apply_template_replacements(separator.join(segments), request)
+        return f"{header}\n{content}" if header else content
+    
+    temperature = str(request.temperature)
+    max_tokens = str(request.max_tokens)
+    
+    parts = []
+    for segment in segments:
+        if '{{' in segment:
+            segment = segment.replace("{{temperature}}", temperature).replace("{{max_tokens}}", max_tokens)
+        parts.append(segment)
+    
+    # Outer whitespace of the whole prompt
+    parts[0] = parts[0].lstrip()
+    parts[-1] = parts[-1].rstrip()
+    if not parts[0] or not parts[-1]:
+        content = apply_template_replacements(separator.join(segments), request)
+        return f"{header}\n{content}" if header else content
+    
+    if header:
+        parts[0] = f"{header}\n{parts[0]}"
+    return separator.join(parts)
 
 
 class MessageFormatter:
@@ -183,8 +256,14 @@ class MessageFormatter:
         }
     }
     
+    # Upper bound on memoized message segments (per formatter)
+    SEGMENT_CACHE_SIZE = 8192
+    
     def __init__(self, config_manager=None):
         self.config_manager = config_manager
+        self._segment_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._segment_cache_lock = threading.Lock()
+        self._custom_templates: Optional[Tuple[int, str, str]] = None  # (config version, user, char)
     
     def format_for_api(self, request: ChatRequest, character_info: CharacterInfo = None) -> str:
         """Format messages for API consumption with configurable prompt injection"""
@@ -193,9 +272,18 @@ class MessageFormatter:
         if character_info is None:
             character_info = CharacterInfo()
         
+        # Formatted segments are joined together with the injection in a single pass
+        if request._prompt_segments is not None:
+            return assemble_prompt(
+                request._prompt_segments,
+                request._prompt_separator,
+                request,
+                self._get_injection_header(character_info, request)
+            )
+        
         # Get the message content
         content = ""
-        if hasattr(request, '_processed_content'):
+        if request._processed_content is not None:
             content = request._processed_content
         else:
             # Fallback to individual message processing
@@ -212,12 +300,21 @@ class MessageFormatter:
             
             content = "\n\n".join(formatted_messages).strip()
         
+        # Return formatted content with system prompt
+        system_prompt = self._get_injection_header(character_info, request)
+        if system_prompt:
+            return f"{system_prompt}\n{content}"
+        else:
+            return content
+    
+    def _get_injection_header(self, character_info: CharacterInfo, request: ChatRequest) -> Optional[str]:
+        """System prompt placed before the messages, or None when injection is disabled/empty"""
         # Handle prompt injection based on configuration
         injection_enabled = self._get_config_value('injection.enabled', True)
         
         if not injection_enabled:
             # No prompt injection - return content directly
-            return content
+            return None
         
         # Get custom system prompt template
         system_prompt_template = self._get_config_value('injection.system_prompt', '[Important Instructions]')
@@ -225,156 +322,165 @@ class MessageFormatter:
         # Apply placeholder substitutions
         system_prompt = self._apply_injection_placeholders(system_prompt_template, character_info, request)
         
-        # Return formatted content with system prompt
-        if system_prompt.strip():
-            return f"{system_prompt}\n{content}"
-        else:
-            return content
+        return system_prompt if system_prompt.strip() else None
     
     def _apply_injection_placeholders(self, template: str, character_info: CharacterInfo, request: ChatRequest) -> str:
         """Apply placeholder substitutions to system prompt template"""
-        if not template:
-            return template
-        
-        # Replace {username} with user name
-        username = character_info.user_name or "User"
-        template = template.replace("{username}", username)
-        
-        # Replace {asstname} with character/assistant name
-        asstname = character_info.character_name or "Assistant"
-        template = template.replace("{asstname}", asstname)
-        
-        return template
+        # {username} -> user name, {asstname} -> character/assistant name (cached per names)
+        return render_injection(
+            template,
+            character_info.user_name or "User",
+            character_info.character_name or "Assistant"
+        )
     
     def format_messages(self, request: ChatRequest, character_info: CharacterInfo) -> str:
         """Format messages based on current configuration"""
+        segments, separator = self.format_segments(request, character_info)
+        return separator.join(segments)
+    
+    def format_segments(self, request: ChatRequest, character_info: CharacterInfo, start: int = 0) -> Tuple[List[str], str]:
+        """Format each message (from index ``start``) into a segment, returning the segments and the separator to join them with"""
         
         # Get formatting configuration
         preset = self._get_config_value('formatting.preset', 'Classic (Name)')
         
         if preset == 'Custom':
-            return self._format_custom(request, character_info)
-        elif preset in self.PRESETS:
-            return self._format_preset(request, character_info, preset)
-        else:
+            return self._custom_segments(request, character_info, start), '\n\n'
+        elif preset not in self.PRESETS:
             # Fallback to Classic
-            return self._format_preset(request, character_info, 'Classic')
+            preset = 'Classic'
+        
+        preset_config = self.PRESETS[preset]
+        return self._preset_segments(request, character_info, preset_config['pattern'], start), preset_config['separator']
     
     def _get_config_value(self, key: str, default: Any) -> Any:
         """Get configuration value with fallback"""
         if self.config_manager:
+            # Flattened snapshot lookup when available (O(1), no dotted-key walk)
+            if hasattr(self.config_manager, 'snapshot'):
+                return self.config_manager.snapshot().get(key, default)
             return self.config_manager.get(key, default)
         return default
     
-    def _format_preset(self, request: ChatRequest, character_info: CharacterInfo, preset: str) -> str:
-        """Format using a predefined preset"""
-        preset_config = self.PRESETS[preset]
+    def _format_segment(self, template: str, role: str, name: str, content: str) -> str:
+        """Format one message, memoized on (template, role, name, content)"""
+        key = (template, role, name, content)
         
-        formatted_messages = []
+        with self._segment_cache_lock:
+            segment = self._segment_cache.get(key)
+            if segment is not None:
+                self._segment_cache.move_to_end(key)
+                return segment
         
-        for message in request.messages:
-            if not message.content.strip():
+        segment = compile_template(template).render(role, name, content.strip())
+        
+        # Collapse newline runs once here instead of over the whole prompt every request
+        if '\n\n\n' in segment:
+            segment = _EXTRA_NEWLINES_PATTERN.sub("\n\n", segment)
+        
+        with self._segment_cache_lock:
+            self._segment_cache[key] = segment
+            if len(self._segment_cache) > self.SEGMENT_CACHE_SIZE:
+                self._segment_cache.popitem(last=False)
+        
+        return segment
+    
+    def _preset_segments(self, request: ChatRequest, character_info: CharacterInfo, pattern: str, start: int = 0) -> List[str]:
+        """Format messages with a preset pattern (presets use {role} for literal roles)"""
+        segments = []
+        
+        for message in (request.messages[start:] if start else request.messages):
+            content = message.content
+            if not content or content.isspace():
                 continue
-                
-            # Get both role and name for template substitution
-            literal_role = self._get_literal_role(message)
-            character_name = self._get_character_name(message, character_info)
             
-            # Apply pattern (presets use {role} for literal roles)
-            formatted_message = preset_config['pattern'].format(
-                role=literal_role,
-                name=character_name,
-                content=message.content.strip()
-            )
-            
-            formatted_messages.append(formatted_message)
+            # Get both role and name for template substitution
+            segments.append(self._format_segment(
+                pattern,
+                self._get_literal_role(message),
+                self._get_character_name(message, character_info),
+                content
+            ))
         
         # If we have prefix content, add it as a fake assistant message
         if request.has_prefix():
-            # Create a fake assistant message for the prefix
-            fake_assistant_msg = Message(role=MessageRole.ASSISTANT, content=request.prefix_content, original_role="assistant")
-            
-            # Get both role and name for template substitution
-            literal_role = self._get_literal_role(fake_assistant_msg)
-            character_name = character_info.character_name
-            
-            # Apply pattern (presets use {role} for literal roles)
-            formatted_prefix = preset_config['pattern'].format(
-                role=literal_role,
-                name=character_name,
-                content=request.prefix_content.strip()
-            )
-            
-            formatted_messages.append(formatted_prefix)
-        
-        # Join with separator
-        result = preset_config['separator'].join(formatted_messages)
+            segments.append(self._format_prefix(request, character_info, pattern))
         
-        return result
+        return segments
     
-    def _format_custom(self, request: ChatRequest, character_info: CharacterInfo) -> str:
-        """Format using custom templates"""
+    def _custom_segments(self, request: ChatRequest, character_info: CharacterInfo, start: int = 0) -> List[str]:
+        """Format messages with the custom user/character templates"""
         
-        # Get custom templates from hidden variables
-        user_template = self.config_manager.get_hidden_var('custom_user_template', '{name}: {content}')
-        char_template = self.config_manager.get_hidden_var('custom_char_template', '{name}: {content}')
+        # Get custom templates from hidden variables (fetched once per config version)
+        user_template, char_template = self._get_custom_templates()
         
-        formatted_messages = []
+        segments = []
         
-        for message in request.messages:
-            if not message.content.strip():
+        for message in (request.messages[start:] if start else request.messages):
+            content = message.content
+            if not content or content.isspace():
                 continue
-                
+            
             # Choose template based on role
             if message.is_custom_role():
                 # Custom roles use their original name as the template
                 template = '{name}: {content}'
             elif message.role == MessageRole.USER:
                 template = user_template
-            elif message.role == MessageRole.ASSISTANT:
-                template = char_template
-            elif message.role == MessageRole.SYSTEM:
+            elif message.role in (MessageRole.ASSISTANT, MessageRole.SYSTEM):
                 # System messages use character template
                 template = char_template
             else:
                 # Fallback
                 template = '{name}: {content}'
             
-            # Get both role and name for template substitution
-            literal_role = self._get_literal_role(message)
-            character_name = self._get_character_name(message, character_info)
-            
             # Apply template (supports both {role} and {name})
-            formatted_message = template.format(
-                role=literal_role,
-                name=character_name,
-                content=message.content.strip()
-            )
-            
-            formatted_messages.append(formatted_message)
-        
-        # If we have prefix content, add it as a fake assistant message
+            segments.append(self._format_segment(
+                template,
+                self._get_literal_role(message),
+                self._get_character_name(message, character_info),
+                content
+            ))
+        
+        # If we have prefix content, add it as a fake assistant message using the assistant template
         if request.has_prefix():
-            # Create a fake assistant message for the prefix
-            fake_assistant_msg = Message(role=MessageRole.ASSISTANT, content=request.prefix_content, original_role="assistant")
-            
-            # Use assistant template for the prefix
-            template = char_template
-            
-            # Get both role and name for template substitution
-            literal_role = self._get_literal_role(fake_assistant_msg)
-            character_name = character_info.character_name
-            
-            # Apply template (supports both {role} and {name})
-            formatted_prefix = template.format(
-                role=literal_role,
-                name=character_name,
-                content=request.prefix_content.strip()
-            )
-            
-            formatted_messages.append(formatted_prefix)
+            segments.append(self._format_prefix(request, character_info, char_template))
         
-        return '\n\n'.join(formatted_messages)
+        return segments
+    
+    def _get_custom_templates(self) -> Tuple[str, str]:
+        """Custom user/character templates, re-read from the hidden variables when the config changes"""
+        version = getattr(self.config_manager, 'version', 0)
+        cached = self._custom_templates
+        if cached is None or cached[0] != version:
+            cached = (
+                version,
+                self.config_manager.get_hidden_var('custom_user_template', '{name}: {content}'),
+                self.config_manager.get_hidden_var('custom_char_template', '{name}: {content}')
+            )
+            self._custom_templates = cached
+        return cached[1], cached[2]
+    
+    def _format_prefix(self, request: ChatRequest, character_info: CharacterInfo, template: str) -> str:
+        """Format the prefill content as a fake assistant message (not cached, it changes every turn)"""
+        fake_assistant_msg = Message(role=MessageRole.ASSISTANT, content=request.prefix_content, original_role="assistant")
+        
+        segment = compile_template(template).render(
+            self._get_literal_role(fake_assistant_msg),
+            character_info.character_name,
+            request.prefix_content.strip()
+        )
+        return _EXTRA_NEWLINES_PATTERN.sub("\n\n", segment) if '\n\n\n' in segment else segment
+    
+    def _format_preset(self, request: ChatRequest, character_info: CharacterInfo, preset: str) -> str:
+        """Format using a predefined preset"""
+        preset_config = self.PRESETS[preset]
+        segments = self._preset_segments(request, character_info, preset_config['pattern'])
+        return preset_config['separator'].join(segments)
+    
+    def _format_custom(self, request: ChatRequest, character_info: CharacterInfo) -> str:
+        """Format using custom templates"""
+        return '\n\n'.join(self._custom_segments(request, character_info))
     
     def _get_literal_role(self, message) -> str:
         """Get the literal role name (supports custom roles)"""
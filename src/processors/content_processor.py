@@ -1,6 +1,9 @@
+from __future__ import annotations
 import re
-from typing import Optional
-from bs4 import BeautifulSoup
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
 
 
 class ContentProcessor:
@@ -28,7 +31,8 @@ class ContentProcessor:
             # Clean up HTML structure first
             cleaned_html = self._remove_em_inside_strong(html_content)
             
-            # Parse with BeautifulSoup
+            # Parse with BeautifulSoup (imported here, it's only needed once a response comes in)
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(cleaned_html, 'html.parser')
             
             # Process in order of importance
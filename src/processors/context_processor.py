@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List
+from processors.base_processor import BaseProcessor
+from processors.character_processor import MessageFormatter
+from models.message_models import ChatRequest, MessageRole
+
+
+# Framing added around every message by the formatting presets (role/name labels, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def count_tokens(text: str) -> int:
+    """
+    Fast approximate token count.
+
+    English averages ~4 characters per token, while CJK and other non-ASCII
+    scripts are closer to one token per character. Errs slightly high.
+    """
+    if not text:
+        return 0
+
+    length = len(text)
+    if text.isascii():
+        return (length + 3) // 4
+
+    # Each non-ASCII character takes 2-4 UTF-8 bytes, count them as roughly one token each
+    non_ascii = (len(text.encode('utf-8')) - length) // 2
+    return (max(0, length - non_ascii) + 3) // 4 + non_ascii
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    """``count_tokens`` cached per message content (one-off texts like stream deltas should skip the cache)"""
+    return count_tokens(text)
+
+
+@dataclass
+class ContextTrim:
+    """What the context budget removed from a request"""
+    budget: int
+    tokens_before: int
+    tokens_after: int
+    dropped_messages: int
+
+    @property
+    def over_budget(self) -> bool:
+        return self.tokens_after > self.budget
+
+
+class ContextBudgetProcessor(BaseProcessor):
+    """Keeps the prompt within a token budget by dropping the oldest turns"""
+
+    DEFAULT_MAX_TOKENS = 100000
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.config_manager = self.config.get('config_manager')
+        # Shares the pipeline's formatter, so re-formatting after a trim hits its segment cache
+        self.formatter = (self.config.get('formatter') or MessageFormatter(self.config_manager)) if self.config_manager else None
+
+    def can_process(self, request: ChatRequest) -> bool:
+        """Only when the budget is enabled (needs the formatter to rebuild the prompt)"""
+        return self.formatter is not None and bool(self.get_config_value('context.budget_enabled', False))
+
+    def get_budget(self) -> int:
+        """Configured token budget"""
+        try:
+            return int(self.get_config_value('context.max_tokens', self.DEFAULT_MAX_TOKENS))
+        except (TypeError, ValueError):
+            return self.DEFAULT_MAX_TOKENS
+
+    def process(self, request: ChatRequest) -> ChatRequest:
+        """Drop the oldest non-pinned turns until the estimated prompt fits the budget"""
+        budget = self.get_budget()
+        messages = request.messages
+
+        costs = [estimate_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS for message in messages]
+        fixed = estimate_tokens(self.get_config_value('injection.system_prompt', '')) if self.get_config_value('injection.enabled', True) else 0
+        if request.has_prefix():
+            fixed += estimate_tokens(request.prefix_content) + MESSAGE_OVERHEAD_TOKENS
+
+        tokens_before = fixed + sum(costs)
+        if tokens_before <= budget:
+            return request
+
+        # Oldest first, never the system/character blocks or the latest message
+        total = tokens_before
+        dropped = set()
+        for index in self._droppable_indices(request):
+            if total <= budget:
+                break
+            dropped.add(index)
+            total -= costs[index]
+
+        if dropped:
+            request.messages = [message for index, message in enumerate(messages) if index not in dropped]
+
+            # The character processor already formatted the full history, redo it for what's left
+            if request._character_info is not None:
+                request._prompt_segments, request._prompt_separator = self.formatter.format_segments(request, request._character_info)
+
+        request._context_trim = ContextTrim(
+            budget=budget,
+            tokens_before=tokens_before,
+            tokens_after=total,
+            dropped_messages=len(dropped)
+        )
+        return request
+
+    def _droppable_indices(self, request: ChatRequest) -> List[int]:
+        """Indices of messages that may be dropped, oldest first"""
+        last = len(request.messages) - 1
+        return [
+            index for index, message in enumerate(request.messages)
+            if index != last and message.role != MessageRole.SYSTEM
+        ]
@@ -15,6 +15,10 @@ class DeepSeekProcessor(BaseProcessor):
         
         # Priority: Model suffix > API parameters > message content detection > config settings
         
+        # Scan every user message once; the cached scans are reused when cleaning below
+        detected_settings = DeepSeekSettings.detect_from_messages(request.messages)
+        config_settings = self._get_config_settings()
+        
         # Check for model suffix overrides first (highest priority)
         if request.is_chat_model():
             # -chat model: Force reasoning OFF, ignore all other sources
@@ -23,23 +27,12 @@ class DeepSeekProcessor(BaseProcessor):
             # -reasoner model: Force reasoning ON, but still respect Send Thoughts setting
             request.use_deepthink = True
         else:
-            # Normal model: Use existing priority logic
-            
-            # Check for API parameters first
+            # Normal model: API parameter first, then message content detection
             if request.api_use_r1 is not None:
                 request.use_deepthink = request.api_use_r1
-            elif request.api_use_search is not None:
-                # If no r1 parameter but search is provided, use detected settings for deepthink
-                detected_settings = DeepSeekSettings.detect_from_messages(request.messages)
-                request.use_deepthink = detected_settings.deepthink
             else:
-                # Auto-detect settings from messages
-                detected_settings = DeepSeekSettings.detect_from_messages(request.messages)
                 request.use_deepthink = detected_settings.deepthink
             
-            # Override with config settings if no API parameters or detection
-            config_settings = self._get_config_settings()
-            
             # Apply config fallbacks only if not set by API params or detection
             if request.api_use_r1 is None and not request.use_deepthink:
                 request.use_deepthink = config_settings.deepthink
@@ -49,16 +42,9 @@ class DeepSeekProcessor(BaseProcessor):
             request.use_search = request.api_use_search
         else:
             # Auto-detect from messages or use config
-            detected_settings = DeepSeekSettings.detect_from_messages(request.messages)
-            request.use_search = detected_settings.search
-            
-            # Apply config fallbacks
-            config_settings = self._get_config_settings()
-            if not request.use_search:
-                request.use_search = config_settings.search
+            request.use_search = detected_settings.search or config_settings.search
         
         # Text file setting comes from config only
-        config_settings = self._get_config_settings()
         request.use_text_file = config_settings.text_file
         
         # Clean directives from message content
@@ -0,0 +1,118 @@
+"""
+Precompiled message templates for the formatting presets and Custom templates.
+
+Templates are parsed once into literal text and {role}/{name}/{content}
+placeholders, so rendering a message is a single join instead of a full
+str.format parse.
+"""
+
+from functools import lru_cache
+from string import Formatter
+from typing import List, Optional, Tuple
+
+# Placeholders a message template may use
+TEMPLATE_FIELDS = ('role', 'name', 'content')
+
+# Placeholders of the injection system prompt (plain text replacement, other braces are kept)
+INJECTION_FIELDS = ('{username}', '{asstname}')
+
+_FIELD_INDEX = {field: index for index, field in enumerate(TEMPLATE_FIELDS)}
+
+
+class TemplateError(ValueError):
+    """Raised when a template can't be compiled"""
+    pass
+
+
+def _as_text(value) -> str:
+    return value if isinstance(value, str) else format(value)
+
+
+class CompiledTemplate:
+    """A message template split into literal text and placeholder slots"""
+
+    __slots__ = ('source', 'fields', '_pieces', '_slots', '_use_format')
+
+    def __init__(self, source: str, pieces: List[Optional[str]], slots: Tuple[Tuple[int, int], ...],
+                 fields: Tuple[str, ...], use_format: bool = False):
+        self.source = source
+        self.fields = fields
+        self._pieces = pieces
+        self._slots = slots
+        self._use_format = use_format
+
+    def render(self, role: str, name: str, content: str) -> str:
+        """Render one message"""
+        if self._use_format:
+            # Conversions, format specs or attribute access - let str.format handle them
+            return self.source.format(role=role, name=name, content=content)
+
+        values = (role, name, content)
+        pieces = self._pieces.copy()
+        for position, field_index in self._slots:
+            pieces[position] = _as_text(values[field_index])
+        return ''.join(pieces)
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> CompiledTemplate:
+    """
+    Compile a message template (cached per template string).
+
+    Raises:
+        TemplateError: On malformed braces, positional or unknown placeholders
+    """
+    try:
+        parsed = list(Formatter().parse(template))
+    except ValueError as e:
+        raise TemplateError(f"Malformed template: {e}") from e
+
+    pieces: List[Optional[str]] = []
+    slots = []
+    fields = []
+    use_format = False
+
+    for literal, field_name, format_spec, conversion in parsed:
+        if literal:
+            pieces.append(literal)
+        if field_name is None:
+            continue
+
+        # "{name.attr}" / "{name[0]}" -> base field name
+        base = field_name.split('.', 1)[0].split('[', 1)[0]
+        if not base or base.isdigit():
+            raise TemplateError("Positional placeholders like {} or {0} are not supported, use {role}, {name} or {content}")
+        if base not in _FIELD_INDEX:
+            raise TemplateError(f"Unknown placeholder {{{base}}}, use {{role}}, {{name}} or {{content}}")
+
+        if format_spec or conversion or base != field_name:
+            use_format = True
+
+        fields.append(base)
+        slots.append((len(pieces), _FIELD_INDEX[base]))
+        pieces.append(None)
+
+    return CompiledTemplate(template, pieces, tuple(slots), tuple(fields), use_format)
+
+
+def validate_template(template: str) -> List[str]:
+    """Validation errors for a message template (empty list if it's valid)"""
+    if not template or not template.strip():
+        return ["Template is empty"]
+
+    try:
+        compiled = compile_template(template)
+    except TemplateError as e:
+        return [str(e)]
+
+    if 'content' not in compiled.fields:
+        return ["Template must contain {content}"]
+    return []
+
+
+@lru_cache(maxsize=64)
+def render_injection(template: str, username: str, asstname: str) -> str:
+    """Substitute {username}/{asstname} in the injection system prompt"""
+    if not template or '{' not in template:
+        return template
+    return template.replace(INJECTION_FIELDS[0], username).replace(INJECTION_FIELDS[1], asstname)
@@ -0,0 +1,145 @@
+"""
+API key index and per-key usage counters
+Keys are indexed by their SHA-256 digest, so a lookup is one dict access instead of scanning every configured key
+"""
+
+import hashlib
+import hmac
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Shorter keys are ignored, same rule as the settings validation
+MIN_KEY_LENGTH = 16
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.sha256(key.encode('utf-8')).digest()
+
+
+@dataclass
+class KeyUsage:
+    """Usage counters of one API key"""
+    requests: int = 0
+    tokens_streamed: int = 0
+    errors: int = 0
+    last_seen: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "tokens_streamed": self.tokens_streamed,
+            "errors": self.errors,
+            "last_seen": self.last_seen
+        }
+
+
+class APIKeyIndex:
+    """Digest -> key name index of the configured API keys, rebuilt only when the config changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._names: Dict[bytes, Tuple[bytes, str]] = {}
+        self._usage: Dict[str, KeyUsage] = {}
+        self._auth_failures = 0
+
+    def _build(self, config) -> Dict[bytes, Tuple[bytes, str]]:
+        """Return the index for this config, rebuilding it if the config version changed"""
+        version = getattr(config, 'version', None)
+        with self._lock:
+            if version is not None and version == self._version:
+                return self._names
+
+            api_keys_config = config.get("security.api_keys", {})
+            names: Dict[bytes, Tuple[bytes, str]] = {}
+            if api_keys_config and isinstance(api_keys_config, Mapping):
+                for name, key in api_keys_config.items():
+                    if key and isinstance(key, str) and len(key.strip()) >= MIN_KEY_LENGTH:
+                        # First name wins if the same key is listed twice
+                        digest = _digest(key.strip())
+                        names.setdefault(digest, (digest, name))
+
+            # Keep the counters of keys that are still configured
+            self._usage = {name: self._usage.get(name) or KeyUsage() for _, name in names.values()}
+            self._names = names
+            self._version = version
+            return names
+
+    def lookup(self, provided_key: str, config) -> Optional[str]:
+        """Name of the key if it's valid, None otherwise"""
+        if not provided_key:
+            return None
+
+        names = self._build(config)
+        provided = _digest(provided_key)
+
+        # The dict lookup only ever sees digests (timing can't reveal key characters),
+        # the final byte comparison is constant-time on top of that
+        entry = names.get(provided)
+        if entry is None or not hmac.compare_digest(entry[0], provided):
+            return None
+        return entry[1]
+
+    def key_count(self, config) -> int:
+        """Number of valid keys in the config"""
+        return len(self._build(config))
+
+    def record_request(self, name: str) -> None:
+        """Count an authenticated request"""
+        with self._lock:
+            usage = self._usage.get(name)
+            if usage is not None:
+                usage.requests += 1
+                usage.last_seen = time.time()
+
+    def record_tokens(self, name: str, tokens: int) -> None:
+        """Count tokens delivered to a key"""
+        if tokens <= 0:
+            return
+        with self._lock:
+            usage = self._usage.get(name)
+            if usage is not None:
+                usage.tokens_streamed += tokens
+
+    def record_error(self, name: str) -> None:
+        """Count a failed request made with a key"""
+        with self._lock:
+            usage = self._usage.get(name)
+            if usage is not None:
+                usage.errors += 1
+
+    def record_auth_failure(self) -> None:
+        """Count a request rejected for a missing or invalid key"""
+        with self._lock:
+            self._auth_failures += 1
+
+    def get_usage(self) -> Dict[str, Any]:
+        """Counters of every configured key (never includes the keys themselves)"""
+        with self._lock:
+            return {
+                "keys": {name: usage.to_dict() for name, usage in self._usage.items()},
+                "auth_failures": self._auth_failures
+            }
+
+
+# Singleton instance for global access
+_api_key_index_instance = None
+_api_key_index_lock = threading.Lock()
+
+def get_api_key_index() -> APIKeyIndex:
+    """Get the global API key index instance
+
+    Returns:
+        APIKeyIndex instance
+    """
+    global _api_key_index_instance
+
+    if _api_key_index_instance is None:
+        with _api_key_index_lock:
+            if _api_key_index_instance is None:
+                _api_key_index_instance = APIKeyIndex()
+
+    return _api_key_index_instance
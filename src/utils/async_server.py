@@ -0,0 +1,383 @@
+"""
+Asyncio HTTP server for the client API
+Connections, socket writes and idle stream waits live on one event loop, while the WSGI app (and all
+browser work) runs on a dedicated executor. An open SSE stream only holds a thread while a chunk is
+being produced, so slow or idle clients cost a coroutine and a socket buffer instead of a thread.
+"""
+
+import asyncio
+import io
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from utils.metrics import get_metrics
+from utils.stream_body import ASYNC_IDLE_KEY, IdleWait
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024 * 1024  # Same as waitress
+MEMORY_BODY_SIZE = 1024 * 1024  # Larger bodies are spooled to a temp file
+READ_BLOCK_SIZE = 64 * 1024
+IDLE_TIMEOUT = 60  # Seconds a connection may go without sending anything, idle keep-alive included
+
+# Returned by next() when the response iterator is exhausted
+_END = object()
+
+
+class _BadRequest(Exception):
+    """Request that can't be parsed, answered with the given status"""
+
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+
+class AsyncAPIServer:
+    """HTTP/1.1 server running a WSGI app from an event loop
+
+    Has the same interface as ServerPool (run/start/close/get_stats).
+    """
+
+    def __init__(self, name: str, app, host: str, port: int, threads: int):
+        self.name = name
+        self.app = app
+        self.threads = max(1, threads)
+        self.executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix=f"{name}-worker")
+        self.loop = asyncio.new_event_loop()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters (only touched under the lock, the workers update them too)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._total_tasks = 0
+        self._connections = 0
+        self._streams = 0
+        self._queue_wait = get_metrics().queue_wait
+
+        try:
+            # Bind now so the port is known before run()
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle_connection, host, port, limit=MAX_HEADER_SIZE)
+            )
+        except Exception:
+            self.loop.close()
+            self.executor.shutdown(wait=False)
+            raise
+
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+
+    def run(self) -> None:
+        """Serve until closed (blocks)"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def start(self) -> None:
+        """Serve from a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run, name=f"{self.name}-listener", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop listening and shut down the executor"""
+        def shutdown():
+            self._server.close()
+            self.loop.stop()
+
+        with suppress(RuntimeError):
+            self.loop.call_soon_threadsafe(shutdown)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Executor and connection state"""
+        with self._lock:
+            return {
+                "host": self.host,
+                "port": self.port,
+                "threads": self.threads,
+                "active": self._active,
+                "queued": self._queued,
+                "peak_queued": self._peak_queued,
+                "total_tasks": self._total_tasks,
+                "connections": self._connections,
+                "open_responses": self._streams
+            }
+
+    def _submit(self, function, *args) -> asyncio.Future:
+        """Run blocking work on the executor, counting queued and active tasks"""
+        with self._lock:
+            self._queued += 1
+            self._total_tasks += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        queued_at = time.perf_counter()
+
+        def task():
+            self._queue_wait.observe(time.perf_counter() - queued_at, self.name)
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            try:
+                return function(*args)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        return self.loop.run_in_executor(self.executor, task)
+
+    def _count(self, attribute: str, delta: int) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + delta)
+
+    # -------------------------------------------------------------------------------------------------------------------------
+    # Connections
+    # -------------------------------------------------------------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._count('_connections', 1)
+        try:
+            while True:
+                try:
+                    parsed = await self._read_request(reader, writer)
+                except asyncio.TimeoutError:
+                    break  # Idle keep-alive connection or a client that stopped sending
+                except _BadRequest as e:
+                    writer.write(f"HTTP/1.1 {e.status}\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode('latin-1'))
+                    await writer.drain()
+                    break
+
+                if parsed is None:
+                    break
+                try:
+                    keep_alive = await self._serve_request(parsed, reader, writer)
+                finally:
+                    parsed[4].close()  # Request body, may be a temp file
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        except Exception as e:
+            print(f"Async server error: {e}")
+        finally:
+            self._count('_connections', -1)
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Optional[Tuple]:
+        """Read one request (None when the client closed the connection)
+
+        The whole head has to arrive within IDLE_TIMEOUT, so clients can't hold a connection open by
+        trickling headers in.
+        """
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+        except asyncio.IncompleteReadError:
+            return None
+        except asyncio.LimitOverrunError:
+            raise _BadRequest("431 Request Header Fields Too Large")
+
+        lines = head.decode('latin-1').strip("\r\n").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise _BadRequest("400 Bad Request")
+        if not version.startswith("HTTP/1."):
+            raise _BadRequest("505 HTTP Version Not Supported")
+
+        headers: List[Tuple[str, str]] = []
+        for line in lines[1:]:
+            name, separator, value = line.partition(":")
+            if not separator or not name.strip():
+                raise _BadRequest("400 Bad Request")
+            headers.append((name.strip().lower(), value.strip()))
+        header_map = dict(headers)
+
+        if header_map.get("expect", "").lower() == "100-continue":
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+
+        body = tempfile.SpooledTemporaryFile(max_size=MEMORY_BODY_SIZE)
+        try:
+            if "chunked" in header_map.get("transfer-encoding", "").lower():
+                await self._read_chunked(reader, body)
+            else:
+                try:
+                    length = int(header_map.get("content-length", "0"))
+                except ValueError:
+                    raise _BadRequest("400 Bad Request")
+                if length < 0:
+                    raise _BadRequest("400 Bad Request")
+                if length > MAX_BODY_SIZE:
+                    raise _BadRequest("413 Payload Too Large")
+                await self._read_body(reader, length, body)
+        except BaseException:
+            body.close()
+            raise
+
+        length = body.tell()
+        body.seek(0)
+        return method, target, version, headers, body, length
+
+    async def _read_body(self, reader: asyncio.StreamReader, length: int, body) -> None:
+        """Copy ``length`` bytes into ``body``, giving up when nothing arrives for IDLE_TIMEOUT"""
+        while length > 0:
+            data = await asyncio.wait_for(reader.read(min(length, READ_BLOCK_SIZE)), IDLE_TIMEOUT)
+            if not data:
+                raise asyncio.IncompleteReadError(b"", length)
+            body.write(data)
+            length -= len(data)
+
+    async def _read_line(self, reader: asyncio.StreamReader) -> bytes:
+        try:
+            return await asyncio.wait_for(reader.readuntil(b"\r\n"), IDLE_TIMEOUT)
+        except asyncio.LimitOverrunError:
+            raise _BadRequest("400 Bad Request")
+
+    async def _read_chunked(self, reader: asyncio.StreamReader, body) -> None:
+        size = 0
+        while True:
+            line = await self._read_line(reader)
+            try:
+                length = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise _BadRequest("400 Bad Request")
+            if length == 0:
+                # Skip trailers
+                while (await self._read_line(reader)) != b"\r\n":
+                    pass
+                return
+
+            size += length
+            if size > MAX_BODY_SIZE:
+                raise _BadRequest("413 Payload Too Large")
+            await self._read_body(reader, length, body)
+            await self._read_body(reader, 2, io.BytesIO())
+
+    # -------------------------------------------------------------------------------------------------------------------------
+    # WSGI
+    # -------------------------------------------------------------------------------------------------------------------------
+
+    def _build_environ(self, parsed: Tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        method, target, version, headers, body, length = parsed
+        path, _, query = target.partition("?")
+        peer = writer.get_extra_info("peername") or ("", 0)
+
+        environ = {
+            "REQUEST_METHOD": method.upper(),
+            "SCRIPT_NAME": "",
+            "PATH_INFO": unquote_to_bytes(path).decode("latin-1"),
+            "QUERY_STRING": query,
+            "SERVER_NAME": str(self.host),
+            "SERVER_PORT": str(self.port),
+            "SERVER_PROTOCOL": version,
+            "REMOTE_ADDR": peer[0],
+            "REMOTE_PORT": str(peer[1]),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": "http",
+            "wsgi.input": body,
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": False,
+            "wsgi.run_once": False,
+            "CONTENT_LENGTH": str(length),
+            ASYNC_IDLE_KEY: True,
+            # Same hook waitress provides, used to stop non-streaming requests early
+            "waitress.client_disconnected": reader.at_eof,
+        }
+
+        for name, value in headers:
+            if name == "content-type":
+                environ["CONTENT_TYPE"] = value
+            elif name in ("content-length", "transfer-encoding"):
+                continue
+            else:
+                key = "HTTP_" + name.upper().replace("-", "_")
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+        return environ
+
+    async def _serve_request(self, parsed: Tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Run the app for one request and write the response
+
+        Returns:
+            True if the connection can be kept alive
+        """
+        environ = self._build_environ(parsed, reader, writer)
+        method, version = environ["REQUEST_METHOD"], environ["SERVER_PROTOCOL"]
+        response: Dict[str, Any] = {}
+        written: List[bytes] = []
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and response.get("sent"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = status
+            response["headers"] = headers
+            return written.append
+
+        def call_app():
+            result = self.app(environ, start_response)
+            return result, iter(result)
+
+        result, iterator = await self._submit(call_app)
+        self._count('_streams', 1)
+        try:
+            status = response["status"]
+            headers = list(response["headers"])
+            names = {name.lower() for name, _ in headers}
+            code = int(status.split(" ", 1)[0])
+            has_body = method != "HEAD" and code not in (204, 304) and code >= 200
+
+            connection = environ.get("HTTP_CONNECTION", "").lower()
+            keep_alive = version == "HTTP/1.1" and connection != "close"
+            chunked = has_body and "content-length" not in names and version == "HTTP/1.1"
+            if has_body and "content-length" not in names and not chunked:
+                keep_alive = False
+
+            if chunked:
+                headers.append(("Transfer-Encoding", "chunked"))
+            if not keep_alive:
+                headers.append(("Connection", "close"))
+
+            head = f"HTTP/1.1 {status}\r\n" + "".join(f"{name}: {value}\r\n" for name, value in headers) + "\r\n"
+            writer.write(head.encode("latin-1"))
+            response["sent"] = True
+
+            pending = written
+            while True:
+                for item in pending:
+                    if item and has_body:
+                        writer.write(b"%x\r\n%s\r\n" % (len(item), item) if chunked else item)
+                        await writer.drain()
+
+                item = await self._submit(next, iterator, _END)
+                if item is _END:
+                    break
+                if isinstance(item, IdleWait):
+                    # Waiting for data costs nothing here, stop if the client left meanwhile
+                    if reader.at_eof() or writer.is_closing():
+                        raise ConnectionResetError("Client disconnected")
+                    await item.wait_async()
+                    pending = ()
+                    continue
+                pending = (item,)
+
+            if chunked:
+                writer.write(b"0\r\n\r\n")
+            await writer.drain()
+            return keep_alive
+        finally:
+            self._count('_streams', -1)
+            close = getattr(result, "close", None)
+            if close is not None:
+                with suppress(Exception):
+                    await self._submit(close)
@@ -0,0 +1,169 @@
+"""
+Console history model
+Keeps the most recent log lines, split into color runs, in a ring buffer. Textboxes only render the
+lines in view, while search, color filters and console dumps run against the whole history.
+"""
+
+import re
+import threading
+from collections import deque
+from itertools import islice
+from typing import Iterable, List, Optional, Set, Tuple
+
+DEFAULT_MAX_LINES = 50000
+MIN_MAX_LINES = 1000
+MAX_MAX_LINES = 1000000
+
+# Text before the first [color:x] marker of a message
+DEFAULT_COLOR = "white"
+
+_COLOR_PATTERN = re.compile(r'\[color:(\w+)\]')
+
+# (tag, text), the tag is None for text added without color markup
+Run = Tuple[Optional[str], str]
+# (plain text, runs)
+Line = Tuple[str, Tuple[Run, ...]]
+
+
+def parse_message(text: str, colored: bool = True) -> List[Line]:
+    """Split a message into lines of color runs
+
+    A [color:x] marker applies until the next one, across line breaks. One trailing newline is
+    ignored, the message ends its line either way.
+    """
+    if text.endswith("\n"):
+        text = text[:-1]
+
+    parts = _COLOR_PATTERN.split(text) if colored else [text]
+    tag = DEFAULT_COLOR if colored else None
+    lines: List[Line] = []
+    runs: List[Run] = []
+
+    for i, part in enumerate(parts):
+        if i % 2:
+            tag = part.lower()
+            continue
+
+        for j, piece in enumerate(part.split("\n")):
+            if j:
+                lines.append(_make_line(runs))
+                runs = []
+            if not piece:
+                continue
+            if runs and runs[-1][0] == tag:
+                runs[-1] = (tag, runs[-1][1] + piece)
+            else:
+                runs.append((tag, piece))
+
+    lines.append(_make_line(runs))
+    return lines
+
+def _make_line(runs: List[Run]) -> Line:
+    return "".join(text for _, text in runs), tuple(runs)
+
+def line_matches(line: Line, query: str = "", colors: Optional[Set[str]] = None) -> bool:
+    """Whether the line contains ``query`` (lowercase, case-insensitive) and has text in one of ``colors``"""
+    if query and query not in line[0].lower():
+        return False
+    if colors is not None and not any(tag in colors for tag, _ in line[1]):
+        return False
+    return True
+
+
+class ConsoleBuffer:
+    """Ring buffer of console lines
+
+    Every line gets a number that stays the same while it is kept (the oldest kept line has
+    number ``first``), so views and search results stay anchored while old lines are dropped.
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES):
+        self._lines: deque = deque(maxlen=self._clamp(max_lines))
+        self._end = 0  # Number of the next line
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clamp(max_lines) -> int:
+        try:
+            return min(MAX_MAX_LINES, max(MIN_MAX_LINES, int(max_lines)))
+        except (TypeError, ValueError):
+            return DEFAULT_MAX_LINES
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.maxlen
+
+    @property
+    def first(self) -> int:
+        """Number of the oldest line kept"""
+        with self._lock:
+            return self._end - len(self._lines)
+
+    @property
+    def end(self) -> int:
+        """Number the next line will get"""
+        return self._end
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def resize(self, max_lines: int) -> None:
+        """Change the capacity, keeping the newest lines"""
+        max_lines = self._clamp(max_lines)
+        with self._lock:
+            if max_lines != self._lines.maxlen:
+                self._lines = deque(self._lines, maxlen=max_lines)
+
+    def append(self, text: str, colored: bool = True) -> int:
+        """Add a message (parsing [color:x] markers if ``colored``)
+
+        Returns:
+            Number of lines added
+        """
+        lines = parse_message(text, colored)
+        with self._lock:
+            self._lines.extend(lines)
+            self._end += len(lines)
+        return len(lines)
+
+    def clear(self) -> None:
+        """Drop all lines (numbering continues)"""
+        with self._lock:
+            self._lines.clear()
+
+    def get(self, start: int, stop: int) -> List[Line]:
+        """Lines numbered ``start`` up to ``stop`` (whatever of that range is still kept)"""
+        with self._lock:
+            first = self._end - len(self._lines)
+            start = max(start, first) - first
+            stop = min(stop, self._end) - first
+            if stop <= start:
+                return []
+            return list(islice(self._lines, start, stop))
+
+    def get_numbers(self, numbers: Iterable[int]) -> List[Line]:
+        """Lines with the given numbers, skipping dropped ones"""
+        with self._lock:
+            first = self._end - len(self._lines)
+            return [self._lines[number - first] for number in numbers if first <= number < self._end]
+
+    def find(self, query: str = "", colors: Optional[Iterable[str]] = None, start: Optional[int] = None) -> List[int]:
+        """Numbers of the lines containing ``query`` (case-insensitive) with text in one of ``colors``
+
+        Args:
+            start: Only check lines from this number on
+        """
+        query = query.lower()
+        colors = set(colors) if colors is not None else None
+        with self._lock:
+            first = self._end - len(self._lines)
+            offset = max(0, (start if start is not None else first) - first)
+            lines = list(islice(self._lines, offset, None))
+
+        first += offset
+        return [first + index for index, line in enumerate(lines) if line_matches(line, query, colors)]
+
+    def text(self) -> str:
+        """The whole history as plain text"""
+        with self._lock:
+            return "\n".join(line[0] for line in self._lines)
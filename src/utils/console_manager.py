@@ -4,9 +4,18 @@ Handles console window creation, styling, and output redirection
 """
 
 import sys
+import threading
 import tkinter as tk
 from typing import Dict, Any, Optional, Callable
 import utils.gui_builder as gui_builder
+from utils.console_settings import ConsoleColorPalettes, ConsoleSettings
+
+# Length of the profile taken by the console's Profile button
+CONSOLE_PROFILE_SECONDS = 30
+
+# Delay after the last keystroke in the search box before the filter is applied
+CONSOLE_SEARCH_DELAY_MS = 250
+CONSOLE_ALL_COLORS = "All colors"
 
 
 class ConsoleRedirector:
@@ -26,118 +35,6 @@ class ConsoleRedirector:
         pass
 
 
-class ConsoleColorPalettes:
-    """Predefined color palettes for the console"""
-    
-    # Current palette (modern/muted)
-    MODERN = {
-        "red": "#ff6b6b",
-        "green": "#51cf66", 
-        "yellow": "#ffd43b",
-        "blue": "#74c0fc",
-        "cyan": "#66d9ef",
-        "white": "#f8f9fa",
-        "purple": "#d084f5",
-        "orange": "#ff8c42",
-        "pink": "#f783ac",
-        "gray": "#adb5bd"
-    }
-    
-    # Original IntenseRP palette
-    CLASSIC = {
-        "red": "red",
-        "green": "#13ff00",
-        "yellow": "yellow",
-        "blue": "blue",
-        "cyan": "cyan",
-        "white": "white",
-        "purple": "#e400ff",
-        "orange": "orange",
-        "pink": "pink",
-        "gray": "#adb5bd"
-    }
-
-    # New bright palette
-    BRIGHT = {
-        "red": "#ff3333",
-        "green": "#00ff88", 
-        "yellow": "#ffdd00",
-        "blue": "#3399ff",
-        "cyan": "#00ffff",
-        "white": "#ffffff",
-        "purple": "#bb44ff",
-        "orange": "#ff7722",
-        "pink": "#ff66cc",
-        "gray": "#888888"
-    }
-    
-    @classmethod
-    def get_palette(cls, name: str) -> Dict[str, str]:
-        """Get palette by name"""
-        palettes = {
-            "Modern (Redesigned)": cls.MODERN,
-            "Classic (OG IntenseRP)": cls.CLASSIC,
-            "Bright (New Palette)": cls.BRIGHT
-        }
-        return palettes.get(name, cls.MODERN)
-    
-    @classmethod
-    def get_palette_names(cls) -> list[str]:
-        """Get list of available palette names"""
-        return ["Modern (Redesigned)", "Classic (OG IntenseRP)", "Bright (New Palette)"]
-
-
-class ConsoleSettings:
-    """Console configuration settings"""
-    
-    # Cross-platform font families
-    FONT_FAMILIES = [
-        "Consolas",      # Windows default, good monospace
-        "Monaco",        # Mac default monospace
-        "DejaVu Sans Mono",  # Linux common
-        "Courier New",   # Cross-platform monospace
-        "Arial",         # Cross-platform sans-serif
-        "Times New Roman", # Cross-platform serif
-        "Lucida Console" # Windows monospace alternative
-    ]
-    
-    # Font size options
-    FONT_SIZES = [8, 9, 10, 11, 12, 13, 14, 16, 18, 20, 22, 24]
-    
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
-        console_config = config.get("console", {}) if config else {}
-        
-        self.font_family = console_config.get("font_family", "Consolas")
-        self.font_size = console_config.get("font_size", 12)
-        self.color_palette = console_config.get("color_palette", "Modern")
-        self.word_wrap = console_config.get("word_wrap", True)
-        
-        # Ensure valid values
-        if self.font_family not in self.FONT_FAMILIES:
-            self.font_family = "Consolas"
-        if self.font_size not in self.FONT_SIZES:
-            self.font_size = 12
-        if self.color_palette not in ConsoleColorPalettes.get_palette_names():
-            self.color_palette = "Modern"
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert settings to dictionary"""
-        return {
-            "font_family": self.font_family,
-            "font_size": self.font_size,
-            "color_palette": self.color_palette,
-            "word_wrap": self.word_wrap
-        }
-    
-    def get_font_tuple(self) -> tuple:
-        """Get font as tuple for tkinter"""
-        return (self.font_family, self.font_size)
-    
-    def get_color_map(self) -> Dict[str, str]:
-        """Get color mapping for current palette"""
-        return ConsoleColorPalettes.get_palette(self.color_palette)
-
-
 class CustomConsoleTextbox(gui_builder.CustomTextbox):
     """Console textbox with customizable styling"""
     
@@ -161,7 +58,7 @@ class CustomConsoleTextbox(gui_builder.CustomTextbox):
         # Override with any provided kwargs
         console_kwargs.update(kwargs)
         
-        super().__init__(parent, **console_kwargs)
+        super().__init__(parent, history_lines=self.settings.history_lines, **console_kwargs)
         
         # Apply custom color palette
         self.apply_color_palette()
@@ -186,6 +83,9 @@ class CustomConsoleTextbox(gui_builder.CustomTextbox):
         
         # Update color palette
         self.apply_color_palette()
+        
+        # Update history size and redraw with the new font
+        self.set_history_lines(self.settings.history_lines)
 
 
 class ConsoleManager:
@@ -197,6 +97,10 @@ class ConsoleManager:
         self.console_window = None
         self.console_textbox = None
         self.menu_frame = None
+        self.search_entry = None
+        self.color_filter = None
+        self.filter_label = None
+        self._search_job = None
         self.settings = None
         self.original_stdout = sys.stdout
         self.original_stderr = sys.stderr
@@ -224,8 +128,9 @@ class ConsoleManager:
             # Create main container frame
             main_frame = gui_builder.ctk.CTkFrame(console_window, fg_color="transparent")
             main_frame.pack(expand=True, fill="both", padx=2, pady=2)
-            main_frame.grid_rowconfigure(0, weight=1)  # Console textbox gets full height
-            main_frame.grid_rowconfigure(1, weight=0)  # Menu frame fixed height
+            main_frame.grid_rowconfigure(0, weight=0)  # Filter bar fixed height
+            main_frame.grid_rowconfigure(1, weight=1)  # Console textbox gets full height
+            main_frame.grid_rowconfigure(2, weight=0)  # Menu frame fixed height
             main_frame.grid_columnconfigure(0, weight=1)
             
             # Create custom textbox with settings
@@ -233,12 +138,16 @@ class ConsoleManager:
                 main_frame,
                 self.settings
             )
-            console_textbox.grid(row=0, column=0, sticky="nsew", padx=0, pady=0)
+            console_textbox.grid(row=1, column=0, sticky="nsew", padx=0, pady=0)
+            
+            # Create search and color filter bar
+            filter_frame = self._create_filter_frame(main_frame)
+            filter_frame.grid(row=0, column=0, sticky="ew", padx=2, pady=(0, 2))
             
             # Create menu frame if needed
             menu_frame = self._create_menu_frame_if_needed(main_frame)
             if menu_frame:
-                menu_frame.grid(row=1, column=0, sticky="ew", padx=2, pady=(2, 0))
+                menu_frame.grid(row=2, column=0, sticky="ew", padx=2, pady=(2, 0))
             
             # Store references
             self.console_window = console_window
@@ -256,14 +165,77 @@ class ConsoleManager:
         except Exception as e:
             print(f"Error creating console window: {e}")
     
+    def _create_filter_frame(self, parent):
+        """Create the search box and color filter above the console"""
+        filter_frame = gui_builder.ctk.CTkFrame(parent, fg_color="transparent")
+        filter_frame.grid_columnconfigure(0, weight=1)
+        
+        search_entry = gui_builder.ctk.CTkEntry(
+            filter_frame,
+            placeholder_text="Search console history...",
+            height=28,
+            font=("Consolas", 12)
+        )
+        search_entry.grid(row=0, column=0, sticky="ew", padx=(0, 5))
+        search_entry.bind("<KeyRelease>", lambda event: self._schedule_filter())
+        search_entry.bind("<Escape>", lambda event: self._reset_filter())
+        
+        color_filter = gui_builder.ctk.CTkOptionMenu(
+            filter_frame,
+            values=[CONSOLE_ALL_COLORS] + list(ConsoleColorPalettes.MODERN.keys()),
+            command=lambda value: self._apply_filter(),
+            width=110,
+            height=28,
+            font=("Consolas", 12)
+        )
+        color_filter.grid(row=0, column=1, padx=(0, 5))
+        
+        filter_label = gui_builder.ctk.CTkLabel(filter_frame, text="", width=90, font=("Consolas", 12))
+        filter_label.grid(row=0, column=2)
+        
+        self.search_entry = search_entry
+        self.color_filter = color_filter
+        self.filter_label = filter_label
+        return filter_frame
+    
+    def _schedule_filter(self) -> None:
+        """Apply the filter once typing pauses"""
+        if self._search_job:
+            self.console_window.after_cancel(self._search_job)
+        self._search_job = self.console_window.after(CONSOLE_SEARCH_DELAY_MS, self._apply_filter)
+    
+    def _apply_filter(self) -> None:
+        """Show only the history lines matching the search text and color"""
+        self._search_job = None
+        try:
+            if not self.console_textbox:
+                return
+            
+            query = self.search_entry.get().strip()
+            color = self.color_filter.get()
+            colors = [color] if color != CONSOLE_ALL_COLORS else None
+            self.console_textbox.set_filter(query, colors)
+            
+            matches = self.console_textbox.get_match_count()
+            self.filter_label.configure(text=f"{matches} lines" if matches is not None else "")
+        except Exception as e:
+            print(f"Error filtering console: {e}")
+    
+    def _reset_filter(self) -> None:
+        """Clear the search text and color filter"""
+        self.search_entry.delete(0, "end")
+        self.color_filter.set(CONSOLE_ALL_COLORS)
+        self._apply_filter()
+    
     def _create_menu_frame_if_needed(self, parent) -> Optional:
         """Create menu frame if any menu-triggering settings are enabled"""
         try:
             # Check if console dumping is enabled using the proper StateManager method
             dump_enabled = self.state_manager.get_config_value('console.dump_enabled', False)
+            profile_enabled = self.state_manager.get_config_value('console.profile_enabled', False)
             
             # If no menu options are enabled, don't create menu frame
-            if not dump_enabled:
+            if not dump_enabled and not profile_enabled:
                 return None
             
             # Create menu frame
@@ -289,6 +261,19 @@ class ConsoleManager:
                 dump_button.grid(row=0, column=button_column, padx=(0, 5), sticky="w")
                 button_column += 1
             
+            # Add Profile button if enabled
+            if profile_enabled:
+                profile_button = gui_builder.ctk.CTkButton(
+                    button_container,
+                    text=f"Profile {CONSOLE_PROFILE_SECONDS}s",
+                    command=self._profile_app,
+                    width=100,
+                    height=30,
+                    font=("Consolas", 12)
+                )
+                profile_button.grid(row=0, column=button_column, padx=(0, 5), sticky="w")
+                button_column += 1
+            
             return menu_frame
             
         except Exception as e:
@@ -302,8 +287,8 @@ class ConsoleManager:
                 print("[color:red]Error: Console textbox not available")
                 return
             
-            # Get current console content
-            console_content = self.console_textbox.get("1.0", "end-1c")
+            # Get the whole console history, not just the lines in view
+            console_content = self.console_textbox.get_history()
             
             if not console_content.strip():
                 print("[color:yellow]Console is empty - nothing to dump")
@@ -338,6 +323,27 @@ class ConsoleManager:
         except Exception as e:
             print(f"[color:red]Error dumping console: {e}")
     
+    def _profile_app(self) -> None:
+        """Sample every thread in the background and save the stacks to the logs directory"""
+        from utils.profiler import get_profiler, ProfilerBusyError
+        
+        def run_profile():
+            try:
+                print(f"[color:cyan]Profiling all threads for {CONSOLE_PROFILE_SECONDS} seconds...")
+                result = get_profiler().profile(CONSOLE_PROFILE_SECONDS)
+                filepath = result.save(self.storage_manager.get_path("executable", "logs"))
+                
+                print(f"[color:green]Profile saved to: {filepath}")
+                for entry in result.top_functions(5):
+                    print(f"[color:white]  {entry['self_percent']:5.1f}%  {entry['function']}")
+            except ProfilerBusyError:
+                print("[color:yellow]A profile is already running")
+            except Exception as e:
+                print(f"[color:red]Error profiling: {e}")
+        
+        # The Tk thread has to keep running to show up in the profile
+        threading.Thread(target=run_profile, name="profiler", daemon=True).start()
+    
     def _setup_output_redirection(self) -> None:
         """Setup stdout/stderr redirection to console"""
         try:
@@ -446,7 +452,7 @@ class ConsoleManager:
             # Create new menu frame if needed
             new_menu_frame = self._create_menu_frame_if_needed(main_frame)
             if new_menu_frame:
-                new_menu_frame.grid(row=1, column=0, sticky="ew", padx=2, pady=(2, 0))
+                new_menu_frame.grid(row=2, column=0, sticky="ew", padx=2, pady=(2, 0))
             
             self.menu_frame = new_menu_frame
             
@@ -497,4 +503,7 @@ class ConsoleManager:
             
         self.console_window = None
         self.console_textbox = None
-        self.menu_frame = None
\ No newline at end of file
+        self.menu_frame = None
+        self.search_entry = None
+        self.color_filter = None
+        self.filter_label = None
\ No newline at end of file
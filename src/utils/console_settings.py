@@ -0,0 +1,125 @@
+"""
+Console settings and color palettes
+Kept apart from the console window so the config schema can use them without loading Tk.
+"""
+
+from typing import Dict, Any, Optional
+from utils.console_buffer import DEFAULT_MAX_LINES, MIN_MAX_LINES, MAX_MAX_LINES
+
+
+class ConsoleColorPalettes:
+    """Predefined color palettes for the console"""
+    
+    # Current palette (modern/muted)
+    MODERN = {
+        "red": "#ff6b6b",
+        "green": "#51cf66", 
+        "yellow": "#ffd43b",
+        "blue": "#74c0fc",
+        "cyan": "#66d9ef",
+        "white": "#f8f9fa",
+        "purple": "#d084f5",
+        "orange": "#ff8c42",
+        "pink": "#f783ac",
+        "gray": "#adb5bd"
+    }
+    
+    # Original IntenseRP palette
+    CLASSIC = {
+        "red": "red",
+        "green": "#13ff00",
+        "yellow": "yellow",
+        "blue": "blue",
+        "cyan": "cyan",
+        "white": "white",
+        "purple": "#e400ff",
+        "orange": "orange",
+        "pink": "pink",
+        "gray": "#adb5bd"
+    }
+
+    # New bright palette
+    BRIGHT = {
+        "red": "#ff3333",
+        "green": "#00ff88", 
+        "yellow": "#ffdd00",
+        "blue": "#3399ff",
+        "cyan": "#00ffff",
+        "white": "#ffffff",
+        "purple": "#bb44ff",
+        "orange": "#ff7722",
+        "pink": "#ff66cc",
+        "gray": "#888888"
+    }
+    
+    @classmethod
+    def get_palette(cls, name: str) -> Dict[str, str]:
+        """Get palette by name"""
+        palettes = {
+            "Modern (Redesigned)": cls.MODERN,
+            "Classic (OG IntenseRP)": cls.CLASSIC,
+            "Bright (New Palette)": cls.BRIGHT
+        }
+        return palettes.get(name, cls.MODERN)
+    
+    @classmethod
+    def get_palette_names(cls) -> list[str]:
+        """Get list of available palette names"""
+        return ["Modern (Redesigned)", "Classic (OG IntenseRP)", "Bright (New Palette)"]
+
+
+class ConsoleSettings:
+    """Console configuration settings"""
+    
+    # Cross-platform font families
+    FONT_FAMILIES = [
+        "Consolas",      # Windows default, good monospace
+        "Monaco",        # Mac default monospace
+        "DejaVu Sans Mono",  # Linux common
+        "Courier New",   # Cross-platform monospace
+        "Arial",         # Cross-platform sans-serif
+        "Times New Roman", # Cross-platform serif
+        "Lucida Console" # Windows monospace alternative
+    ]
+    
+    # Font size options
+    FONT_SIZES = [8, 9, 10, 11, 12, 13, 14, 16, 18, 20, 22, 24]
+    
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        console_config = config.get("console", {}) if config else {}
+        
+        self.font_family = console_config.get("font_family", "Consolas")
+        self.font_size = console_config.get("font_size", 12)
+        self.color_palette = console_config.get("color_palette", "Modern")
+        self.word_wrap = console_config.get("word_wrap", True)
+        self.history_lines = console_config.get("history_lines", DEFAULT_MAX_LINES)
+        
+        # Ensure valid values
+        if self.font_family not in self.FONT_FAMILIES:
+            self.font_family = "Consolas"
+        if self.font_size not in self.FONT_SIZES:
+            self.font_size = 12
+        if self.color_palette not in ConsoleColorPalettes.get_palette_names():
+            self.color_palette = "Modern"
+        try:
+            self.history_lines = min(MAX_MAX_LINES, max(MIN_MAX_LINES, int(self.history_lines)))
+        except (TypeError, ValueError):
+            self.history_lines = DEFAULT_MAX_LINES
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert settings to dictionary"""
+        return {
+            "font_family": self.font_family,
+            "font_size": self.font_size,
+            "color_palette": self.color_palette,
+            "word_wrap": self.word_wrap,
+            "history_lines": self.history_lines
+        }
+    
+    def get_font_tuple(self) -> tuple:
+        """Get font as tuple for tkinter"""
+        return (self.font_family, self.font_size)
+    
+    def get_color_map(self) -> Dict[str, str]:
+        """Get color mapping for current palette"""
+        return ConsoleColorPalettes.get_palette(self.color_palette)
@@ -0,0 +1,148 @@
+"""
+Conversation tracking for the Continue Conversation feature
+Detects when a request is the previous conversation plus new turns, so only the new turns need to be sent
+"""
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from models.message_models import ChatRequest, MessageRole
+
+
+# Reasoning blocks are sent to SillyTavern but are usually not kept in the chat history
+_THINK_BLOCK_PATTERN = re.compile(r'<think>.*?</think>', re.DOTALL)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def _normalize_response(text: str) -> str:
+    """Normalize a response so the copy stored by SillyTavern compares equal to the one we sent"""
+    text = _THINK_BLOCK_PATTERN.sub('', text or '')
+    return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha256(text.encode('utf-8')).digest()
+
+
+@dataclass
+class ConversationFingerprint:
+    """Rolling hashes over the message boundaries of a processed request
+
+    chain[0] is the seed (settings that change how the chat was created) and
+    chain[i] covers the first i messages, so any prefix can be compared in O(1).
+    """
+    chain: List[bytes]
+
+    @property
+    def message_count(self) -> int:
+        return len(self.chain) - 1
+
+    @property
+    def tip(self) -> bytes:
+        return self.chain[-1]
+
+
+class ConversationTracker:
+    """Remembers the conversation currently open in the DeepSeek chat"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tip: Optional[bytes] = None
+        self._message_count = 0
+        self._response_digest: Optional[bytes] = None
+        self._driver_id: Optional[int] = None
+
+    def fingerprint(self, request: ChatRequest, context: Tuple) -> ConversationFingerprint:
+        """Build the rolling hash chain for a processed request
+
+        Args:
+            request: Processed request (directives already cleaned)
+            context: Values that must match for the chat to be reused (config version, names, toggles...)
+        """
+        current = _digest(repr(context))
+        chain = [current]
+
+        for message in request.messages:
+            hasher = hashlib.sha256(current)
+            hasher.update(f"{message.get_display_role()}\0{message.name or ''}\0{message.content}".encode('utf-8'))
+            current = hasher.digest()
+            chain.append(current)
+
+        return ConversationFingerprint(chain=chain)
+
+    def match(self, request: ChatRequest, fingerprint: ConversationFingerprint, driver) -> Optional[int]:
+        """Check whether the request continues the tracked conversation
+
+        Returns:
+            Index of the first new message to send, or None if a full re-paste is needed
+        """
+        with self._lock:
+            if self._tip is None or self._driver_id != id(driver):
+                return None
+
+            count = self._message_count
+
+            # Need at least our previous reply plus one new message
+            if fingerprint.message_count < count + 2:
+                return None
+
+            # Everything we sent before must be unchanged (no edits or deleted messages)
+            if fingerprint.chain[count] != self._tip:
+                return None
+
+            # The next message must be the reply we delivered (no swipes or edited replies)
+            reply = request.messages[count]
+            if reply.role != MessageRole.ASSISTANT or reply.is_custom_role():
+                return None
+            if _digest(_normalize_response(reply.content)) != self._response_digest:
+                return None
+
+            return count + 1
+
+    def record(self, fingerprint: ConversationFingerprint, response_text: str, driver) -> None:
+        """Remember the conversation after a successful response"""
+        if not _normalize_response(response_text):
+            self.reset()
+            return
+
+        with self._lock:
+            self._tip = fingerprint.tip
+            self._message_count = fingerprint.message_count
+            self._response_digest = _digest(_normalize_response(response_text))
+            self._driver_id = id(driver)
+
+    def reset(self) -> None:
+        """Forget the tracked conversation (new chat, refresh, error...)"""
+        with self._lock:
+            self._tip = None
+            self._message_count = 0
+            self._response_digest = None
+            self._driver_id = None
+
+    def is_tracking(self) -> bool:
+        """Check if a conversation is currently tracked"""
+        with self._lock:
+            return self._tip is not None
+
+
+# Singleton instance for global access
+_conversation_tracker_instance = None
+_conversation_tracker_lock = threading.Lock()
+
+def get_conversation_tracker() -> ConversationTracker:
+    """Get the global conversation tracker instance
+
+    Returns:
+        ConversationTracker instance
+    """
+    global _conversation_tracker_instance
+
+    if _conversation_tracker_instance is None:
+        with _conversation_tracker_lock:
+            if _conversation_tracker_instance is None:
+                _conversation_tracker_instance = ConversationTracker()
+
+    return _conversation_tracker_instance
@@ -1,8 +1,11 @@
-from selenium.webdriver.common.keys import Keys
-from seleniumbase import Driver
-from typing import Optional
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
 import time
 import hashlib
+from utils.tracing import span
+
+if TYPE_CHECKING:
+    from seleniumbase import Driver
 
 manager = None
 
@@ -29,6 +32,14 @@ def _clear_content_cache():
     global _content_cache
     _content_cache.clear()
 
+def _forget_conversation():
+    """Forget the tracked conversation - the chat it lived in is gone"""
+    try:
+        from utils.conversation_tracker import get_conversation_tracker
+        get_conversation_tracker().reset()
+    except Exception as e:
+        print(f"Warning: Could not reset conversation tracker: {e}")
+
 # =============================================================================================================================
 # Login
 # =============================================================================================================================
@@ -206,6 +217,8 @@ def _close_sidebar(driver: Driver) -> None:
 
 def new_chat(driver: Driver) -> None:
     """Start a new chat by clicking the appropriate new chat button based on sidebar state"""
+    _forget_conversation()
+    
     try:
         # Check if the button area exists (indicates sidebar is closed)
         # Use a short timeout since the button area might take a moment to appear
@@ -336,29 +349,37 @@ def _send_chat_file(driver: Driver, text: str) -> bool:
         return False
 
 def _send_chat_text(driver: Driver, text: str) -> bool:
+    from selenium.webdriver.common.keys import Keys
+    
     try:
-        def attempt_send():
+        def attempt_send(attempt_span):
             chat_input = driver.wait_for_element_present("_27c9245", by="class name", timeout=15)
             
-            for _ in range(3):
+            for paste in range(3):
                 chat_input.clear()
                 driver.execute_script("arguments[0].value = arguments[1];", chat_input, text)
                 chat_input.send_keys(" ")
                 chat_input.send_keys(Keys.BACKSPACE)
                 
                 if chat_input.get_attribute("value") == text:
+                    attempt_span.set(pastes=paste + 1)
                     return True
                 
                 time.sleep(1)
             
+            attempt_span.set(pastes=3)
             return False
         
-        for _ in range(2):
-            if attempt_send():
-                return _click_send_message_button(driver)
+        for attempt in range(2):
+            with span("send_text.attempt", attempt=attempt + 1) as attempt_span:
+                pasted = attempt_send(attempt_span)
+            if pasted:
+                with span("send_text.click_send"):
+                    return _click_send_message_button(driver)
             
-            driver.refresh()
-            time.sleep(1)
+            with span("send_text.refresh"):
+                driver.refresh()
+                time.sleep(1)
         
         return False
     except Exception as e:
@@ -611,8 +632,9 @@ def refresh_page(driver: Driver) -> bool:
     try:
         print("[color:cyan]Refreshing page to prevent session timeout...")
         
-        # Clear content cache since we're refreshing
+        # Clear content cache and tracked conversation since we're refreshing
         _clear_content_cache()
+        _forget_conversation()
         
         # Refresh the page
         driver.refresh()
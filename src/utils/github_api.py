@@ -6,11 +6,11 @@ Provides functionality for fetching release information and assets from GitHub.
 Used by the improved update modal system.
 """
 
-import requests
 import platform
 import os
 from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass
+from utils.update_checker import cached_get_json, RELEASE_TTL
 
 
 @dataclass
@@ -43,16 +43,17 @@ class GitHubAPI:
         """
         Get the latest release information from GitHub API
         
+        Served from the on-disk cache for a few minutes, then revalidated with its ETag
+        (304 responses don't count against GitHub's rate limit)
+        
         Returns:
             Dict containing release information or None if failed
         """
-        try:
-            response = requests.get(cls.RELEASES_URL, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"Failed to fetch release info: {e}")
+        release_data = cached_get_json(cls.RELEASES_URL, RELEASE_TTL, timeout=10)
+        if not isinstance(release_data, dict):
+            print("Failed to fetch release info")
             return None
+        return release_data
     
     @classmethod
     def get_release_assets(cls, release_data: Optional[Dict[str, Any]] = None) -> List[GitHubAsset]:
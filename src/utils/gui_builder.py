@@ -1,6 +1,5 @@
-from typing import Optional, List, Callable
+from typing import Optional, List, Callable, Iterable, Set
 import customtkinter as ctk
-import re
 import json
 import webbrowser
 import os
@@ -11,7 +10,11 @@ from utils import storage_manager
 from PIL import Image, ImageDraw
 import requests
 from io import BytesIO
+import bisect
 import threading
+import tkinter as tk
+from collections import deque
+from utils.console_buffer import ConsoleBuffer, DEFAULT_COLOR, DEFAULT_MAX_LINES
 
 # ============================================================================================================================
 # Cross-Platform GUI Utilities
@@ -265,12 +268,74 @@ def _center_parent_window(parent: ctk.CTkToplevel, root: ctk.CTk, width: Optiona
 # Textbox Widget
 # =============================================================================================================================
 
+# Queued textbox updates are applied on the Tk thread at most this often
+TEXTBOX_FRAME_MS = 50
+TEXTBOX_WHEEL_LINES = 3
+
+_CLEAR = object()
+
 class CustomTextbox(ctk.CTkTextbox):
-    def _ensure_max_lines(self, max_lines: int = 500) -> None:
-        self.update_idletasks()
-        total_lines = int(self.index("end-1c").split('.')[0])
-        if total_lines > max_lines:
-            self.delete("1.0", f"{total_lines - max_lines + 1}.0")
+    """Textbox for colored log output
+
+    The text lives in a ConsoleBuffer and the widget only holds the lines in view, so a long history
+    costs no Tk text lines. colored_add/add/clear may be called from any thread: they only queue the
+    update, the Tk thread moves everything queued into the buffer and redraws once per frame.
+    """
+
+    def __init__(self, *args, history_lines: int = DEFAULT_MAX_LINES, **kwargs):
+        kwargs["activate_scrollbars"] = False  # Scrolling is over the buffer, not the Tk text
+        super().__init__(*args, **kwargs)
+        self.buffer = ConsoleBuffer(history_lines)
+        self._pending = deque()  # Not capped, a burst must not lose lines (or a clear), the buffer bounds the history
+
+        # View state
+        self._follow = True  # Stick to the newest line
+        self._top = 0  # Number of the first line in view when not following
+        self._start = 0  # Position of the first line in view among the visible lines
+        self._rendered = None
+        self._line_height = 0
+
+        # Filter state (matches holds the numbers of the lines passing the filter)
+        self._query = ""
+        self._colors: Optional[Set[str]] = None
+        self._matches: Optional[List[int]] = None
+        self._scanned = 0
+        self._filter_revision = 0
+        self._match_length = tk.IntVar(master=self)
+
+        border = max(self._corner_radius, self._border_width + self._border_spacing)
+        self._scrollbar = ctk.CTkScrollbar(
+            self,
+            width=8,
+            height=0,
+            border_spacing=0,
+            fg_color=self._fg_color,
+            button_color=self._scrollbar_button_color,
+            button_hover_color=self._scrollbar_button_hover_color,
+            orientation="vertical",
+            command=self._on_scrollbar
+        )
+        self._scrollbar.grid(row=0, column=1, sticky="nsw", pady=(border, 0))
+
+        self._textbox.tag_config("search_match", background="#5c4b00")
+        self._textbox.bind("<Configure>", lambda event: self._render(), add="+")
+        self._textbox.bind("<MouseWheel>", self._on_mouse_wheel)
+        self._textbox.bind("<Button-4>", lambda event: self._scroll(-TEXTBOX_WHEEL_LINES))
+        self._textbox.bind("<Button-5>", lambda event: self._scroll(TEXTBOX_WHEEL_LINES))
+        self._textbox.bind("<Button-1>", lambda event: self._textbox.focus_set(), add="+")  # Disabled text doesn't take focus for the keys
+        self._textbox.bind("<Prior>", lambda event: self._scroll(1 - self._rows()))
+        self._textbox.bind("<Next>", lambda event: self._scroll(self._rows() - 1))
+        self._textbox.bind("<Home>", lambda event: self._scroll(-self._visible_count()))
+        self._textbox.bind("<End>", lambda event: self._scroll(self._visible_count()))
+
+        self._flush_job = self.after(TEXTBOX_FRAME_MS, self._flush_pending)
+
+    def destroy(self) -> None:
+        try:
+            self.after_cancel(self._flush_job)
+        except Exception:
+            pass
+        super().destroy()
 
     def add_colors(self) -> None:
         self._color_map = {
@@ -289,43 +354,209 @@ class CustomTextbox(ctk.CTkTextbox):
             self.tag_config(tag, foreground=color)
     
     def clear(self) -> None:
-        self.configure(state="normal")
-        self.delete("1.0", "end")
-        self.configure(state="disabled")
+        self._pending.append(_CLEAR)
 
     def colored_add(self, text: str) -> None:
         """Add colored text to textbox (improved for console output)"""
-        if not text:
+        if text:
+            self._pending.append((text, True))
+
+    def add(self, text: str) -> None:
+        self._pending.append((text, False))
+
+    def get_history(self) -> str:
+        """All lines kept in the buffer as plain text (Tk thread)"""
+        self._apply_pending()
+        return self.buffer.text()
+
+    def set_history_lines(self, history_lines: int) -> None:
+        self.buffer.resize(history_lines)
+        self.refresh()
+
+    def set_filter(self, query: str = "", colors: Optional[Iterable[str]] = None) -> None:
+        """Only show lines containing ``query`` (case-insensitive) with text in one of ``colors`` (Tk thread)"""
+        self._apply_pending()
+        self._query = query
+        self._colors = set(colors) if colors is not None else None
+        self._filter_revision += 1
+
+        if query or self._colors is not None:
+            self._matches = self.buffer.find(query, self._colors)
+        else:
+            self._matches = None
+        self._scanned = self.buffer.end
+
+        self._follow = True
+        self._render()
+
+    def get_match_count(self) -> Optional[int]:
+        """Number of lines passing the filter (None without a filter)"""
+        return len(self._matches) if self._matches is not None else None
+
+    def refresh(self) -> None:
+        """Redraw the view, e.g. after the font or colors changed (Tk thread)"""
+        self._line_height = 0
+        self._rendered = None
+        self._render()
+
+    # Buffer updates
+
+    def _flush_pending(self) -> None:
+        """Apply the queued updates (Tk thread)"""
+        try:
+            if self._pending:
+                self._apply_pending()
+                self._render()
+        except Exception as e:
+            print(f"Error updating textbox: {e}")
+        finally:
+            try:
+                self._flush_job = self.after(TEXTBOX_FRAME_MS, self._flush_pending)
+            except Exception:
+                pass  # Widget is gone
+
+    def _apply_pending(self) -> None:
+        items = []
+        while self._pending:
+            items.append(self._pending.popleft())
+
+        for item in items:
+            if item is _CLEAR:
+                self.buffer.clear()
+                self._follow = True
+            else:
+                self.buffer.append(*item)
+
+        if self._matches is not None:
+            first = self.buffer.first
+            if self._matches and self._matches[0] < first:
+                del self._matches[:bisect.bisect_left(self._matches, first)]
+            if self._scanned < self.buffer.end:
+                self._matches.extend(self.buffer.find(self._query, self._colors, start=max(self._scanned, first)))
+                self._scanned = self.buffer.end
+
+    # View
+
+    def _visible_count(self) -> int:
+        return len(self._matches) if self._matches is not None else len(self.buffer)
+
+    def _position(self, number: int) -> int:
+        if self._matches is not None:
+            return bisect.bisect_left(self._matches, number)
+        return max(0, number - self.buffer.first)
+
+    def _rows(self) -> int:
+        if not self._line_height:
+            font = self._textbox.cget("font")
+            self._line_height = max(1, int(self._textbox.tk.call("font", "metrics", font, "-linespace")))
+        # One extra for a partly visible line at the bottom
+        return max(1, self._textbox.winfo_height() // self._line_height + 1)
+
+    def _render(self) -> None:
+        count = self._visible_count()
+        rows = self._rows()
+        last_start = max(0, count - rows)
+        start = last_start if self._follow else min(self._position(self._top), last_start)
+
+        if self._matches is not None:
+            numbers = self._matches[start:start + rows]
+            lines = self.buffer.get_numbers(numbers)
+        else:
+            first = self.buffer.first
+            numbers = range(first + start, min(self.buffer.end, first + start + rows))
+            lines = self.buffer.get(numbers.start, numbers.stop)
+
+        self._start = start
+        if numbers:
+            self._top = numbers[0]
+        self._update_scrollbar(count, len(lines))
+
+        # Line numbers never repeat, so the same first and last line means the same content
+        key = (numbers[0], numbers[-1]) if numbers else None
+        key = (key, self._filter_revision, self._follow)
+        if key == self._rendered:
             return
-            
-        pattern = r'\[color:(\w+)\]'
-        parts = re.split(pattern, text)
-        current_tag = "white"
+        self._rendered = key
 
         self.configure(state="normal")
-        self._ensure_max_lines()
+        self.delete("1.0", "end")
+        for text, tag in self._tag_runs(lines):
+            self.insert("end", text, tag)
+        self._highlight_matches()
+        self.configure(state="disabled")
 
-        for i, part in enumerate(parts):
-            if i % 2 == 0:
-                if part:
-                    self.insert("end", part, current_tag)
+        if self._follow:
+            self._textbox.see("end")  # Wrapped lines may not all fit
+        else:
+            self._textbox.yview_moveto(0)
+
+    def _tag_runs(self, lines: list) -> List[tuple]:
+        """Merge the runs of the lines in view into as few inserts as possible"""
+        color_map = getattr(self, "_color_map", {})
+        runs: List[list] = []
+
+        def append(text: str, tag: Optional[str]) -> None:
+            if runs and runs[-1][1] == tag:
+                runs[-1][0].append(text)
             else:
-                tag = part.lower()
-                current_tag = tag if hasattr(self, "_color_map") and tag in self._color_map else "white"
+                runs.append([[text], tag])
 
-        # Only add newline if the text doesn't already end with one
-        if not text.endswith('\n'):
-            self.insert("end", "\n")
-        
-        self.configure(state="disabled")
-        self.see("end")
+        for index, (_, line_runs) in enumerate(lines):
+            for tag, text in line_runs:
+                append(text, tag if tag is None or tag in color_map else DEFAULT_COLOR)
+            if index < len(lines) - 1:
+                append("\n", runs[-1][1] if runs else None)
 
-    def add(self, text: str) -> None:
-        self.configure(state="normal")
-        self._ensure_max_lines()
-        self.insert("end", text)
-        self.configure(state="disabled")
-        self.see("end")
+        return [("".join(texts), tag) for texts, tag in runs]
+
+    def _highlight_matches(self) -> None:
+        if not self._query:
+            return
+        index = "1.0"
+        while True:
+            index = self._textbox.search(self._query, index, stopindex="end", nocase=True, count=self._match_length)
+            if not index or not self._match_length.get():
+                break
+            end = f"{index}+{self._match_length.get()}c"
+            self._textbox.tag_add("search_match", index, end)
+            index = end
+
+    def _update_scrollbar(self, count: int, shown: int) -> None:
+        if count <= shown:
+            self._scrollbar.set(0.0, 1.0)
+        else:
+            self._scrollbar.set(self._start / count, (self._start + shown) / count)
+
+    def _scroll(self, delta: int) -> str:
+        self._scroll_to(self._start + delta)
+        return "break"
+
+    def _scroll_to(self, start: int) -> None:
+        count = self._visible_count()
+        last_start = max(0, count - self._rows())
+        start = max(0, min(start, last_start))
+        self._follow = start >= last_start
+
+        if not self._follow:
+            if self._matches is not None:
+                self._top = self._matches[start] if start < len(self._matches) else self.buffer.end
+            else:
+                self._top = self.buffer.first + start
+        self._render()
+
+    def _on_scrollbar(self, action: str, *args) -> None:
+        if action == "moveto":
+            self._scroll_to(int(float(args[0]) * self._visible_count()))
+        elif action == "scroll":
+            amount = int(args[0])
+            if args[1] == "pages":
+                amount *= max(1, self._rows() - 1)
+            self._scroll_to(self._start + amount)
+
+    def _on_mouse_wheel(self, event) -> str:
+        # Windows reports multiples of 120, macOS single steps
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self._scroll(-steps * TEXTBOX_WHEEL_LINES)
 
 # =============================================================================================================================
 # Root Window
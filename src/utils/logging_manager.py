@@ -1,6 +1,13 @@
-import os, re, time, random, string
+import os, re, time, random, string, queue, threading
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
+
+# Messages waiting for the writer thread, anything beyond is dropped (and counted)
+MAX_QUEUED_MESSAGES = 10000
+MAX_BATCH = 1000
+FSYNC_INTERVAL = 5.0  # seconds
+
+_STOP = object()
 
 class LoggingManager:
     def __init__(self, storage_manager=None):
@@ -11,6 +18,18 @@ class LoggingManager:
         self.max_files = 10  # 10 files default
         self.logs_dir = None
         
+        # Background writer
+        self._queue = queue.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self._writer_thread = None
+        self._file = None
+        self._file_size = 0
+        self._segment = 0
+        self._last_fsync = 0.0
+        self._dropped = 0
+        self._dropped_reported = 0
+        self._written = 0
+        self._dropped_lock = threading.Lock()
+        
     def initialize(self, config: dict) -> None:
         """Initialize logging based on config settings"""
         try:
@@ -29,6 +48,10 @@ class LoggingManager:
                 self._create_new_log_file()
                 self._cleanup_old_files()
                 
+                if self.current_log_file and self._writer_thread is None:
+                    self._writer_thread = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+                    self._writer_thread.start()
+                
         except Exception as e:
             print(f"Error initializing logging: {e}")
     
@@ -49,12 +72,10 @@ class LoggingManager:
             filename = f"log_file_{readable_time}_{random_string}.txt"
             
             self.current_log_file = os.path.join(self.logs_dir, filename)
+            self._segment = 0
             
             # Create the file with initial header
-            with open(self.current_log_file, 'w', encoding='utf-8') as f:
-                f.write(f"=== INTENSE RP API LOG ===\n")
-                f.write(f"Started: {now.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"={'=' * 50}\n\n")
+            self._open_log_file(f"Started: {now.strftime('%Y-%m-%d %H:%M:%S')}")
                 
             print(f"Created new log file: {filename}")
             
@@ -62,6 +83,36 @@ class LoggingManager:
             print(f"Error creating log file: {e}")
             self.current_log_file = None
     
+    def _open_log_file(self, header_line: str) -> None:
+        """Open a fresh file at current_log_file (kept open for the writer thread) and write the header"""
+        self._file = open(self.current_log_file, 'w', encoding='utf-8')
+        header = f"=== INTENSE RP API LOG ===\n{header_line}\n={'=' * 50}\n\n"
+        self._file.write(header)
+        self._file.flush()
+        self._file_size = len(header.encode('utf-8'))
+    
+    def _rotate(self) -> None:
+        """Move the full log aside by renaming it and continue in a fresh file under the same name"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        
+        self._segment += 1
+        base, extension = os.path.splitext(self.current_log_file)
+        try:
+            os.replace(self.current_log_file, f"{base}_part{self._segment}{extension}")
+        except OSError as e:
+            # Keep appending to the same file rather than losing messages, retry once it grew again
+            print(f"Error rotating log file: {e}")
+            self._segment -= 1
+            self._file = open(self.current_log_file, 'a', encoding='utf-8')
+            self._file_size = 0
+            return
+        
+        self._open_log_file(f"Continued: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (previous part: {os.path.basename(base)}_part{self._segment}{extension})")
+        self._cleanup_old_files()
+    
     def _cleanup_old_files(self) -> None:
         """Delete oldest log files if exceeding max_files limit"""
         try:
@@ -73,14 +124,14 @@ class LoggingManager:
             for filename in os.listdir(self.logs_dir):
                 if filename.startswith("log_file_") and filename.endswith(".txt"):
                     filepath = os.path.join(self.logs_dir, filename)
-                    if os.path.isfile(filepath):
-                        log_files.append((filepath, os.path.getctime(filepath)))
+                    if os.path.isfile(filepath) and filepath != self.current_log_file:
+                        log_files.append((filepath, os.path.getmtime(filepath)))
             
-            # Sort by creation time (oldest first)
+            # Sort by last write (oldest first), rotated parts keep the time of their last line
             log_files.sort(key=lambda x: x[1])
             
-            # Remove excess files
-            while len(log_files) > self.max_files:
+            # Remove excess files (the file being written counts as one)
+            while len(log_files) > max(0, self.max_files - 1):
                 oldest_file = log_files.pop(0)
                 try:
                     os.remove(oldest_file[0])
@@ -91,69 +142,110 @@ class LoggingManager:
         except Exception as e:
             print(f"Error cleaning up log files: {e}")
     
-    def _trim_log_file(self) -> None:
-        """Trim lines from start of log file if it exceeds max size"""
-        try:
-            if not self.current_log_file or not os.path.exists(self.current_log_file):
-                return
-                
-            file_size = os.path.getsize(self.current_log_file)
-            if file_size <= self.max_file_size:
-                return
-                
-            # Read all lines
-            with open(self.current_log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            # Calculate how many lines to remove (roughly)
-            avg_line_size = file_size / len(lines) if lines else 1
-            lines_to_remove = int((file_size - self.max_file_size * 0.8) / avg_line_size)
-            lines_to_remove = max(1, min(lines_to_remove, len(lines) // 2))
-            
-            # Keep the header and remove from after it
-            header_end = 3  # Lines for header
-            if len(lines) > header_end + lines_to_remove:
-                # Remove lines after header
-                remaining_lines = lines[:header_end] + lines[header_end + lines_to_remove:]
-                
-                # Add trimming notice
-                remaining_lines.insert(header_end, f"[LOG TRIMMED - {lines_to_remove} lines removed at {datetime.now().strftime('%H:%M:%S')}]\n\n")
-                
-                # Write back to file
-                with open(self.current_log_file, 'w', encoding='utf-8') as f:
-                    f.writelines(remaining_lines)
-                    
-                print(f"Trimmed {lines_to_remove} lines from log file")
-                
-        except Exception as e:
-            print(f"Error trimming log file: {e}")
-    
     def _strip_color_codes(self, text: str) -> str:
         """Remove color codes from text for clean log output"""
         return re.sub(r'\[color:\w+\]', '', text)
     
     def log_message(self, text: str) -> None:
-        """Log a message to the current log file"""
+        """Queue a message for the log file (never blocks, drops the message if the writer is behind)"""
+        if not self.enabled or self._writer_thread is None:
+            return
+        
         try:
-            if not self.enabled or not self.current_log_file:
-                return
-                
-            # Check file size before writing
-            if os.path.exists(self.current_log_file):
-                if os.path.getsize(self.current_log_file) >= self.max_file_size:
-                    self._trim_log_file()
+            self._queue.put_nowait((time.time(), text))
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+    
+    def _writer_loop(self) -> None:
+        """Write queued messages in batches on the open log file"""
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while item is not _STOP and len(batch) < MAX_BATCH:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(item)
             
-            # Clean the text and add timestamp
-            clean_text = self._strip_color_codes(text)
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] {clean_text}\n"
+            stop = batch[-1] is _STOP
+            if stop:
+                batch.pop()
             
-            # Append to log file
-            with open(self.current_log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-                
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                print(f"Error writing to log file: {e}")
+            
+            if stop:
+                return
+    
+    def _write_batch(self, batch: list) -> None:
+        if self._file is None:
+            return
+        
+        lines = []
+        with self._dropped_lock:
+            dropped = self._dropped - self._dropped_reported
+            self._dropped_reported = self._dropped
+        if dropped:
+            lines.append(f"[{datetime.now().strftime('%H:%M:%S')}] [LOG OVERFLOW - {dropped} messages dropped]\n")
+        
+        second, stamp = None, ""
+        for timestamp, text in batch:
+            if int(timestamp) != second:
+                second = int(timestamp)
+                stamp = time.strftime('%H:%M:%S', time.localtime(timestamp))
+            lines.append(f"[{stamp}] {self._strip_color_codes(text)}\n")
+        
+        # Writes go to the file object's buffer, flushed once per batch
+        for line in lines:
+            self._file.write(line)
+            self._file_size += len(line.encode('utf-8'))
+            if self._file_size >= self.max_file_size:
+                self._rotate()
+                self._last_fsync = time.monotonic()
+        self._file.flush()
+        self._written += len(batch)
+        
+        now = time.monotonic()
+        if now - self._last_fsync >= FSYNC_INTERVAL:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+    
+    def close(self, timeout: float = 2.0) -> None:
+        """Write out everything still queued and close the log file"""
+        thread = self._writer_thread
+        if thread is None:
+            return
+        
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+            thread.join(timeout)
         except Exception as e:
-            print(f"Error writing to log file: {e}")
+            print(f"Error stopping log writer: {e}")
+        
+        self._writer_thread = None
+        if thread.is_alive():
+            return  # Stuck on the disk, the daemon thread goes away with the process
+        
+        try:
+            if self._file:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
+        except Exception as e:
+            print(f"Error closing log file: {e}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Writer queue state"""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "dropped": self._dropped
+        }
     
     def get_log_files(self) -> List[str]:
         """Get list of existing log files"""
@@ -1,15 +1,25 @@
 """
 Message dump comparison utility for Clean Regeneration feature
-Handles storage, comparison and cleanup of message dump files
+Keeps a digest of the last prompt in memory, with optional file dumps for debugging
 """
 
 import os
 import hashlib
-from typing import Optional
+import threading
+from typing import Optional, Tuple
+
+
+# (sha256 digest, length) of a stripped prompt
+Fingerprint = Tuple[str, int]
 
 
 class MessageDumpManager:
-    """Manages message dump files for Clean Regeneration feature"""
+    """Manages message dumps for Clean Regeneration feature
+    
+    By default only a SHA-256 digest and the length of each prompt are kept in memory.
+    The old behavior (full prompts written to msgdump/*.txt) is available for debugging
+    with the ``dumps.regeneration_files`` setting.
+    """
     
     def __init__(self, base_path: str = None):
         """Initialize the dump manager
@@ -32,6 +42,36 @@ class MessageDumpManager:
         self.msgdump_dir = os.path.join(self.base_path, "msgdump")
         self.old_dump_file = os.path.join(self.msgdump_dir, "olddump.txt")
         self.new_dump_file = os.path.join(self.msgdump_dir, "newdump.txt")
+        self.digest_file = os.path.join(self.msgdump_dir, "olddump.sha256")
+        
+        # In-memory store
+        self._lock = threading.Lock()
+        self._old_fingerprint: Optional[Fingerprint] = None
+        self._new_fingerprint: Optional[Fingerprint] = None
+        self._digest_loaded = False
+        self._persist_lock = threading.Lock()
+    
+    def _get_setting(self, key: str, default: bool) -> bool:
+        """Read a setting from the state manager (defaults if it isn't available)"""
+        try:
+            from core import get_state_manager
+            return bool(get_state_manager().config_snapshot().get(key, default))
+        except Exception:
+            return default
+    
+    def uses_files(self) -> bool:
+        """Check if full prompts should be written to dump files (debug option)"""
+        return self._get_setting("dumps.regeneration_files", False)
+    
+    def persists_digest(self) -> bool:
+        """Check if the last digest should be saved to disk for crash recovery"""
+        return self._get_setting("dumps.persist_digest", False)
+    
+    @staticmethod
+    def fingerprint(content: str) -> Fingerprint:
+        """Digest and length of the stripped content"""
+        normalized = content.strip()
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest(), len(normalized)
     
     def _ensure_dump_directory_exists(self) -> None:
         """Create the msgdump directory if it doesn't exist"""
@@ -115,6 +155,22 @@ class MessageDumpManager:
         Returns:
             True if contents are identical, False otherwise
         """
+        if self.uses_files():
+            return self._compare_dump_files(new_content)
+        
+        try:
+            new_fingerprint = self.fingerprint(new_content)
+            self._load_persisted_digest()
+            
+            with self._lock:
+                self._new_fingerprint = new_fingerprint
+                return self._old_fingerprint == new_fingerprint
+        except Exception as e:
+            print(f"[color:red]Error comparing dumps: {e}")
+            return False
+    
+    def _compare_dump_files(self, new_content: str) -> bool:
+        """Compare using the dump files (debug mode)"""
         try:
             # Write new content to newdump.txt
             if not self.set_new_dump_content(new_content):
@@ -138,13 +194,32 @@ class MessageDumpManager:
             return False
     
     def update_dumps_after_success(self) -> bool:
-        """Update dump files after successful generation
+        """Update dumps after successful generation
         
-        This moves newdump.txt content to olddump.txt for next comparison
+        This makes the new prompt the one the next request is compared against
+        (moves newdump.txt to olddump.txt in file mode)
         
         Returns:
             True if successful, False otherwise
         """
+        if self.uses_files():
+            return self._update_dump_files()
+        
+        with self._lock:
+            if self._new_fingerprint is None:
+                print("[color:yellow]Warning: No new dump content to update")
+                return False
+            self._old_fingerprint = self._new_fingerprint
+            fingerprint = self._old_fingerprint
+        
+        if self.persists_digest():
+            # Saved in the background so the response isn't held up by disk I/O
+            threading.Thread(target=self._write_persisted_digest, args=(fingerprint,), daemon=True).start()
+        
+        return True
+    
+    def _update_dump_files(self) -> bool:
+        """Move newdump.txt to olddump.txt (debug mode)"""
         try:
             new_content = self.get_new_dump_content()
             if new_content is None:
@@ -162,19 +237,60 @@ class MessageDumpManager:
             print(f"[color:red]Error updating dumps after success: {e}")
             return False
     
+    def _load_persisted_digest(self) -> None:
+        """Restore the last digest saved before a restart (only once)"""
+        if self._digest_loaded:
+            return
+        self._digest_loaded = True
+        
+        if not self.persists_digest():
+            return
+        
+        content = self._read_dump_file(self.digest_file)
+        if not content:
+            return
+        
+        try:
+            digest, length = content.split()
+            with self._lock:
+                if self._old_fingerprint is None:
+                    self._old_fingerprint = (digest, int(length))
+        except ValueError:
+            print(f"[color:yellow]Warning: Ignoring malformed digest file {self.digest_file}")
+    
+    def _write_persisted_digest(self, fingerprint: Fingerprint) -> None:
+        """Write the digest atomically (temp file + rename)"""
+        temp_file = self.digest_file + ".tmp"
+        with self._persist_lock:
+            if self._write_dump_file(temp_file, f"{fingerprint[0]} {fingerprint[1]}\n"):
+                try:
+                    os.replace(temp_file, self.digest_file)
+                except Exception as e:
+                    print(f"[color:yellow]Warning: Could not save dump digest: {e}")
+    
     def cleanup_dump_directory(self) -> bool:
         """Clean up the entire msgdump directory
         
-        This removes all dump files and the directory itself
+        This removes all dump files and the directory itself (the digest file is
+        kept when it is persisted for crash recovery)
         
         Returns:
             True if successful, False otherwise
         """
+        with self._lock:
+            self._old_fingerprint = None
+            self._new_fingerprint = None
+        
+        keep_digest = self.persists_digest()
+        self._digest_loaded = False
+        
         try:
             if os.path.exists(self.msgdump_dir):
                 # Remove all files in the directory
                 for filename in os.listdir(self.msgdump_dir):
                     file_path = os.path.join(self.msgdump_dir, filename)
+                    if keep_digest and file_path == self.digest_file:
+                        continue
                     try:
                         if os.path.isfile(file_path):
                             os.remove(file_path)
@@ -183,6 +299,8 @@ class MessageDumpManager:
                 
                 # Remove the directory itself
                 try:
+                    if keep_digest and os.path.exists(self.digest_file):
+                        return True
                     os.rmdir(self.msgdump_dir)
                     print("[color:green]Message dump directory cleaned successfully")
                 except Exception as e:
@@ -201,7 +319,16 @@ class MessageDumpManager:
             Dictionary with dump file status information
         """
         try:
+            with self._lock:
+                old_fingerprint = self._old_fingerprint
+                new_fingerprint = self._new_fingerprint
+            
             return {
+                'mode': 'files' if self.uses_files() else 'memory',
+                'old_digest': old_fingerprint[0] if old_fingerprint else None,
+                'old_length': old_fingerprint[1] if old_fingerprint else 0,
+                'new_digest': new_fingerprint[0] if new_fingerprint else None,
+                'new_length': new_fingerprint[1] if new_fingerprint else 0,
                 'msgdump_dir_exists': os.path.exists(self.msgdump_dir),
                 'msgdump_dir_path': self.msgdump_dir,
                 'old_dump_exists': os.path.exists(self.old_dump_file),
@@ -0,0 +1,212 @@
+"""
+Prometheus-style metrics for the API
+Counters and fixed-bucket histograms keep one preallocated list of bucket counts per label set,
+so recording a value is a bisect and a few additions under a per-metric lock
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds (seconds unless noted)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+QUEUE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+WEBDRIVER_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+TOKEN_RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500)  # tokens per second
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(values):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class _HistogramSeries:
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Fixed-bucket histogram with optional labels"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = tuple(label_names)
+        self._series: Dict[Tuple, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels) -> None:
+        # First bound >= value, the extra slot at the end is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.total += value
+            series.count += 1
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series.counts), series.total, series.count) for labels, series in self._series.items()]
+
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (float('inf'),)
+        for labels, counts, total, count in sorted(snapshot, key=lambda item: item[0]):
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+def metric_lines(name: str, help_text: str, samples: Sequence[Tuple[Dict[str, object], float]], metric_type: str = "gauge") -> List[str]:
+    """Exposition lines for values read at scrape time"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+    return lines
+
+
+class MetricsRegistry:
+    """All metrics exported on /metrics"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], List[str]]] = []
+
+        # Request lifecycle
+        self.requests = self.counter("intenserp_requests_total", "Chat completion requests by model, mode, streaming and HTTP status", ("model", "mode", "stream", "status"))
+        self.request_duration = self.histogram("intenserp_request_duration_seconds", "Time from request received to the last byte produced", LATENCY_BUCKETS, ("mode", "stream"))
+        self.time_to_first_token = self.histogram("intenserp_time_to_first_token_seconds", "Time from request received to the first response content", LATENCY_BUCKETS, ("mode", "stream"))
+        self.tokens_per_second = self.histogram("intenserp_tokens_per_second", "Estimated response tokens per second after the first token", TOKEN_RATE_BUCKETS, ("mode",))
+        self.response_tokens = self.counter("intenserp_response_tokens_total", "Estimated response tokens delivered", ("mode",))
+        self.queue_wait = self.histogram("intenserp_queue_wait_seconds", "Time a task waited for a worker thread", QUEUE_BUCKETS, ("pool",))
+        self.rate_limited = self.counter("intenserp_rate_limited_total", "Requests refused by the rate limiter", ("code",))
+        self.context_trims = self.counter("intenserp_context_trimmed_messages_total", "Messages dropped by the context budget")
+
+        # Browser
+        self.webdriver_commands = self.counter("intenserp_webdriver_commands_total", "WebDriver commands issued", ("command",))
+        self.webdriver_latency = self.histogram("intenserp_webdriver_command_seconds", "WebDriver command round trip time", WEBDRIVER_BUCKETS, ("command",))
+        self.page_refreshes = self.counter("intenserp_page_refreshes_total", "Page refreshes done by the refresh timer", ("result",))
+
+        # Network interception
+        self.interception_chunks = self.counter("intenserp_interception_chunks_total", "Stream chunks received from the extension")
+        self.interception_parse_errors = self.counter("intenserp_interception_parse_errors_total", "Intercepted chunks that could not be parsed")
+        self.censorship_truncations = self.counter("intenserp_censorship_truncations_total", "Responses cut short because censorship was detected")
+
+        self._started = time.time()
+        self.add_collector(self._collect_process)
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float], label_names: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help_text, buckets, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[str]]) -> None:
+        """Add a function producing exposition lines at scrape time (gauges)"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.collect())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return "\n".join(lines) + "\n"
+
+    def _collect_process(self) -> List[str]:
+        return metric_lines("intenserp_uptime_seconds", "Seconds since metrics collection started", [({}, round(time.time() - self._started, 3))])
+
+
+def instrument_webdriver(driver) -> None:
+    """Count and time every WebDriver command sent by the driver (and its elements)"""
+    execute = getattr(driver, 'execute', None)
+    if execute is None or getattr(execute, 'is_instrumented', False):
+        return
+
+    metrics = get_metrics()
+
+    def timed_execute(driver_command, params=None):
+        start = time.perf_counter()
+        try:
+            return execute(driver_command, params)
+        finally:
+            metrics.webdriver_commands.inc(driver_command)
+            metrics.webdriver_latency.observe(time.perf_counter() - start, driver_command)
+
+    timed_execute.is_instrumented = True
+    driver.execute = timed_execute
+
+
+# Singleton instance for global access
+_metrics_instance: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> MetricsRegistry:
+    """Get the global metrics registry
+
+    Returns:
+        MetricsRegistry instance
+    """
+    global _metrics_instance
+
+    if _metrics_instance is None:
+        with _metrics_lock:
+            if _metrics_instance is None:
+                _metrics_instance = MetricsRegistry()
+
+    return _metrics_instance
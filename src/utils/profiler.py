@@ -0,0 +1,214 @@
+"""
+Sampling profiler for the running app
+Walks the stack of every thread with sys._current_frames() at a fixed interval. Nothing is hooked
+into the profiled code, so the cost is one stack walk per thread per sample and it can be used on a
+live server (waitress workers, the driver monitor, the refresh timer and the Tk main thread alike).
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+DEFAULT_INTERVAL = 0.01  # 100 samples per second
+MIN_INTERVAL = 0.001
+MAX_SECONDS = 120
+MAX_DEPTH = 128
+
+# "waitress-3" and "api-worker_0" are grouped as one thread in the stacks, "Thread-5 (monitor_driver)" as "monitor_driver"
+_NUMBERED_THREAD = re.compile(r"[-_]\d+$")
+_UNNAMED_THREAD = re.compile(r"^Thread-\d+ \((.+)\)$")
+
+
+class ProfilerBusyError(RuntimeError):
+    """A profile is already being taken"""
+    pass
+
+
+@dataclass
+class ProfileResult:
+    """Samples of one profiling run"""
+    started: float
+    duration: float
+    interval: float
+    samples: int
+    stacks: Counter = field(default_factory=Counter)
+    thread_samples: Counter = field(default_factory=Counter)
+
+    def collapsed(self) -> str:
+        """Collapsed stacks ("thread;outer;...;inner count" per line) for flamegraph.pl or speedscope"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Functions with the most samples, on top of the stack (self) or anywhere in it (total)"""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for frame in set(frames):
+                total[frame] += count
+
+        stack_samples = max(1, sum(self.stacks.values()))
+        return [
+            {
+                "function": function,
+                "self": own[function],
+                "total": count,
+                "self_percent": round(own[function] * 100 / stack_samples, 2),
+                "total_percent": round(count * 100 / stack_samples, 2)
+            }
+            for function, count in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:limit]
+        ]
+
+    def to_dict(self, limit: int = 25) -> Dict[str, Any]:
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration": round(self.duration, 3),
+            "interval": self.interval,
+            "samples": self.samples,
+            "threads": dict(self.thread_samples.most_common()),
+            "top_functions": self.top_functions(limit),
+            "stacks": len(self.stacks)
+        }
+
+    def save(self, directory: str) -> str:
+        """Write the collapsed stacks to ``directory``
+
+        Returns:
+            Path of the written file
+        """
+        os.makedirs(directory, exist_ok=True)
+        filename = f"profile_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started))}.collapsed"
+        path = os.path.join(directory, filename)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+
+class SamplingProfiler:
+    """Takes one profile at a time, sampling from the calling thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._labels: Dict[Any, str] = {}
+
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval: float = DEFAULT_INTERVAL) -> ProfileResult:
+        """Sample every other thread for ``seconds`` (blocks the caller)
+
+        Raises:
+            ValueError: If seconds or interval is out of range
+            ProfilerBusyError: If another profile is being taken
+        """
+        if not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be between 0 and {MAX_SECONDS}")
+        if not MIN_INTERVAL <= interval <= 1:
+            raise ValueError(f"interval must be between {MIN_INTERVAL} and 1 second")
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        try:
+            return self._sample(seconds, interval)
+        finally:
+            self._labels.clear()
+            self._lock.release()
+
+    def _sample(self, seconds: float, interval: float) -> ProfileResult:
+        own_ident = threading.get_ident()
+        names: Dict[int, str] = {}
+        stacks: Counter = Counter()
+        thread_samples: Counter = Counter()
+        samples = 0
+
+        started = time.time()
+        start = time.perf_counter()
+        deadline = start + seconds
+        next_sample = start
+
+        while True:
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == own_ident:
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                    name = names.setdefault(ident, f"thread-{ident}")
+                thread_samples[name] += 1
+                stacks[self._collapse(self._thread_label(name), frame)] += 1
+            del frames
+            samples += 1
+
+            next_sample += interval
+            now = time.perf_counter()
+            if next_sample >= deadline:
+                break
+            if next_sample > now:
+                time.sleep(next_sample - now)
+            else:
+                next_sample = now  # Fell behind, don't try to catch up with a burst
+
+        return ProfileResult(
+            started=started,
+            duration=time.perf_counter() - start,
+            interval=interval,
+            samples=samples,
+            stacks=stacks,
+            thread_samples=thread_samples
+        )
+
+    def _collapse(self, thread_label: str, frame) -> str:
+        labels = []
+        while frame is not None and len(labels) < MAX_DEPTH:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = self._frame_label(code)
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_label)
+        labels.reverse()
+        return ";".join(labels)
+
+    @staticmethod
+    def _frame_label(code) -> str:
+        # Semicolons separate frames in the collapsed format
+        filename = "/".join(code.co_filename.replace("\\", "/").split("/")[-2:])
+        return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+    @staticmethod
+    def _thread_label(name: str) -> str:
+        match = _UNNAMED_THREAD.match(name)
+        if match:
+            return match.group(1)
+        return _NUMBERED_THREAD.sub("", name)
+
+
+# Singleton instance for global access
+_profiler_instance: Optional[SamplingProfiler] = None
+_profiler_lock = threading.Lock()
+
+def get_profiler() -> SamplingProfiler:
+    """Get the global sampling profiler
+
+    Returns:
+        SamplingProfiler instance
+    """
+    global _profiler_instance
+
+    if _profiler_instance is None:
+        with _profiler_lock:
+            if _profiler_instance is None:
+                _profiler_instance = SamplingProfiler()
+
+    return _profiler_instance
@@ -0,0 +1,140 @@
+"""
+Rate limiting for the API front end
+Token bucket (requests per minute with a burst) plus a cap on concurrent requests, per client
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Idle clients are forgotten once this many are tracked
+MAX_TRACKED_CLIENTS = 1024
+
+
+@dataclass
+class RateLimitRejection:
+    """Why a request was refused"""
+    code: str
+    message: str
+    retry_after: int
+
+
+class _ClientBucket:
+    """Token bucket and in-flight counter of one client"""
+
+    __slots__ = ('lock', 'tokens', 'updated', 'active')
+
+    def __init__(self, tokens: float, now: float):
+        self.lock = threading.Lock()
+        self.tokens = tokens
+        self.updated = now
+        self.active = 0
+
+
+class RateLimiter:
+    """Per-client token buckets with a concurrency cap
+
+    Each client has its own lock, so requests from different clients only share the short table
+    lookup. A bucket is only dropped from the table while holding its lock and with nothing in flight.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, _ClientBucket] = {}
+        self._table_lock = threading.Lock()
+
+    def acquire(self, client: str, per_minute: float, burst: int, max_concurrent: int) -> Optional[RateLimitRejection]:
+        """Take a request slot for the client
+
+        Returns:
+            None if the request may proceed (call release() when it finishes), the rejection otherwise
+        """
+        now = time.monotonic()
+        burst = max(1, burst)
+        rate = max(per_minute, 0.001) / 60.0
+
+        while True:
+            with self._table_lock:
+                bucket = self._buckets.get(client)
+                if bucket is None:
+                    self._prune(now, rate, burst)
+                    bucket = self._buckets[client] = _ClientBucket(float(burst), now)
+
+            with bucket.lock:
+                # Pruned or reset between the lookup and the lock, start over with the current bucket
+                if self._buckets.get(client) is not bucket:
+                    continue
+                return self._take(bucket, now, rate, burst, per_minute, max_concurrent)
+
+    @staticmethod
+    def _take(bucket: _ClientBucket, now: float, rate: float, burst: int, per_minute: float, max_concurrent: int) -> Optional[RateLimitRejection]:
+        """Check and update a bucket (caller holds its lock)"""
+        if bucket.active >= max_concurrent:
+            return RateLimitRejection(
+                code="too_many_concurrent_requests",
+                message=f"Too many concurrent requests. At most {max_concurrent} request(s) may run at the same time.",
+                retry_after=1
+            )
+
+        bucket.tokens = min(float(burst), bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        if bucket.tokens < 1.0:
+            return RateLimitRejection(
+                code="rate_limit_exceeded",
+                message=f"Rate limit reached ({per_minute:g} requests per minute). Please try again later.",
+                retry_after=max(1, int((1.0 - bucket.tokens) / rate + 0.999))
+            )
+
+        bucket.tokens -= 1.0
+        bucket.active += 1
+        return None
+
+    def release(self, client: str) -> None:
+        """Free the concurrency slot taken by acquire()"""
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            return
+        with bucket.lock:
+            bucket.active = max(0, bucket.active - 1)
+
+    def _prune(self, now: float, rate: float, burst: int) -> None:
+        """Forget idle clients whose bucket has refilled (keeps the table bounded, caller holds the table lock)"""
+        if len(self._buckets) < MAX_TRACKED_CLIENTS:
+            return
+        self._drop_idle(lambda bucket: bucket.tokens + (now - bucket.updated) * rate >= burst)
+
+    def reset(self) -> None:
+        """Forget every client without a request in flight (busy ones keep their slots until released)"""
+        with self._table_lock:
+            self._drop_idle(lambda bucket: True)
+
+    def _drop_idle(self, condition) -> None:
+        # Caller holds the table lock. A bucket that is locked right now is in use, so it is skipped
+        for client, bucket in list(self._buckets.items()):
+            if not bucket.lock.acquire(blocking=False):
+                continue
+            try:
+                if bucket.active == 0 and condition(bucket):
+                    del self._buckets[client]
+            finally:
+                bucket.lock.release()
+
+
+# Singleton instance for global access
+_rate_limiter_instance = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the global rate limiter instance
+
+    Returns:
+        RateLimiter instance
+    """
+    global _rate_limiter_instance
+
+    if _rate_limiter_instance is None:
+        with _rate_limiter_lock:
+            if _rate_limiter_instance is None:
+                _rate_limiter_instance = RateLimiter()
+
+    return _rate_limiter_instance
@@ -8,6 +8,7 @@ import time
 import random
 from typing import Optional, Callable
 from core import get_state_manager
+from utils.metrics import get_metrics
 
 
 class RefreshTimer:
@@ -247,10 +248,12 @@ class RefreshTimer:
             if self._refresh_callback:
                 print("[color:yellow]Refreshing DeepSeek page...")
                 self._refresh_callback()
+                get_metrics().page_refreshes.inc("ok")
                 print("[color:green]Page refresh completed")
             else:
                 print("[color:red]No refresh callback configured")
         except Exception as e:
+            get_metrics().page_refreshes.inc("error")
             print(f"[color:red]Error during page refresh: {e}")
         finally:
             # Reset timer state
@@ -0,0 +1,180 @@
+"""
+HTTP listeners for the API
+Client requests and the extension's /network/* ingest run on separate waitress servers with their own
+thread pools, so long streaming responses can't hold up the chunks the extension is sending
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from waitress.server import create_server
+from waitress.task import ThreadedTaskDispatcher
+
+from utils.metrics import get_metrics
+
+# Routes used by the network interception extension
+INGEST_PREFIX = "/network/"
+
+DEFAULT_API_THREADS = 8
+DEFAULT_INGEST_THREADS = 2
+
+# Client listener implementations (api.server_mode)
+SERVER_MODE_THREADED = "Threaded"
+SERVER_MODE_ASYNCIO = "Asyncio"
+SERVER_MODES = [SERVER_MODE_THREADED, SERVER_MODE_ASYNCIO]
+
+
+class PathFilter:
+    """WSGI middleware that only serves paths inside (or outside) a prefix, everything else is a 404"""
+
+    def __init__(self, app, prefix: str, inside: bool):
+        self.app = app
+        self.prefix = prefix
+        self.inside = inside
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO', '').startswith(self.prefix) != self.inside:
+            start_response('404 NOT FOUND', [('Content-Type', 'application/json'), ('Content-Length', '2')])
+            return [b'{}']
+        return self.app(environ, start_response)
+
+
+class _TrackingDispatcher(ThreadedTaskDispatcher):
+    """Waitress task dispatcher that also counts tasks, remembers the deepest queue and times queue waits"""
+
+    def __init__(self, name: str):
+        super().__init__()
+        self.name = name
+        self.total_tasks = 0
+        self.peak_queued = 0
+        self._queue_wait = get_metrics().queue_wait
+
+    def add_task(self, task):
+        queued_at = time.perf_counter()
+        service = task.service
+
+        def timed_service():
+            self._queue_wait.observe(time.perf_counter() - queued_at, self.name)
+            return service()
+
+        task.service = timed_service
+        super().add_task(task)
+        with self.lock:
+            self.total_tasks += 1
+            self.peak_queued = max(self.peak_queued, len(self.queue))
+
+
+class ServerPool:
+    """One waitress listener and its worker thread pool"""
+
+    def __init__(self, name: str, app, host: str, port: int, threads: int, **kwargs):
+        self.name = name
+        self.threads = max(1, threads)
+        self.dispatcher = _TrackingDispatcher(name)
+        self.dispatcher.set_thread_count(self.threads)
+        try:
+            self.server = create_server(app, host=host, port=port, threads=self.threads, _dispatcher=self.dispatcher, **kwargs)
+        except Exception:
+            self.dispatcher.shutdown(cancel_pending=True, timeout=1)
+            raise
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def host(self) -> str:
+        return self.server.effective_host
+
+    @property
+    def port(self) -> int:
+        return int(self.server.effective_port)
+
+    def run(self) -> None:
+        """Serve until closed (blocks)"""
+        self.server.run()
+
+    def start(self) -> None:
+        """Serve from a background thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self.run, name=f"{self.name}-listener", daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Stop listening and shut down the worker threads"""
+        try:
+            self.server.close()
+        finally:
+            self.dispatcher.shutdown(cancel_pending=True, timeout=1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Worker pool and queue state"""
+        dispatcher = self.dispatcher
+        with dispatcher.lock:
+            return {
+                "host": self.host,
+                "port": self.port,
+                "threads": self.threads,
+                "active": dispatcher.active_count,
+                "queued": len(dispatcher.queue),
+                "peak_queued": dispatcher.peak_queued,
+                "total_tasks": dispatcher.total_tasks
+            }
+
+
+# Running listeners by name
+_pools: Dict[str, ServerPool] = {}
+_pools_lock = threading.Lock()
+
+def start_ingest_server(app, threads: int = DEFAULT_INGEST_THREADS) -> Optional[ServerPool]:
+    """Start the loopback-only listener for the extension (once per process)
+
+    Returns:
+        The ingest ServerPool, or None if it couldn't be started
+    """
+    with _pools_lock:
+        pool = _pools.get("ingest")
+        if pool is not None:
+            return pool
+
+        try:
+            # Port 0 lets the OS pick a free port, the extension copy is pointed at it
+            pool = ServerPool("ingest", PathFilter(app, INGEST_PREFIX, inside=True), "127.0.0.1", 0, threads)
+            pool.start()
+        except Exception as e:
+            print(f"[color:yellow]Warning: Could not start the extension listener, using the API port instead: {e}")
+            return None
+
+        _pools["ingest"] = pool
+        return pool
+
+def get_ingest_server() -> Optional[ServerPool]:
+    """The running ingest listener, if any"""
+    return _pools.get("ingest")
+
+def create_api_server(app, host: str, port: int, threads: int = DEFAULT_API_THREADS, mode: str = SERVER_MODE_THREADED):
+    """Create the client-facing listener (call run() to serve)
+
+    When the ingest listener is running, /network/* is not served here, so those routes
+    are never reachable from the network.
+
+    Args:
+        mode: SERVER_MODE_THREADED (waitress, one thread per open request) or SERVER_MODE_ASYNCIO
+              (event loop, threads only while work is being done)
+    """
+    if get_ingest_server() is not None:
+        app = PathFilter(app, INGEST_PREFIX, inside=False)
+
+    if mode == SERVER_MODE_ASYNCIO:
+        from utils.async_server import AsyncAPIServer
+        pool = AsyncAPIServer("api", app, host, port, threads)
+    else:
+        pool = ServerPool("api", app, host, port, threads, channel_request_lookahead=1)
+
+    with _pools_lock:
+        _pools["api"] = pool
+    return pool
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every running listener"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.name: pool.get_stats() for pool in pools}
@@ -1,6 +1,5 @@
-import __main__, json, os, tempfile, requests, sys
+import __main__, json, os, tempfile, sys
 from typing import Optional, Dict, List
-from cryptography.fernet import Fernet
 
 class StorageManager:
     def __init__(self):
@@ -62,6 +61,7 @@ class StorageManager:
         
         os.makedirs(save_path, exist_ok=True)
         key_path = os.path.join(save_path, "secret.key")
+        from cryptography.fernet import Fernet
         with open(key_path, "wb") as f:
             f.write(Fernet.generate_key())
 
@@ -101,6 +101,7 @@ class StorageManager:
                 if not key:
                     raise ValueError("Could not load encryption key.")
 
+            from cryptography.fernet import Fernet
             data_to_save = self._verify_and_merge_config(original, new)
             encrypted_data = Fernet(key).encrypt(json.dumps(data_to_save).encode("utf-8"))
 
@@ -125,6 +126,7 @@ class StorageManager:
                 print("Config not found or key missing.")
                 return original or {}
 
+            from cryptography.fernet import Fernet
             with open(config_path, "rb") as f:
                 decrypted = Fernet(key).decrypt(f.read())
 
@@ -182,13 +184,5 @@ class StorageManager:
         return self._temp_files[-1] if self._temp_files else None
     
     def get_latest_version(self) -> Optional[str]:
-        try:
-            url = "https://raw.githubusercontent.com/LyubomirT/intense-rp-next/main/version.txt"
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                return response.text.strip()
-        except requests.RequestException as e:
-            print(f"Version check failed: {e}")
-            return None
-
-        return None
\ No newline at end of file
+        from utils.update_checker import get_latest_version
+        return get_latest_version()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Streaming response bodies that don't sleep inside the generator
+Generators yield IDLE when they have nothing to send; the body decides how to wait, blocking the
+worker thread under waitress or handing the wait to the event loop under the asyncio server
+"""
+
+import asyncio
+import threading
+import time
+from typing import Generator, Optional, Set, Tuple
+
+# Yielded by stream generators that are waiting for data
+IDLE = object()
+
+# WSGI environ flag set by the asyncio server: bodies may yield IdleWait instead of blocking
+ASYNC_IDLE_KEY = "intenserp.async_idle"
+
+
+class StreamNotifier:
+    """Wakes up streams waiting for new data, from any thread"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def generation(self) -> int:
+        """Changes on every notify(), take it before checking for data"""
+        return self._generation
+
+    def notify(self) -> None:
+        """Signal that new data arrived"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def wait(self, since: int, timeout: float) -> None:
+        """Block until notified after generation ``since`` or the timeout passes"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._generation != since, timeout)
+
+    async def wait_async(self, since: int, timeout: float) -> None:
+        """Same as wait(), without holding a thread"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            if self._generation != since:
+                return
+            self._async_waiters.add(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._async_waiters.discard(waiter)
+
+
+class IdleWait:
+    """A wait handed from a stream body to the asyncio server"""
+
+    __slots__ = ('notifier', 'since', 'timeout')
+
+    def __init__(self, notifier: Optional[StreamNotifier], since: int, timeout: float):
+        self.notifier = notifier
+        self.since = since
+        self.timeout = timeout
+
+    async def wait_async(self) -> None:
+        if self.notifier is not None:
+            await self.notifier.wait_async(self.since, self.timeout)
+        else:
+            await asyncio.sleep(self.timeout)
+
+
+class StreamBody:
+    """Response body for a generator that yields IDLE while it waits
+
+    Args:
+        generator: Yields response chunks, or IDLE when there is nothing to send yet
+        interval: Longest wait before the generator is resumed
+        notifier: Resumes the generator early when new data arrives
+        async_idle: Yield the waits to the server instead of blocking (asyncio server only)
+    """
+
+    def __init__(self, generator: Generator, interval: float, notifier: Optional[StreamNotifier] = None,
+                 async_idle: bool = False):
+        self._generator = generator
+        self.interval = interval
+        self.notifier = notifier
+        self.async_idle = async_idle
+
+    def __iter__(self):
+        generator = self._generator
+        notifier = self.notifier
+
+        while True:
+            # Taken before resuming, so data arriving while the generator runs isn't missed
+            since = notifier.generation if notifier else 0
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+
+            if item is not IDLE:
+                yield item
+            elif self.async_idle:
+                yield IdleWait(notifier, since, self.interval)
+            elif notifier:
+                notifier.wait(since, self.interval)
+            else:
+                time.sleep(self.interval)
+
+    def close(self) -> None:
+        self._generator.close()
@@ -0,0 +1,275 @@
+"""
+Per-request span tracing
+Every chat completion gets a trace with a span around each phase (pipeline, chat setup, pasting,
+the waits for DeepSeek and the stream itself). The most recent traces are kept in a ring buffer
+for /debug/traces and can also be appended to a JSONL file.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+MAX_TRACES = 50
+MAX_SPANS = 256  # Per trace, so a runaway loop can't grow one without bound
+
+
+class Span:
+    """One timed phase of a trace"""
+
+    __slots__ = ('name', 'start', 'end', 'depth', 'attributes', 'error')
+
+    def __init__(self, name: str, start: float, depth: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.start = start
+        self.end: Optional[float] = None
+        self.depth = depth
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes) -> None:
+        """Add attributes (e.g. a result) to the span"""
+        self.attributes.update(attributes)
+
+    def to_dict(self, origin: float, now: float) -> Dict[str, Any]:
+        end = self.end if self.end is not None else now
+        data = {
+            "name": self.name,
+            "offset_ms": round((self.start - origin) * 1000, 2),
+            "duration_ms": round((end - self.start) * 1000, 2),
+            "depth": self.depth
+        }
+        if self.end is None:
+            data["open"] = True
+        if self.attributes:
+            data["attributes"] = self.attributes
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class _NullSpan:
+    """Span returned when nothing is being traced"""
+
+    __slots__ = ()
+
+    def set(self, **attributes) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """Spans of one request"""
+
+    def __init__(self, trace_id: int, name: str, export_path: Optional[str] = None, **attributes):
+        self.trace_id = trace_id
+        self.name = name
+        self.timestamp = time.time()
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.status: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.spans: List[Span] = []
+        self.export_path = export_path
+        self._open = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a span (nested spans are indented in the timeline)"""
+        with self._lock:
+            if self.end is not None or len(self.spans) >= MAX_SPANS:
+                span = None
+            else:
+                span = Span(name, time.perf_counter(), self._open, attributes)
+                self.spans.append(span)
+                self._open += 1
+
+        if span is None:
+            yield NULL_SPAN
+            return
+
+        try:
+            yield span
+        except BaseException as e:
+            span.error = type(e).__name__
+            raise
+        finally:
+            span.end = time.perf_counter()
+            with self._lock:
+                self._open -= 1
+
+    def record(self, name: str, start: float, **attributes) -> None:
+        """Add a span that started at ``start`` (perf_counter) and ends now
+
+        For phases that span yields of a generator, where a with block would be awkward.
+        """
+        end = time.perf_counter()
+        with self._lock:
+            if self.end is None and len(self.spans) < MAX_SPANS:
+                span = Span(name, start, self._open, attributes)
+                span.end = end
+                self.spans.append(span)
+
+    def set(self, **attributes) -> None:
+        """Add attributes to the trace"""
+        self.attributes.update(attributes)
+
+    def finish(self, status: Optional[int] = None) -> bool:
+        """Close the trace
+
+        Returns:
+            False if it was already finished
+        """
+        with self._lock:
+            if self.end is not None:
+                return False
+            self.end = time.perf_counter()
+            self.status = status
+            return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+        with self._lock:
+            spans = [span.to_dict(self.start, now) for span in sorted(self.spans, key=lambda span: span.start)]
+        end = self.end if self.end is not None else now
+        return {
+            "id": self.trace_id,
+            "name": self.name,
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.timestamp)) + f".{int(self.timestamp * 1000) % 1000:03d}",
+            "duration_ms": round((end - self.start) * 1000, 2),
+            "status": self.status,
+            "attributes": self.attributes,
+            "spans": spans
+        }
+
+
+# Trace of the request being handled by the current thread (or context)
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("intenserp_trace", default=None)
+
+
+class Tracer:
+    """Creates traces and keeps the most recent finished ones"""
+
+    def __init__(self, max_traces: int = MAX_TRACES):
+        self._traces: deque = deque(maxlen=max_traces)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def start_trace(self, name: str, export_path: Optional[str] = None, **attributes) -> Trace:
+        """Start a trace and make it current, so span() calls deeper down record into it
+
+        Args:
+            export_path: JSONL file the trace is appended to once finished
+        """
+        trace = Trace(next(self._ids), name, export_path, **attributes)
+        _current_trace.set(trace)
+        return trace
+
+    def finish_trace(self, trace: Trace, status: Optional[int] = None) -> None:
+        """Finish the trace and store it (streams finish after the request handler returned)"""
+        if not trace.finish(status):
+            return
+
+        with self._lock:
+            self._traces.append(trace)
+
+        if trace.export_path:
+            self._export(trace)
+
+    def get_traces(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Finished traces, newest first"""
+        with self._lock:
+            traces = list(self._traces)
+        traces.reverse()
+        if limit is not None:
+            traces = traces[:max(0, limit)]
+        return [trace.to_dict() for trace in traces]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+    def _export(self, trace: Trace) -> None:
+        try:
+            line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+            with self._export_lock:
+                os.makedirs(os.path.dirname(trace.export_path) or ".", exist_ok=True)
+                with open(trace.export_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+        except Exception as e:
+            print(f"Error exporting trace: {e}")
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the current request, if any"""
+    return _current_trace.get()
+
+def clear_current_trace() -> None:
+    """Detach the current trace (the thread moves on to another request)"""
+    _current_trace.set(None)
+
+def span(name: str, trace: Optional[Trace] = None, **attributes):
+    """Span in the given trace (default: the current one), does nothing when there is none
+
+    Pass the trace explicitly from stream generators, they are resumed on whatever worker
+    thread the server picks.
+
+    Usage:
+        with span("configure_chat", deepthink=True) as s:
+            ...
+            s.set(result="ok")
+    """
+    if trace is None:
+        trace = _current_trace.get()
+    if trace is None:
+        return nullcontext(NULL_SPAN)
+    return trace.span(name, **attributes)
+
+def format_timeline(trace: Dict[str, Any], width: int = 50) -> str:
+    """Plain text timeline of a trace (as returned by Tracer.get_traces)"""
+    total = max(trace["duration_ms"], 0.001)
+    attributes = " ".join(f"{key}={value}" for key, value in trace["attributes"].items())
+    lines = [f"#{trace['id']} {trace['name']} status={trace['status']} {trace['duration_ms'] / 1000:.3f}s at {trace['started_at']} {attributes}".rstrip()]
+
+    for span_data in trace["spans"]:
+        start = min(width - 1, int(span_data["offset_ms"] / total * width))
+        length = max(1, min(width - start, round(span_data["duration_ms"] / total * width)))
+        bar = " " * start + "#" * length + " " * (width - start - length)
+        label = ("  " * span_data["depth"] + span_data["name"])[:32]
+        suffix = ""
+        if span_data.get("error"):
+            suffix += f" error={span_data['error']}"
+        if span_data.get("attributes"):
+            suffix += " " + " ".join(f"{key}={value}" for key, value in span_data["attributes"].items())
+        lines.append(f"  {label:<32} {span_data['offset_ms']:>9.1f}ms {span_data['duration_ms']:>9.1f}ms |{bar}|{suffix}")
+
+    return "\n".join(lines)
+
+
+# Singleton instance for global access
+_tracer_instance: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Get the global tracer
+
+    Returns:
+        Tracer instance
+    """
+    global _tracer_instance
+
+    if _tracer_instance is None:
+        with _tracer_lock:
+            if _tracer_instance is None:
+                _tracer_instance = Tracer()
+
+    return _tracer_instance
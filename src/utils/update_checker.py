@@ -0,0 +1,186 @@
+"""
+Update checks for IntenseRP Next
+Fetches the latest version and release info from GitHub without holding up startup: the checks run
+on a background thread, and responses are cached on disk with their ETag so a restart within the TTL
+makes no request at all, and a later one usually gets a cheap 304 back.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+VERSION_URL = "https://raw.githubusercontent.com/LyubomirT/intense-rp-next/main/version.txt"
+RELEASES_PAGE_URL = "https://github.com/LyubomirT/intense-rp-next/releases/latest"
+
+VERSION_TTL = 6 * 60 * 60  # Seconds a cached version is used without asking GitHub
+RELEASE_TTL = 10 * 60
+REQUEST_TIMEOUT = 5
+
+CACHE_FILE = os.path.join("save", "http_cache.json")
+
+
+class HttpCache:
+    """GET responses kept in a JSON file, keyed by URL
+
+    Each entry holds the body, its validators (ETag / Last-Modified) and when it was last confirmed
+    fresh. Without a path the cache only lives in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        # Caller holds the lock
+        if self._entries is None:
+            self._entries = {}
+            if self.path and os.path.isfile(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if isinstance(data, dict):
+                        self._entries = data
+                except (OSError, ValueError) as e:
+                    print(f"[color:yellow]Warning: Ignoring unreadable HTTP cache {self.path}: {e}")
+        return self._entries
+
+    def _save(self) -> None:
+        # Caller holds the lock. Temp file + rename so a crash never leaves half a file behind
+        if not self.path:
+            return
+        temp_file = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(temp_file, self.path)
+        except OSError as e:
+            print(f"[color:yellow]Warning: Could not save HTTP cache: {e}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(url)
+            return dict(entry) if isinstance(entry, dict) else None
+
+    def put(self, url: str, body: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        with self._lock:
+            self._load()[url] = {
+                "body": body,
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked_at": time.time(),
+            }
+            self._save()
+
+    def touch(self, url: str) -> None:
+        """Mark the entry as confirmed fresh now (after a 304)"""
+        with self._lock:
+            entry = self._load().get(url)
+            if isinstance(entry, dict):
+                entry["checked_at"] = time.time()
+                self._save()
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> HttpCache:
+    """The shared cache, stored next to the config"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            from utils.storage_manager import StorageManager
+            try:
+                path = StorageManager().get_path("base", CACHE_FILE)
+            except Exception:
+                path = None
+            _cache = HttpCache(path)
+        return _cache
+
+
+def cached_get(url: str, ttl: float, timeout: float = REQUEST_TIMEOUT, cache: Optional[HttpCache] = None) -> Optional[str]:
+    """GET a text resource through the cache
+
+    A cached body younger than ``ttl`` is returned without a request. Otherwise the request is
+    conditional on the cached validators, and when GitHub can't be reached the stale body is
+    returned rather than nothing.
+
+    Returns:
+        Response body, or None if there is neither a response nor a cached copy
+    """
+    import requests
+
+    cache = cache or get_cache()
+    entry = cache.get(url)
+    if entry and time.time() - entry.get("checked_at", 0) < ttl:
+        return entry.get("body")
+
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            cache.touch(url)
+            return entry.get("body")
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Request to {url} failed: {e}")
+        return entry.get("body") if entry else None
+
+    cache.put(url, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response.text
+
+
+def cached_get_json(url: str, ttl: float, timeout: float = REQUEST_TIMEOUT) -> Optional[Any]:
+    """``cached_get`` for JSON resources, None if the body doesn't parse"""
+    body = cached_get(url, ttl, timeout)
+    if body is None:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        print(f"Invalid JSON from {url}: {e}")
+        return None
+
+
+def get_latest_version() -> Optional[str]:
+    """The newest published version (blocking, use ``check_for_update`` from the UI)"""
+    body = cached_get(VERSION_URL, VERSION_TTL)
+    return body.strip() if body else None
+
+
+def is_newer(latest: Optional[str], current: str) -> bool:
+    from packaging import version
+
+    try:
+        return bool(latest) and version.parse(latest) > version.parse(current)
+    except version.InvalidVersion:
+        print(f"[color:yellow]Warning: Ignoring invalid version {latest!r}")
+        return False
+
+
+def check_for_update(current_version: str, on_update: Callable[[str], None]) -> threading.Thread:
+    """Look for a newer version in the background
+
+    ``on_update`` is called with the new version from the checking thread, only when there is one.
+    """
+    def check():
+        try:
+            latest = get_latest_version()
+            if is_newer(latest, current_version):
+                on_update(latest)
+        except Exception as e:
+            print(f"Version check failed: {e}")
+
+    thread = threading.Thread(target=check, name="update-check", daemon=True)
+    thread.start()
+    return thread
@@ -1,16 +1,19 @@
-from seleniumbase import Driver
-from typing import Optional, Dict, Any
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional, Dict, Any
 import os
 import tempfile
 import shutil
 import time
 import json
 
+if TYPE_CHECKING:
+    from seleniumbase import Driver
+
 # =============================================================================================================================
 # Initialize SeleniumBase and open browser
 # =============================================================================================================================
 
-def initialize_webdriver(custom_browser: str = "chrome", url: Optional[str] = None, config: Optional[Dict[str, Any]] = None) -> Optional[Driver]:
+def initialize_webdriver(custom_browser: str = "chrome", url: Optional[str] = None, config: Optional[Dict[str, Any]] = None, ingest_port: Optional[int] = None) -> Optional[Driver]:
     try:
         print(f"[color:cyan]Initializing webdriver: browser={custom_browser}, url={url}")
         if config:
@@ -53,9 +56,11 @@ def initialize_webdriver(custom_browser: str = "chrome", url: Optional[str] = No
             source_extension_dir = _get_extension_dir()
             if source_extension_dir and _validate_extension_structure(source_extension_dir):
                 print(f"[color:cyan]Network interception enabled - preparing fresh extension copy...")
-                # Get configured API port
+                # Point the extension at the dedicated ingest listener, or the API port without one
                 api_port = 5000  # Default port
-                if config:
+                if ingest_port:
+                    api_port = ingest_port
+                elif config:
                     api_config = config.get("api", {})
                     api_port = api_config.get("port", 5000)
                 # Create a fresh copy of the extension to avoid browser caching issues
@@ -110,6 +115,7 @@ def initialize_webdriver(custom_browser: str = "chrome", url: Optional[str] = No
             driver_options["binary_location"] = binary_location
 
         print(f"[color:cyan]Creating Driver with options: {driver_options}")
+        from seleniumbase import Driver  # Takes about half a second, so only once a browser is started
         driver = Driver(**driver_options)
         print(f"[color:green]Driver created successfully")
 